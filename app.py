@@ -1,24 +1,24 @@
 # app.py (主程序入口)
 import os
-import pandas as pd
+import time
 import streamlit as st
 
+rerun_started = time.perf_counter()
 st.set_page_config(page_title="Football Manager Simulator", layout="centered")
 
-from components.player_input import handle_player_input
-from components.recruit import render_recruit_section
-from components.team_manage import render_team_section
-from components.match import run_season_simulation
-from components.pre_match_predict import show_all_teams
-from components.in_match_predict import render_in_match_predict_section
+# Page modules are imported inside their mode below: pandas / sklearn / data only load when a mode needs them
+from components import perf
+
+# Spans are only collected while the performance panel is on (or PERF_EXPORT_PATH is set)
+perf.start_rerun(st.session_state.get('perf_panel', False))
 
 st.title("🎮 Virtual Football Manager")
 
 # Initialization state
-if 'budget' not in st.session_state:
-    st.session_state['budget'] = 100_000_000
 if 'team' not in st.session_state:
-    st.session_state['team'] = []
+    from components.squad import SquadLedger
+    # Squad, running team value and remaining budget (100,000,000 to start)
+    st.session_state['team'] = SquadLedger(budget=100_000_000)
 
 # Function Selection
 mode = st.radio("Select which one you want", [
@@ -30,19 +30,42 @@ mode = st.radio("Select which one you want", [
 st.session_state['mode'] = mode
 
 # === 页面逻辑分流 ===
-if mode == "Match Predict (In-match)":
-    render_in_match_predict_section()
-elif mode == "Match Predict (Pre-match)":
-    show_all_teams(mode)
-else:
-    # Processing player input logic (sidebar + model predictions)
-    handle_player_input(mode)
-    # Recruitment module (showing Player to Recruit + button)
-    render_recruit_section(mode)
-    # Team Presentation + Management
-    render_team_section(mode)
-    # Simulation Match
-    run_season_simulation()
+try:
+    if mode == "Match Predict (In-match)":
+        with perf.span('import.in_match_predict'):
+            from components.in_match_predict import render_in_match_predict_section
+        with perf.span('section.in_match_predict'):
+            render_in_match_predict_section()
+    elif mode == "Match Predict (Pre-match)":
+        with perf.span('import.pre_match_predict'):
+            from components.pre_match_predict import show_all_teams
+        with perf.span('section.pre_match_predict'):
+            show_all_teams(mode)
+    else:
+        with perf.span('import.player_modes'):
+            from components.player_input import handle_player_input
+            from components.recruit import render_recruit_section
+            from components.team_manage import render_team_section
+            from components.match import run_season_simulation
+        # Processing player input logic (sidebar + model predictions)
+        with perf.span('section.player_input'):
+            handle_player_input(mode)
+        # Recruitment module (showing Player to Recruit + button)
+        with perf.span('section.recruit'):
+            render_recruit_section(mode)
+        # Team Presentation + Management
+        with perf.span('section.team'):
+            render_team_section(mode)
+        # Simulation Match
+        with perf.span('section.season_simulation'):
+            run_season_simulation()
+finally:
+    perf.end_rerun()
+    perf.record_first_render(mode, rerun_started)
+
+# Performance panel (p50 / p95 / p99 per span)
+if st.sidebar.checkbox("⏱️ Performance panel", key='perf_panel'):
+    perf.render_panel()
 
 # Reset button
 if st.sidebar.button("Reset"):
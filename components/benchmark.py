@@ -0,0 +1,399 @@
+# components/benchmark.py
+# Benchmarks for the app's hot paths: predictions (single row and batch), load_players, the squad optimizer,
+# per-worker memory, per-mode cold import time, the SQLite ETL and model training. Inputs come from the bundled
+# data/ files, repeated `scale` times for scale-ups.
+# Results are written as JSON; when a baseline exists every metric is compared against it and
+# anything worse by more than --threshold is flagged (exit code 1).
+#
+#   python -m components.benchmark                          # run, compare with benchmarks/baseline.json
+#   python -m components.benchmark --scale 1 10 --training  # bigger batches / ETL, plus training wall time
+#   python -m components.benchmark --save-baseline          # store this run as the new baseline
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(base_path)
+bench_dir = os.path.join(project_root, 'benchmarks')
+bundled_players_csv = os.path.join(project_root, 'data', 'players_stats.csv')
+
+BATCH_ROWS = 1_000
+DEFAULT_THRESHOLD = 0.2
+
+# Metric name suffix -> True when bigger is better
+HIGHER_IS_BETTER = {'_rows_per_s': True, '_ms': False, '_s': False, '_mb': False}
+
+
+def timed(fn, repeat=5):
+    # Median wall time in milliseconds; one untimed warm-up call loads models and caches first
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples))
+
+
+# ===== Prediction latency =====
+def bench_player_value(scales, repeat):
+    from components.clean_data import load_table
+    from components.predict_player_value_model import predict_player_value, predict_player_values
+
+    players = load_table('player_stats')
+    one = players.iloc[0].to_dict()
+    results = {'player_value_single_ms': timed(lambda: predict_player_value(one), repeat)}
+    for scale in scales:
+        batch = players.sample(BATCH_ROWS * scale, replace=True, random_state=0)
+        results[f'player_value_batch_{len(batch)}_ms'] = timed(lambda: predict_player_values(batch), repeat)
+    return results
+
+
+def bench_pre_match(scales, repeat):
+    from components.clean_data import load_table
+    from components.predict_match_result_model_pre_match import (
+        build_match_features, implied_probabilities, predict_match_probabilities, predict_match_result
+    )
+
+    teams = load_table('team_stats')
+    rng = np.random.default_rng(0)
+    prob_h, prob_d, prob_a = implied_probabilities(2.3, 3.4, 3.2)
+    single = build_match_features(teams.iloc[0], teams.iloc[1], prob_h, prob_d, prob_a)
+    results = {'pre_match_single_ms': timed(lambda: predict_match_result(single), repeat)}
+    for scale in scales:
+        n = BATCH_ROWS * scale
+        home, away = rng.integers(0, len(teams), n), rng.integers(0, len(teams), n)
+        batch = build_match_features(teams.iloc[home], teams.iloc[away], prob_h, prob_d, prob_a)
+        results[f'pre_match_batch_{n}_ms'] = timed(lambda: predict_match_probabilities(batch), repeat)
+    return results
+
+
+def bench_in_match(scales, repeat):
+    from components.in_match_predict import FEATURE_COLS, read_data, load_model_and_scaler, odds_features
+    from components.club_index import ClubIndex
+
+    index = ClubIndex(*read_data())
+    model, scaler = load_model_and_scaler()
+    clubs = [club for club in index.clubs if index.latest[index.club_idx[club]] >= 0
+             and not np.isnan(index.home_winrate[index.club_idx[club]])]
+
+    # Same steps as the Predict button in components/in_match_predict.py
+    def predict_one():
+        df_input = pd.DataFrame([{
+            'HTHG': 1, 'HTAG': 0, **odds_features(2.1, 3.0, 3.1), **index.team_features(clubs[0], clubs[1])
+        }])[FEATURE_COLS]
+        return model.predict_proba(scaler.transform(df_input))
+
+    results = {'in_match_single_ms': timed(predict_one, repeat)}
+    rng = np.random.default_rng(0)
+    for scale in scales:
+        n = BATCH_ROWS * scale
+        rows = []
+        for _ in range(n):
+            home, away = rng.choice(clubs, 2, replace=False)
+            rows.append({'HTHG': rng.integers(0, 4), 'HTAG': rng.integers(0, 4),
+                         **odds_features(*rng.uniform([1.3, 2.5, 1.3], [5, 4.5, 8])),
+                         **index.team_features(home, away)})
+        batch = pd.DataFrame(rows)[FEATURE_COLS]
+        results[f'in_match_batch_{n}_ms'] = timed(lambda: model.predict_proba(scaler.transform(batch)), repeat)
+    return results
+
+
+# ===== Data loading =====
+def bench_load_players(repeat):
+    from components import clean_data
+    from components.player_input import load_players
+
+    def cold_load():
+        # Drop the memory-mapped column cache
+        clean_data._loaded.clear()
+        return load_players()
+
+    results = {'load_players_ms': timed(cold_load, repeat)}
+    clean_data._loaded.clear()
+    tracemalloc.start()
+    df = load_players()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results['load_players_peak_mb'] = peak / 2**20
+    results['load_players_frame_mb'] = df.memory_usage(deep=True).sum() / 2**20
+    return results
+
+
+def bench_session_memory(squad_size=25):
+    # What one session keeps for a full squad: the recruited players plus the player being viewed
+    from components.clean_data import load_table
+    from components.perf import deep_size
+    from components.squad import Player, SquadLedger
+
+    players = load_table('player_stats').dropna().drop_duplicates('full_name')
+    records = [Player(row.full_name, row.age, row.height_cm, row.weight_kg, row.potential, row.best_position,
+                      row.stamina, row.dribbling, row.short_passing, row.value, row.id)
+               for row in players.itertuples()]
+    squad = SquadLedger(budget=float('inf'), players=records[:squad_size])
+    state = {'team': squad, 'current_player': records[squad_size]}
+    results = {f'session_squad_{len(squad)}_kb': deep_size(state) / 1024}
+
+    # Scenario squads: bulk import every player with an unlimited budget, then empty the squad again
+    def bulk_import():
+        ledger = SquadLedger(budget=float('inf'))
+        ledger.add_many(records)
+        for player in records:
+            if player.name in ledger:
+                ledger.remove(player.name)
+
+    results[f'squad_bulk_import_{len(records)}_ms'] = timed(bulk_import)
+    return results
+
+
+def bench_squad_optimizer(repeat, pool_size=11_000):
+    # Exact squad selection over a pool tiled from the 2025 players (jittered so no two copies are identical),
+    # once with a generous budget and once with a budget that binds
+    from components.squad_optimizer import MIN_SQUAD, load_candidates, optimize_squad
+
+    base = load_candidates()
+    rng = np.random.default_rng(0)
+    copies = -(-pool_size // len(base))
+    pool = pd.concat([base] * copies, ignore_index=True).head(pool_size)
+    pool['full_name'] = pool['full_name'] + ' #' + (pool.index // len(base)).astype(str)
+    pool['potential'] = np.clip(pool['potential'] + rng.integers(-3, 4, len(pool)), 1, 99)
+    pool['cost'] = (pool['cost'] * rng.uniform(0.9, 1.1, len(pool))).round(2)
+    tight = float(pool['cost'].median() * MIN_SQUAD * 2)
+    results = {}
+    for label, budget in (('', 100_000_000), ('_tight', tight)):
+        for objective in ('potential', 'value_efficiency'):
+            results[f'squad_optimizer_{objective}{label}_{len(pool)}_ms'] = timed(
+                lambda: optimize_squad(objective, budget, candidates=pool), repeat)
+    return results
+
+
+# ===== Per-worker memory: unpickled models vs memory-mapped NumPy exports =====
+WORKER_CODE = """
+import json
+from components.player_input import load_players
+from components.predict_player_value_model import predict_player_values
+from components.perf import process_memory
+predict_player_values(load_players().head(100))
+print(json.dumps(process_memory()))
+"""
+
+
+def bench_worker_memory():
+    # Resident memory of one more app worker once the player data and value model are loaded.
+    # Private memory is what each extra process costs; shared pages are mapped from the page cache once.
+    if not os.path.exists(os.path.join(project_root, 'models', 'player_value_model.npz')):
+        raise FileNotFoundError("models/player_value_model.npz: run python -m components.numpy_inference first")
+    results = {}
+    for mode, shared in (('pickled', '0'), ('shared', '1')):
+        env = dict(os.environ, SHARED_MODELS=shared)
+        proc = subprocess.run([sys.executable, '-c', WORKER_CODE], cwd=project_root, env=env,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise ImportError(proc.stderr.strip().splitlines()[-1])
+        memory = json.loads(proc.stdout.strip().splitlines()[-1])
+        if memory['private_mb'] is None:
+            raise ImportError("per-process private memory needs /proc (Linux)")
+        results[f'worker_private_{mode}_mb'] = memory['private_mb']
+        results[f'worker_rss_{mode}_mb'] = memory['rss_mb']
+    return results
+
+
+# ===== Cold start: what app.py imports for each mode, in a fresh interpreter =====
+MODE_IMPORTS = {
+    'player_modes': ['components.player_input', 'components.recruit', 'components.team_manage', 'components.match'],
+    'pre_match': ['components.pre_match_predict'],
+    'in_match': ['components.in_match_predict'],
+}
+
+
+def bench_startup(repeat):
+    results = {}
+    for mode, modules in MODE_IMPORTS.items():
+        # streamlit itself is already loaded by the server before app.py runs, so it is not counted
+        code = ("import time, streamlit; start = time.perf_counter(); "
+                + "; ".join(f"import {m}" for m in modules)
+                + "; print((time.perf_counter() - start) * 1000)")
+        samples = []
+        for _ in range(repeat):
+            proc = subprocess.run([sys.executable, '-c', code], cwd=project_root, capture_output=True, text=True)
+            if proc.returncode != 0:
+                raise ImportError(proc.stderr.strip().splitlines()[-1])
+            samples.append(float(proc.stdout.strip().splitlines()[-1]))
+        results[f'startup_import_{mode}_ms'] = float(np.median(samples))
+    return results
+
+
+# ===== ETL throughput (components/save_data_to_sqlite.py) =====
+def write_player_csvs(out_dir, scale):
+    # The bundled export is already in the scraper's layout; one file per synthetic year
+    df = pd.read_csv(bundled_players_csv)
+    for i in range(scale):
+        df.to_csv(os.path.join(out_dir, f"players_data_{2000 + i}.csv"), index=False)
+    return len(df) * scale
+
+
+def bench_etl(scales):
+    from components import save_data_to_sqlite as etl
+
+    results = {}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            rows = write_player_csvs(tmp, scale)
+            files = [os.path.join(tmp, name) for name in os.listdir(tmp)]
+            # sync_table works on the module's connection / cursor globals
+            etl.connection = sqlite3.connect(os.path.join(tmp, 'bench.sl3'))
+            etl.cursor = etl.connection.cursor()
+            etl.cursor.execute(etl.create_etl_manifest)
+            try:
+                start = time.perf_counter()
+                etl.sync_table('player_stats', etl.create_player_stats, files, etl.parse_player_file,
+                               'year', lambda path: os.path.basename(path)[-8:-4], full=True)
+                seconds = time.perf_counter() - start
+            finally:
+                etl.cursor.close()
+                etl.connection.close()
+        results[f'etl_players_{rows}_rows_per_s'] = rows / seconds
+    return results
+
+
+# ===== Training wall time =====
+# Each script writes into ../models, so it runs from a scratch copy of components/ whose models/ is empty
+TRAINING_JOBS = {
+    'train_player_value': [sys.executable, '-c',
+                           'from components.predict_player_value_model import train_model; train_model()'],
+    'train_pre_match': [sys.executable, 'train_match_result_model.py'],
+    'train_in_match': [sys.executable, '-m', 'components.predict_match_result_model_in_match'],
+}
+
+
+def bench_training(timeout):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copytree(base_path, os.path.join(tmp, 'components'),
+                        ignore=shutil.ignore_patterns('__pycache__'))
+        os.symlink(os.path.join(project_root, 'data'), os.path.join(tmp, 'data'))
+        os.makedirs(os.path.join(tmp, 'models'))
+        env = dict(os.environ, PYTHONPATH=tmp, MPLBACKEND='Agg')
+        for name, cmd in TRAINING_JOBS.items():
+            # train_match_result_model.py uses paths relative to components/; the others run from the root
+            cwd = tmp if cmd[1] in ('-c', '-m') else os.path.join(tmp, 'components')
+            start = time.perf_counter()
+            try:
+                proc = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True, timeout=timeout)
+            except subprocess.TimeoutExpired:
+                print(f"{name}: timed out after {timeout}s")
+                continue
+            seconds = time.perf_counter() - start
+            if proc.returncode != 0:
+                error = (proc.stderr.strip().splitlines() or ['unknown error'])[-1]
+                print(f"{name}: failed ({error})")
+                continue
+            results[f'{name}_s'] = seconds
+    return results
+
+
+# ===== Baselines and regression check =====
+def higher_is_better(metric):
+    for suffix, higher in HIGHER_IS_BETTER.items():
+        if metric.endswith(suffix):
+            return higher
+    return False
+
+
+def compare(current, baseline, threshold):
+    # Relative change per metric, positive = worse; metrics missing on either side are skipped
+    rows = []
+    for metric, value in current.items():
+        old = baseline.get(metric)
+        if not old:
+            continue
+        change = (old - value) / old if higher_is_better(metric) else (value - old) / old
+        rows.append((metric, old, value, change, change > threshold))
+    return rows
+
+
+def run(scales=(1,), repeat=5, etl=True, training=False, training_timeout=3600):
+    # Outside `streamlit run` every Streamlit-cached call logs a "missing ScriptRunContext" warning
+    os.environ.setdefault('STREAMLIT_LOGGER_LEVEL', 'error')
+    metrics = {}
+    steps = [
+        ('player value', lambda: bench_player_value(scales, repeat)),
+        ('pre-match', lambda: bench_pre_match(scales, repeat)),
+        ('in-match', lambda: bench_in_match(scales, repeat)),
+        ('load_players', lambda: bench_load_players(repeat)),
+        ('session memory', bench_session_memory),
+        ('squad optimizer', lambda: bench_squad_optimizer(repeat)),
+        ('worker memory', bench_worker_memory),
+        ('startup imports', lambda: bench_startup(repeat)),
+    ]
+    if etl:
+        steps.append(('ETL', lambda: bench_etl(scales)))
+    if training:
+        steps.append(('training', lambda: bench_training(training_timeout)))
+
+    for label, step in steps:
+        print(f"Benchmarking {label}...")
+        try:
+            metrics.update(step())
+        except (FileNotFoundError, ImportError, sqlite3.Error, IndexError, KeyError) as e:
+            print(f"Skipping {label}: {type(e).__name__}: {e}")
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpus': os.cpu_count()},
+        'scales': list(scales),
+        'metrics': metrics,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark prediction, loading, ETL and training hot paths")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1],
+                        help=f"batch size multiples of {BATCH_ROWS} rows; ETL loads the bundled players this many times")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-etl', action='store_true')
+    parser.add_argument('--training', action='store_true', help="also time the three training scripts (slow)")
+    parser.add_argument('--training-timeout', type=int, default=3600)
+    parser.add_argument('--baseline', default=os.path.join(bench_dir, 'baseline.json'))
+    parser.add_argument('--output', default=os.path.join(bench_dir, 'latest.json'))
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown that counts as a regression (0.2 = 20%%)")
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    result = run(args.scale, args.repeat, not args.no_etl, args.training, args.training_timeout)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['metrics']
+        print(f"\n{'metric':<40}{'baseline':>14}{'current':>14}{'change':>10}")
+        for metric, old, value, change, regressed in compare(result['metrics'], baseline, args.threshold):
+            print(f"{metric:<40}{old:>14.4g}{value:>14.4g}{change:>+10.1%}" + ("  REGRESSION" if regressed else ""))
+            if regressed:
+                regressions.append(metric)
+    else:
+        for metric, value in result['metrics'].items():
+            print(f"{metric:<40}{value:>14.4g}")
+
+    if args.save_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
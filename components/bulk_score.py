@@ -0,0 +1,242 @@
+# components/bulk_score.py
+# Score large CSVs of players or fixtures in fixed-size chunks and stream the results to a CSV file.
+# Only a few chunks are ever in memory (one, or two per worker with --workers), so memory stays flat
+# whatever the input size. Features are built exactly as in the app:
+#   players    predict_player_values (player input form, players_stats.csv or player_stats column names)
+#   pre_match  build_match_features from the 2025 team_stats rows + predict_match_probabilities
+#   in_match   ClubIndex team features + odds_features, scaled and scored like in_match_predict
+#
+# Fixture columns: home, away, odds_h, odds_d, odds_a (pre-match odds default to DEFAULT_ODDS), plus hthg, htag and
+# an optional season ('2023/24') for in_match. football-data.co.uk names (HomeTeam, AwayTeam, HTHG, HTAG,
+# B365H, B365D, B365A) are accepted too. Rows that cannot be scored get an error and empty predictions.
+#
+#   python -m components.bulk_score players data/players_stats.csv player_values.csv
+#   python -m components.bulk_score pre_match fixtures.csv predictions.csv --workers 4
+#   python -m components.bulk_score in_match matches.csv - --keep home away > predictions.csv
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import contextlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+database_path = os.path.join(base_path, '..', 'data', 'allData.sl3')
+
+CHUNK_SIZE = 50_000
+
+FIXTURE_ALIASES = {
+    'HomeTeam': 'home', 'AwayTeam': 'away', 'HTHG': 'hthg', 'HTAG': 'htag',
+    'B365H': 'odds_h', 'B365D': 'odds_d', 'B365A': 'odds_a',
+}
+
+# Loaded once per process (the main process, or each pool worker) on first use
+_state = {}
+
+
+# ===== Scorers: chunk -> prediction columns aligned with chunk.index =====
+def score_players(chunk):
+    from components.predict_player_value_model import predict_player_values
+    return pd.DataFrame({'predicted_value': predict_player_values(chunk).round(2)})
+
+
+def _fixtures(chunk):
+    fixtures = chunk.rename(columns={k: v for k, v in FIXTURE_ALIASES.items() if v not in chunk.columns})
+    missing = [col for col in ('home', 'away') if col not in fixtures.columns]
+    if missing:
+        raise KeyError(f"fixture columns missing: {missing}")
+    return fixtures
+
+
+def _team_stats():
+    # Same rows show_all_teams reads, one per team
+    if 'team_stats' not in _state:
+        from components.fixture_matrix import TEAM_FEATURES
+        conn = sqlite3.connect(database_path)
+        teams = pd.read_sql_query("SELECT * FROM team_stats WHERE year = '2025'", conn)
+        conn.close()
+        _state['team_stats'] = teams.drop_duplicates('team').set_index('team')[TEAM_FEATURES]
+    return _state['team_stats']
+
+
+def score_pre_match(chunk):
+    from components.fixture_matrix import DEFAULT_ODDS
+    from components.predict_match_result_model_pre_match import (
+        build_match_features, implied_probabilities, predict_match_probabilities
+    )
+
+    fixtures = _fixtures(chunk)
+    teams = _team_stats()
+    out = pd.DataFrame({'p_home_win': np.nan, 'p_away_win': np.nan, 'prediction': None, 'error': None},
+                       index=chunk.index)
+    same = (fixtures['home'] == fixtures['away']).to_numpy()
+    known = (fixtures['home'].isin(teams.index) & fixtures['away'].isin(teams.index)).to_numpy() & ~same
+    out.loc[~known, 'error'] = "unknown team"
+    out.loc[same, 'error'] = "home and away are the same team"
+    # Empty odds cells fall back to DEFAULT_ODDS; non-numeric, zero, negative or infinite odds are errors
+    odds = np.column_stack([
+        pd.to_numeric(fixtures[col], errors='coerce').where(fixtures[col].notna(), default).to_numpy(dtype=float)
+        if col in fixtures.columns else np.full(len(fixtures), default)
+        for col, default in zip(('odds_h', 'odds_d', 'odds_a'), DEFAULT_ODDS)])
+    bad = ~(np.isfinite(odds) & (odds > 0)).all(axis=1) & known
+    out.loc[bad, 'error'] = "non-numeric or non-positive odds"
+    known &= ~bad
+    rows = fixtures[known]
+    if len(rows):
+        features = build_match_features(teams.loc[rows['home']], teams.loc[rows['away']],
+                                         *implied_probabilities(*odds[known].T))
+        # Teams with missing stats in team_stats cannot be scored either
+        complete = np.isfinite(features.to_numpy(dtype=float)).all(axis=1)
+        scored = np.flatnonzero(known)[complete]
+        out.iloc[np.flatnonzero(known)[~complete], out.columns.get_loc('error')] = "missing team stats"
+        if complete.any():
+            p_home = predict_match_probabilities(features[complete])[:, 0]
+            out.iloc[scored, out.columns.get_loc('p_home_win')] = p_home.round(4)
+            out.iloc[scored, out.columns.get_loc('p_away_win')] = (1 - p_home).round(4)
+            out.iloc[scored, out.columns.get_loc('prediction')] = np.where(p_home >= 0.5, 'Home Win', 'Away Win')
+    return out
+
+
+def _in_match_model():
+    if 'in_match' not in _state:
+        from components.club_index import ClubIndex
+        from components.in_match_predict import read_data, load_model_and_scaler
+        from components.numpy_inference import shared_model
+
+        index = ClubIndex(*read_data())
+        shared = shared_model('in_match_result_model')
+        _state['in_match'] = (index, shared, None if shared is not None else load_model_and_scaler())
+    return _state['in_match']
+
+
+def score_in_match(chunk):
+    from components.in_match_predict import FEATURE_COLS, odds_features
+    from components.live_scoring import ODDS_KEYS, TEAM_IDX, ODDS_IDX, HTHG_IDX, HTAG_IDX
+
+    fixtures = _fixtures(chunk)
+    index, shared, pickled = _in_match_model()
+    out = pd.DataFrame({'p_H': np.nan, 'p_D': np.nan, 'p_A': np.nan, 'prediction': None, 'error': None},
+                       index=chunk.index)
+
+    n = len(fixtures)
+    X = np.zeros((n, len(FEATURE_COLS)))
+    ok = np.ones(n, dtype=bool)
+    seasons = fixtures['season'] if 'season' in fixtures.columns else pd.Series(None, index=fixtures.index)
+    errors = out['error'].to_numpy(dtype=object)
+    for i, (home, away, season) in enumerate(zip(fixtures['home'], fixtures['away'], seasons)):
+        if home == away:
+            ok[i] = False
+            errors[i] = "home and away are the same team"
+            continue
+        try:
+            X[i, TEAM_IDX] = index.team_vector(home, away, None if pd.isna(season) else season)
+        except IndexError as e:
+            ok[i] = False
+            errors[i] = str(e)
+    for col, idx in (('hthg', HTHG_IDX), ('htag', HTAG_IDX)):
+        if col in fixtures.columns:
+            X[:, idx] = pd.to_numeric(fixtures[col], errors='coerce').to_numpy(dtype=float)
+    try:
+        odds = [pd.to_numeric(fixtures[col], errors='coerce').to_numpy(dtype=float)
+                for col in ('odds_h', 'odds_d', 'odds_a')]
+    except KeyError as e:
+        raise KeyError(f"fixture column missing: {e}")
+    values = odds_features(*odds)  # plain arithmetic: works on whole columns
+    X[:, ODDS_IDX] = np.column_stack([values[k] for k in ODDS_KEYS])
+    bad = np.isnan(X).any(axis=1) & ok
+    errors[bad] = "missing or non-numeric goals / odds"
+    ok &= ~bad
+    out['error'] = errors
+
+    if ok.any():
+        if shared is not None:
+            proba, classes = shared.predict_proba(X[ok]), list(shared.classes_)
+        else:
+            model, scaler = pickled
+            proba = model.predict_proba(scaler.transform(pd.DataFrame(X[ok], columns=FEATURE_COLS)))
+            classes = list(model.classes_)
+        proba = proba[:, [classes.index(c) for c in ('H', 'D', 'A')]]
+        out.loc[ok, ['p_H', 'p_D', 'p_A']] = proba.round(4)
+        out.loc[ok, 'prediction'] = np.array(list('HDA'))[np.argmax(proba, axis=1)]
+    return out
+
+
+SCORERS = {
+    'players': score_players,
+    'pre_match': score_pre_match,
+    'in_match': score_in_match,
+}
+
+
+def score_chunk(kind, chunk, keep=None):
+    scores = SCORERS[kind](chunk)
+    kept = chunk if keep is None else chunk[[col for col in keep if col in chunk.columns]]
+    return pd.concat([kept, scores], axis=1)
+
+
+# ===== Streaming driver =====
+def bulk_score(kind, source, dest, chunksize=CHUNK_SIZE, workers=1, keep=None):
+    # Reads `source` chunk by chunk and writes every scored chunk to `dest` in input order
+    start = time.perf_counter()
+    rows = 0
+    reader = pd.read_csv(source, chunksize=chunksize, encoding='utf-8-sig')
+    # An already open stream (stdout) is left open for the caller
+    output = open(dest, 'w', newline='', encoding='utf-8') if isinstance(dest, str) else contextlib.nullcontext(dest)
+    with output as out:
+        def write(scored):
+            nonlocal rows
+            scored.to_csv(out, header=rows == 0, index=False)
+            rows += len(scored)
+
+        if workers > 1:
+            # At most two chunks per worker in flight: reading never runs ahead of scoring / writing
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in reader:
+                    pending.append(pool.submit(score_chunk, kind, chunk, keep))
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+        else:
+            for chunk in reader:
+                write(score_chunk(kind, chunk, keep))
+
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows} {kind} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s, "
+          f"{workers} worker(s), peak RSS {peak_rss_mb():.0f} MB)", file=sys.stderr)
+    return rows
+
+
+def peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == 'darwin' else 1024)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Score a CSV of players or fixtures in constant memory")
+    parser.add_argument('kind', choices=list(SCORERS))
+    parser.add_argument('input', help="CSV file, or - for stdin")
+    parser.add_argument('output', help="CSV file, or - for stdout")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE, help="rows per chunk")
+    parser.add_argument('--workers', type=int, default=1, help="score chunks in a process pool of this size")
+    parser.add_argument('--keep', nargs='+', metavar='COLUMN',
+                        help="input columns copied to the output (default: all of them)")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == '-' else args.input
+    try:
+        if args.output == '-':
+            # Progress prints (model loads etc.) go to stderr so stdout only carries the CSV
+            with contextlib.redirect_stdout(sys.stderr):
+                bulk_score(args.kind, source, sys.stdout, args.chunksize, args.workers, args.keep)
+        else:
+            bulk_score(args.kind, source, args.output, args.chunksize, args.workers, args.keep)
+    except KeyError as e:
+        sys.exit(f"bulk_score: {e.args[0]}")
@@ -0,0 +1,127 @@
+# components/clean_data.py
+# Typed columnar cache of player_stats / team_stats.
+# Each table becomes a directory of .npy column files (memory-mappable) plus meta.json:
+# text columns are stored as categorical codes + categories, numeric columns are downcast.
+# Run `python -m components.clean_data` from the project root after loading the database.
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+database_path = os.path.join(base_path, '..', 'data', 'allData.sl3')
+cache_dir = os.path.join(base_path, '..', 'data', 'cache')
+
+TABLES = ['player_stats', 'team_stats']
+
+# Columns kept as text (stored categorical); every other column is numeric
+TEXT_COLUMNS = {
+    'player_stats': {'full_name', 'year', 'best_position', 'team'},
+    'team_stats': {'team', 'league', 'year'},
+}
+
+# Money columns keep full precision, everything else fractional fits float32
+FLOAT64_COLUMNS = {'value', 'wage'}
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def _leading_number(series):
+    # Scraped ratings can still be text such as "80\n+2" in older databases: keep the leading number
+    numbers = pd.to_numeric(series, errors='coerce')
+    text = numbers.isna() & series.notna()
+    if text.any():
+        numbers[text] = pd.to_numeric(series[text].astype(str).str.extract(r'(\d+)', expand=False), errors='coerce')
+    return numbers
+
+
+def _downcast(series):
+    if series.isna().any() or not np.all(np.mod(series.dropna(), 1) == 0):
+        return series.astype(np.float64 if series.name in FLOAT64_COLUMNS else np.float32)
+    return pd.to_numeric(series, downcast='integer')
+
+
+def build_table(table, db_path=database_path, out_dir=cache_dir):
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
+    conn.close()
+
+    table_dir = os.path.join(out_dir, table)
+    os.makedirs(table_dir, exist_ok=True)
+    meta = {'rows': len(df), 'source_mtime': os.path.getmtime(db_path), 'columns': {}}
+    for col in df.columns:
+        series = df[col]
+        if col in TEXT_COLUMNS.get(table, ()):
+            values = series.astype('category')
+            np.save(os.path.join(table_dir, f"{col}.npy"), values.cat.codes.to_numpy())
+            np.save(os.path.join(table_dir, f"{col}.categories.npy"), values.cat.categories.to_numpy(dtype=str))
+            meta['columns'][col] = 'category'
+        else:
+            values = _downcast(_leading_number(series))
+            np.save(os.path.join(table_dir, f"{col}.npy"), values.to_numpy())
+            meta['columns'][col] = str(values.dtype)
+
+    with open(os.path.join(table_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=1)
+    print(f"{table}: {len(df)} rows cached to {table_dir}")
+    return meta
+
+
+def build_all(db_path=database_path, out_dir=cache_dir):
+    for table in TABLES:
+        build_table(table, db_path, out_dir)
+    with _loaded_lock:
+        _loaded.clear()
+
+
+def load_arrays(table, out_dir=cache_dir):
+    # Column name -> memory-mapped array; categorical columns come back as (codes, categories)
+    table_dir = os.path.join(out_dir, table)
+    key = os.path.abspath(table_dir)
+    with _loaded_lock:
+        if key in _loaded:
+            return _loaded[key]
+        if is_stale(table, out_dir=out_dir):
+            build_table(table, out_dir=out_dir)
+        with open(os.path.join(table_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = {}
+        for col, kind in meta['columns'].items():
+            values = np.load(os.path.join(table_dir, f"{col}.npy"), mmap_mode='r')
+            if kind == 'category':
+                arrays[col] = (values, np.load(os.path.join(table_dir, f"{col}.categories.npy")))
+            else:
+                arrays[col] = values
+        _loaded[key] = arrays
+        return arrays
+
+
+def load_table(table, columns=None, out_dir=cache_dir):
+    arrays = load_arrays(table, out_dir)
+    data = {}
+    for col in columns or arrays:
+        values = arrays[col]
+        if isinstance(values, tuple):
+            codes, categories = values
+            data[col] = pd.Categorical.from_codes(codes, categories=categories)
+        else:
+            data[col] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def is_stale(table, db_path=database_path, out_dir=cache_dir):
+    meta_path = os.path.join(out_dir, table, 'meta.json')
+    if not os.path.exists(meta_path):
+        return True
+    if not os.path.exists(db_path):
+        return False
+    with open(meta_path) as f:
+        return json.load(f)['source_mtime'] < os.path.getmtime(db_path)
+
+
+if __name__ == '__main__':
+    build_all()
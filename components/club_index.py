@@ -0,0 +1,75 @@
+# components/club_index.py
+# Compact club feature index for in-match predictions, built once from club_stats + team_winrates.
+# Latest-season and per-season table rows live in NumPy arrays, so assembling match features is O(1).
+import numpy as np
+
+STAT_COLS = ['Position', 'Played', 'Won', 'Drawn', 'Lost']
+TEAM_FEATURE_KEYS = ['HPos', 'HPlayed', 'HWon', 'HDrawn', 'HLost', 'APos', 'APlayed', 'AWon', 'ADrawn', 'ALost',
+                     'HWinRate', 'AWinRate', 'HDrawRate', 'ADrawRate', 'HLossRate', 'ALossRate',
+                     'PosDiff', 'PosRatio']
+eps = 1e-6
+
+
+class ClubIndex:
+    __slots__ = ('clubs', 'club_idx', 'latest', 'season_rows', 'season_stats', 'home_winrate', 'away_winrate')
+
+    def __init__(self, club_stats, winrates):
+        club_stats = club_stats.rename(columns=str.strip)
+        self.clubs = sorted(set(club_stats['Club']) | set(winrates['HomeTeam']))
+        self.club_idx = {club: i for i, club in enumerate(self.clubs)}
+        n = len(self.clubs)
+
+        # One row per (club, season): stats plus derived draw / loss rates
+        stats = club_stats[STAT_COLS].to_numpy(dtype=float)
+        played = stats[:, 1] + eps
+        self.season_stats = np.column_stack([stats, stats[:, 3] / played, stats[:, 4] / played])
+        self.season_rows = {
+            (club, season): i for i, (club, season) in enumerate(zip(club_stats['Club'], club_stats['Season']))
+        }
+
+        # Latest season per club (same as sort_values("Season", ascending=False).iloc[0])
+        self.latest = np.full(n, -1, dtype=np.intp)
+        latest_season = {}
+        for (club, season), i in self.season_rows.items():
+            if club not in latest_season or season > latest_season[club]:
+                latest_season[club] = season
+                self.latest[self.club_idx[club]] = i
+
+        # First win-rate row per club, as in winrates[winrates["HomeTeam"] == club].iloc[0]
+        self.home_winrate = np.full(n, np.nan)
+        self.away_winrate = np.full(n, np.nan)
+        first = winrates.drop_duplicates('HomeTeam')
+        idx = [self.club_idx[club] for club in first['HomeTeam']]
+        self.home_winrate[idx] = first['HomeWinRate'].to_numpy(dtype=float)
+        self.away_winrate[idx] = first['AwayWinRate'].to_numpy(dtype=float)
+
+    def stats_row(self, club, season=None):
+        if season is not None:
+            row = self.season_rows.get((club, season))
+        else:
+            i = self.club_idx.get(club)
+            row = self.latest[i] if i is not None and self.latest[i] >= 0 else None
+        if row is None:
+            raise IndexError(f"No club_stats row for {club}" + (f" in {season}" if season else ""))
+        return self.season_stats[row]
+
+    def winrates(self, club):
+        i = self.club_idx.get(club)
+        if i is None or np.isnan(self.home_winrate[i]):
+            raise IndexError(f"No win-rate row for {club}")
+        return self.home_winrate[i], self.away_winrate[i]
+
+    def team_vector(self, home_team, away_team, season=None):
+        # Team features in TEAM_FEATURE_KEYS order; raises IndexError when a team has no stats / win-rate row
+        h_pos, h_played, h_won, h_drawn, h_lost, h_draw_rate, h_loss_rate = self.stats_row(home_team, season)
+        a_pos, a_played, a_won, a_drawn, a_lost, a_draw_rate, a_loss_rate = self.stats_row(away_team, season)
+        return np.array([
+            h_pos, h_played, h_won, h_drawn, h_lost,
+            a_pos, a_played, a_won, a_drawn, a_lost,
+            self.winrates(home_team)[0], self.winrates(away_team)[1],
+            h_draw_rate, a_draw_rate, h_loss_rate, a_loss_rate,
+            a_pos - h_pos, h_pos / (a_pos + eps),
+        ])
+
+    def team_features(self, home_team, away_team, season=None):
+        return dict(zip(TEAM_FEATURE_KEYS, self.team_vector(home_team, away_team, season)))
@@ -1,5 +1,12 @@
 import os
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 start_season = 7
 end_season = 25
@@ -12,38 +19,107 @@ FRANCE = 'F1'
 
 leagues = [ENGLAND, GERMANY, ITALY, SPAIN, FRANCE]
 
+league_names = {
+    ENGLAND: 'England',
+    GERMANY: 'Germany',
+    ITALY: 'Italy',
+    SPAIN: 'Spain',
+    FRANCE: 'France',
+}
+
+BASE_URL = "https://www.football-data.co.uk/mmz4281"
+SAVE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'match_data')
+
+# ETag / Last-Modified of every downloaded file, used for conditional requests on the next run
+CACHE_FILE = '.download_cache.json'
+
+
+def make_session(workers, retries=3, backoff=0.5):
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=['GET'])
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
-def download_season_data(league, season_code, year, save_dir, name):
-    url = f"https://www.football-data.co.uk/mmz4281/{season_code}/{league}.csv"
+
+def write_atomic(file_path, content):
+    tmp_path = f"{file_path}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, file_path)
+
+
+def download_season_data(session, league, year, save_root, cache, base_url=BASE_URL, timeout=30):
+    season_code = f"{year:02d}{year + 1:02d}"  # e.g., '0304', '0405', ..., '2324'
+    name = league_names[league]
+    url = f"{base_url}/{season_code}/{league}.csv"
+    save_dir = os.path.join(save_root, name)
     file_path = os.path.join(save_dir, f"{name}_20{year:02d}-20{year + 1:02d}.csv")
+
+    headers = {}
+    cached = cache.get(url)
+    if cached and os.path.exists(file_path):
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
     try:
-        response = requests.get(url)
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            return url, 'not_modified', 0, cached
         response.raise_for_status()
-        with open(file_path, "wb") as f:
-            f.write(response.content)
+        os.makedirs(save_dir, exist_ok=True)
+        write_atomic(file_path, response.content)
         print(f"Downloaded: {file_path}")
+        meta = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+        return url, 'downloaded', len(response.content), meta
     except requests.RequestException as e:
         print(f"Failed to download {url}: {e}")
+        return url, 'failed', 0, cached
+
+
+def load_cache(save_root):
+    try:
+        with open(os.path.join(save_root, CACHE_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def download_all(save_root=SAVE_ROOT, league_codes=leagues, seasons=range(start_season, end_season),
+                 workers=8, base_url=BASE_URL):
+    os.makedirs(save_root, exist_ok=True)
+    cache = load_cache(save_root)
+    session = make_session(workers)
+    jobs = [(league, year) for league in league_codes for year in seasons]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            lambda job: download_season_data(session, job[0], job[1], save_root, cache, base_url), jobs))
+    session.close()
+
+    summary = {'downloaded': 0, 'not_modified': 0, 'failed': 0, 'bytes': 0}
+    for url, status, size, meta in results:
+        summary[status] += 1
+        summary['bytes'] += size
+        if meta:
+            cache[url] = meta
+    write_atomic(os.path.join(save_root, CACHE_FILE), json.dumps(cache, indent=1).encode())
+
+    summary['seconds'] = round(time.perf_counter() - start, 2)
+    print(f"Downloaded {summary['downloaded']}, unchanged {summary['not_modified']}, failed {summary['failed']} "
+          f"({summary['bytes'] / 1024:.0f} KB) in {summary['seconds']}s")
+    return summary
 
 
-# 遍历所有赛季
-for league in leagues:
-    if league == ENGLAND:
-        save_dir = "../data/match_data/England"
-        name = 'England'
-    elif league == GERMANY:
-        save_dir = "../data/match_data/Germany"
-        name = 'Germany'
-    elif league == ITALY:
-        save_dir = "../data/match_data/Italy"
-        name = 'Italy'
-    elif league == SPAIN:
-        save_dir = "../data/match_data/Spain"
-        name = 'Spain'
-    else:
-        save_dir = "../data/match_data/France"
-        name = 'France'
-    os.makedirs(save_dir, exist_ok=True)
-    for year in range(start_season, end_season):
-        season_code = f"{year:02d}{year + 1:02d}"  # e.g., '0304', '0405', ..., '2324'
-        download_season_data(league, season_code, year, save_dir, name)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Download football-data.co.uk match CSVs")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--base-url', default=BASE_URL, help="point at a local HTTP server for testing")
+    parser.add_argument('--save-root', default=SAVE_ROOT)
+    args = parser.parse_args()
+    download_all(args.save_root, workers=args.workers, base_url=args.base_url)
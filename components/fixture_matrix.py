@@ -0,0 +1,96 @@
+# components/fixture_matrix.py
+# All-pairs home-vs-away probability matrix from the pre-match model.
+# One scaler + model pass covers every ordered pair; results are cached per model version and odds assumption.
+# A single fixture with one-off odds is scored on its own (predict_fixture).
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from components.model_registry import artifact_version
+from components.predict_match_result_model_pre_match import (
+    build_match_features, implied_probabilities, predict_match_probabilities
+)
+
+# Odds assumed for every fixture when none are given: a typical home / draw / away market
+DEFAULT_ODDS = (2.3, 3.4, 3.2)
+CACHE_SIZE = 32
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+TEAM_FEATURES = ['overall', 'attack', 'midfield', 'defence', 'starting_xi_avg_age']
+
+
+def _cache_key(teams, odds):
+    team_hash = int(pd.util.hash_pandas_object(teams[['team'] + TEAM_FEATURES], index=False).sum())
+    return (
+        artifact_version('pre_match_result_model.pkl'),
+        artifact_version('pre_match_result_scaler.pkl'),
+        tuple(round(float(o), 4) for o in odds),
+        team_hash,
+    )
+
+
+def compute_fixture_matrix(teams, odds=DEFAULT_ODDS):
+    teams = teams.drop_duplicates('team').reset_index(drop=True)
+    n = len(teams)
+    home, away = np.nonzero(~np.eye(n, dtype=bool))
+    prob_h, prob_d, prob_a = implied_probabilities(*odds)
+    proba = predict_match_probabilities(
+        build_match_features(teams.iloc[home], teams.iloc[away], prob_h, prob_d, prob_a))
+
+    names = teams['team'].tolist()
+    home_win = np.full((n, n), np.nan)
+    home_win[home, away] = proba[:, 0]
+    return {
+        'odds': tuple(odds),
+        'implied': (prob_h, prob_d, prob_a),
+        'home_win': pd.DataFrame(home_win, index=names, columns=names),
+        'away_win': pd.DataFrame(1 - home_win, index=names, columns=names),
+    }
+
+
+def fixture_matrix(teams, odds=DEFAULT_ODDS):
+    # Rows are home teams, columns away teams; the diagonal is NaN
+    key = _cache_key(teams, odds)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    matrix = compute_fixture_matrix(teams, odds)
+    with _cache_lock:
+        _cache[key] = matrix
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return matrix
+
+
+def predict_fixture(teams, home_team, away_team, odds=DEFAULT_ODDS):
+    # Home-win probability of one pair, without building (or caching) a whole matrix
+    teams = teams.drop_duplicates('team').set_index('team')
+    proba = predict_match_probabilities(
+        build_match_features(teams.loc[[home_team]], teams.loc[[away_team]], *implied_probabilities(*odds)))
+    return float(proba[0, 0])
+
+
+def lookup_fixture(teams, home_team, away_team, odds=DEFAULT_ODDS):
+    # Reads the matrix when it is already cached for these odds (heatmap, default odds); one-off odds such as the
+    # UI's random draw odds score just the pair, so they never evict useful matrices
+    key = _cache_key(teams, odds)
+    with _cache_lock:
+        matrix = _cache.get(key)
+        if matrix is not None:
+            _cache.move_to_end(key)
+    if matrix is not None:
+        proba_h = float(matrix['home_win'].at[home_team, away_team])
+    else:
+        proba_h = predict_fixture(teams, home_team, away_team, odds)
+    return {
+        "prediction": 'Home Win' if proba_h >= 0.5 else 'Away Win',
+        "probabilities": {
+            "Home Win": round(proba_h, 3),
+            "Away Win": round(1 - proba_h, 3)
+        }
+    }
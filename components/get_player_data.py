@@ -1,9 +1,11 @@
 import os
+import json
+import queue
+import argparse
+import threading
+from html.parser import HTMLParser
 
-import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
 import pandas as pd
-import time
 
 
 def parse_euro(value):
@@ -17,11 +19,6 @@ def parse_euro(value):
         return float(value)
 
 
-# 初始化浏览器
-driver = uc.Chrome(headless=False)
-all_players = []
-column_names = []
-
 # 完整字段 URL
 base_url = (
     "https://sofifa.com/players?type=all&lg%5B0%5D=13&lg%5B1%5D=31&lg%5B2%5D=53&lg%5B3%5D=19&lg%5B4%5D=16&showCol%5B0"
@@ -32,62 +29,217 @@ base_url = (
 years = ['250036', '240050', '230054', '220069', '210064', '200061', '190075', '180084', '170099', '160058', '150059',
          '140052', '130034', '120002', '110002', '100002', '090002', '080002', '070002']
 
-
-for year in years:
-    for offset in range(0, 1320, 60):
-        url = f"{base_url}&r={year}&offset={offset}"
-        print(f"📥 抓取中: {url}")
-        driver.get(url)
-        time.sleep(1)
-
-        try:
-            # 获取字段名：跳过第一个 th（头像图标列）
-            if offset == 0:
-                header = driver.find_elements(By.CSS_SELECTOR, "table thead th")
-                column_names = [th.text.strip() for th in header[1:] if th.text.strip()]
-                print("✅ 获取列名:", column_names)
-
-            # 抓取每一行
-            rows = driver.find_elements(By.CSS_SELECTOR, "table tbody tr")
-            print(f"✅ 第{offset / 60 + 1}页共找到 {len(rows)} 行")
-
-            for row in rows:
-                cols = row.find_elements(By.TAG_NAME, "td")
-                if len(cols) <= 1:
-                    continue
-
-                # 提取完整姓名
-                try:
-                    name_cell = cols[1].find_element(By.CSS_SELECTOR, "a")
-                    full_name = name_cell.get_attribute("data-tippy-content") or name_cell.text.strip()
-                except:
-                    full_name = ""
-
-                # 提取数据（跳过头像列）
-                values = [col.text.strip() for col in cols[1:]]
-
-                # 对齐列数
-                if len(values) < len(column_names):
-                    values += [""] * (len(column_names) - len(values))
-                elif len(values) > len(column_names):
-                    values = values[:len(column_names)]
-
-                row_dict = dict(zip(column_names, values))
-                row_dict["Full Name"] = full_name  # ✅ 插入完整姓名
-
-                all_players.append(row_dict)
-        except Exception as e:
-            print("❌ 页面出错:", e)
+offsets = list(range(0, 1320, 60))
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+default_output_dir = os.path.join(base_path, '..', 'data', 'player_data')
+
+# Tags that start a new line in the browser's rendered text (what WebElement.text used to return)
+BLOCK_TAGS = {'br', 'div', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'ul', 'tr'}
+
+
+# ===== Single-pass page parsing =====
+class PlayerTableParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.header = []
+        self.rows = []
+        self.section = None
+        self.cell = None
+        self.row = None
+        self.name_link = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('thead', 'tbody'):
+            self.section = tag
+        elif tag == 'tr' and self.section == 'tbody':
+            self.row = {'cells': [], 'full_name': ''}
+        elif tag in ('th', 'td') and self.section:
+            self.cell = []
+        elif self.cell is not None:
+            if tag in BLOCK_TAGS:
+                self.cell.append('\n')
+            if tag == 'a' and self.row is not None and len(self.row['cells']) == 1 and not self.row['full_name']:
+                # 提取完整姓名 (second td is the name column)
+                self.name_link = []
+                self.row['full_name'] = dict(attrs).get('data-tippy-content') or ''
+
+    def handle_endtag(self, tag):
+        if tag in ('thead', 'tbody'):
+            self.section = None
+        elif tag == 'a' and self.name_link is not None:
+            if not self.row['full_name']:
+                self.row['full_name'] = ''.join(self.name_link).strip()
+            self.name_link = None
+        elif tag in ('th', 'td') and self.cell is not None:
+            text = self.cell_text()
+            if self.section == 'thead':
+                self.header.append(text)
+            elif self.row is not None:
+                self.row['cells'].append(text)
+            self.cell = None
+        elif tag == 'tr' and self.row is not None:
+            self.rows.append(self.row)
+            self.row = None
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell.append(data)
+        if self.name_link is not None:
+            self.name_link.append(data)
+
+    def cell_text(self):
+        lines = (' '.join(line.split()) for line in ''.join(self.cell).split('\n'))
+        return '\n'.join(line for line in lines if line)
+
+
+def parse_players_page(html):
+    parser = PlayerTableParser()
+    parser.feed(html)
+    # 获取字段名：跳过第一个 th（头像图标列）
+    column_names = [text for text in parser.header[1:] if text]
+
+    players = []
+    for row in parser.rows:
+        cols = row['cells']
+        if len(cols) <= 1:
             continue
-    # 保存结果
+        # 提取数据（跳过头像列）
+        values = cols[1:]
+        # 对齐列数
+        if len(values) < len(column_names):
+            values += [""] * (len(column_names) - len(values))
+        elif len(values) > len(column_names):
+            values = values[:len(column_names)]
+        row_dict = dict(zip(column_names, values))
+        row_dict["Full Name"] = row['full_name']
+        players.append(row_dict)
+    return column_names, players
+
+
+# ===== Checkpoints: one JSON file per scraped (version, offset) page, kept until the year's CSV is written =====
+def checkpoint_path(checkpoint_dir, year, offset):
+    return os.path.join(checkpoint_dir, f"{year}_{offset:04d}.json")
+
+
+def save_checkpoint(checkpoint_dir, year, offset, players):
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    path = checkpoint_path(checkpoint_dir, year, offset)
+    with open(f"{path}.part", "w", encoding="utf-8") as f:
+        json.dump(players, f, ensure_ascii=False)
+    os.replace(f"{path}.part", path)
+
+
+def save_year(year, output_dir, checkpoint_dir, year_offsets=offsets):
+    all_players = []
+    for offset in year_offsets:
+        with open(checkpoint_path(checkpoint_dir, year, offset), encoding="utf-8") as f:
+            all_players.extend(json.load(f))
     df = pd.DataFrame(all_players)
     df["Value"] = df["Value"].apply(parse_euro)
     df["Wage"] = df["Wage"].apply(parse_euro)
-    if not os.path.exists("../data/player_data"):
-        os.makedirs("../data/player_data")
-    df.to_csv(f"../data/player_data/players_stats_20{year[:2]}.csv", index=False, encoding="utf-8-sig")
-    all_players.clear()
+    os.makedirs(output_dir, exist_ok=True)
+    df.to_csv(os.path.join(output_dir, f"players_stats_20{year[:2]}.csv"), index=False, encoding="utf-8-sig")
     print(f"Save data as players_stats_{year[:2]}.csv，include", len(df), " players")
-
-driver.quit()
-
+    # The year is done: drop its pages so the next run scrapes it again instead of skipping it
+    for offset in year_offsets:
+        os.remove(checkpoint_path(checkpoint_dir, year, offset))
+    if not os.listdir(checkpoint_dir):
+        os.rmdir(checkpoint_dir)
+
+
+# ===== Page sources =====
+_driver_lock = threading.Lock()
+
+
+def chrome_fetcher(headless=True, timeout=15):
+    import undetected_chromedriver as uc
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    # undetected_chromedriver patches the driver binary on start; don't let workers race on it
+    with _driver_lock:
+        driver = uc.Chrome(headless=headless)
+
+    def fetch(year, offset):
+        driver.get(f"{base_url}&r={year}&offset={offset}")
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr")))
+        return driver.page_source
+
+    fetch.close = driver.quit
+    return fetch
+
+
+def fixture_fetcher(fixture_dir):
+    # Saved pages named <version>_<offset>.html, used instead of the live site in tests
+    def fetch(year, offset):
+        with open(os.path.join(fixture_dir, f"{year}_{offset}.html"), encoding="utf-8") as f:
+            return f.read()
+
+    fetch.close = lambda: None
+    return fetch
+
+
+def worker(pages, make_fetcher, failed, checkpoint_dir):
+    fetch = make_fetcher()
+    try:
+        while True:
+            try:
+                year, offset = pages.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                _, players = parse_players_page(fetch(year, offset))
+                save_checkpoint(checkpoint_dir, year, offset, players)
+                print(f"✅ {year} offset {offset}: {len(players)} 行")
+            except Exception as e:
+                print(f"❌ 页面出错 {year} offset {offset}:", e)
+                failed.append((year, offset))
+    finally:
+        fetch.close()
+
+
+def scrape(workers=4, make_fetcher=chrome_fetcher, versions=years, output_dir=default_output_dir,
+           year_offsets=offsets):
+    checkpoint_dir = os.path.join(output_dir, '.checkpoint')
+    pages = queue.Queue()
+    for year in versions:
+        for offset in year_offsets:
+            # Resume: pages checkpointed by an earlier (crashed) run are not fetched again
+            if not os.path.exists(checkpoint_path(checkpoint_dir, year, offset)):
+                pages.put((year, offset))
+    print(f"📥 {pages.qsize()} pages to fetch with {workers} worker(s)")
+
+    failed = []
+    threads = [threading.Thread(target=worker, args=(pages, make_fetcher, failed, checkpoint_dir))
+               for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for year in versions:
+        if all(os.path.exists(checkpoint_path(checkpoint_dir, year, offset)) for offset in year_offsets):
+            save_year(year, output_dir, checkpoint_dir, year_offsets)
+    if failed:
+        print(f"{len(failed)} page(s) failed; run again to retry them")
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scrape sofifa player tables")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--show-browser', action='store_true')
+    parser.add_argument('--fixtures', help="directory of saved <version>_<offset>.html pages to parse instead")
+    parser.add_argument('--output-dir', help=f"where the CSVs go (default {os.path.normpath(default_output_dir)}; "
+                                             "required with --fixtures)")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        if not args.output_dir:
+            parser.error("--fixtures needs --output-dir, so fixture runs never overwrite data/player_data")
+        scrape(args.workers, lambda: fixture_fetcher(args.fixtures), output_dir=args.output_dir)
+    else:
+        scrape(args.workers, lambda: chrome_fetcher(headless=not args.show_browser),
+               output_dir=args.output_dir or default_output_dir)
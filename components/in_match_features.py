@@ -0,0 +1,213 @@
+# components/in_match_features.py
+# Feature-building stage for the in-match model: every E0 season CSV under data/in_match_predict is turned
+# into model-ready rows once and stored in the in_match_features table of allData.sl3.
+# A refresh only appends seasons whose file is new or changed; a new FEATURE_VERSION or a changed
+# club_stats.csv rebuilds the table, since every row depends on them.
+#
+#   python -m components.in_match_features            # append new seasons
+#   python -m components.in_match_features --full     # rebuild everything
+import os
+import time
+import sqlite3
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from components.save_data_to_sqlite import file_sha256
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+database_path = os.path.join(base_path, '..', 'data', 'allData.sl3')
+folder_path = os.path.join(base_path, '..', 'data', 'in_match_predict')
+
+# Bump whenever the derived columns below change
+FEATURE_VERSION = 1
+
+FEATURE_COLS = [
+    'HTHG', 'HTAG',
+    'B365H', 'B365D', 'B365A',
+    'BWH', 'BWD', 'BWA',
+    'PSH', 'PSD', 'PSA',
+    'WHH', 'WHD', 'WHA',
+    'AvgH', 'AvgD', 'AvgA',
+    'MaxH', 'MaxD', 'MaxA',
+    'HPos', 'HPlayed', 'HWon', 'HDrawn', 'HLost',
+    'APos', 'APlayed', 'AWon', 'ADrawn', 'ALost',
+    'HWinRate', 'AWinRate',
+    'HDrawRate', 'ADrawRate',
+    'HLossRate', 'ALossRate',
+    'PosDiff', 'PosRatio',
+    'HDRatio', 'HARatio', 'DARatio'
+]
+
+# Identifying columns stored next to the features
+KEY_COLS = ['Season', 'Year', 'Div', 'Date', 'HomeTeam', 'AwayTeam', 'FTR']
+
+BETTING_COLS = [
+    'B365H', 'B365D', 'B365A',
+    'BWH', 'BWD', 'BWA',
+    'PSH', 'PSD', 'PSA',
+    'WHH', 'WHD', 'WHA'
+]
+
+STAT_COLS = ['Position', 'Played', 'Won', 'Drawn', 'Lost']
+
+# Mapping dictionary from short names to full club names
+team_name = {
+    'Man City': 'Manchester City',
+    'Man United': 'Manchester United',
+    'Sheffield United': 'Sheffield United',
+    'West Ham': 'West Ham United',
+    'West Brom': 'West Bromwich Albion',
+    'Brighton': 'Brighton & Hove Albion',
+    'Wolves': 'Wolverhampton Wanderers',
+    'Spurs': 'Tottenham Hotspur',
+    'Tottenham': 'Tottenham Hotspur',
+    'Newcastle': 'Newcastle United',
+    "Nott'm Forest": 'Nottingham Forest',
+    'Leeds': 'Leeds United',
+    'Norwich': 'Norwich City',
+    'Luton': 'Luton Town',
+    'Ipswich': 'Ipswich Town',
+    'Leicester': 'Leicester City',
+}
+
+# One row per ingested season file, tagged with the feature version it was built with
+create_manifest = """CREATE TABLE IF NOT EXISTS in_match_features_manifest (
+    source_file TEXT PRIMARY KEY,
+    season TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    feature_version TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    built_at REAL NOT NULL
+);"""
+
+
+def season_of(file):
+    raw_season = file.split(' ')[1]  # e.g. '2020-2021'
+    start_year, end_year = raw_season.split('-')
+    return f"{start_year}/{end_year[2:]}"  # e.g. '2020/21'
+
+
+def feature_version(club_path):
+    # Rows depend on the code (FEATURE_VERSION) and on club_stats.csv
+    return f"{FEATURE_VERSION}:{file_sha256(club_path)[:12]}"
+
+
+def build_season(file_path, club_df):
+    df = pd.read_csv(file_path)
+    df['Season'] = season_of(os.path.basename(file_path))
+    df['Date'] = pd.to_datetime(df['Date'], dayfirst=True)
+    df['Year'] = df['Date'].dt.year
+    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
+    for col in ['HomeTeam', 'AwayTeam']:
+        df[col] = df[col].map(team_name).fillna(df[col])
+    for col in BETTING_COLS:
+        if col not in df.columns:
+            df[col] = np.nan
+    df[BETTING_COLS] = df[BETTING_COLS].fillna(0)
+
+    # Home / away league-table rows of the same season
+    season_stats = club_df[club_df['Season'] == df['Season'].iloc[0]].drop_duplicates('Club').set_index('Club')
+    for side, team_col in (('H', 'HomeTeam'), ('A', 'AwayTeam')):
+        stats = season_stats.reindex(df[team_col])[STAT_COLS].to_numpy(dtype=float)
+        for i, col in enumerate(['Pos', 'Played', 'Won', 'Drawn', 'Lost']):
+            df[side + col] = stats[:, i]
+
+    # avoid division by zero
+    eps = 1e-6
+
+    # Pre-match form & ranking features
+    df['HWinRate'] = df['HWon'] / (df['HPlayed'] + eps)
+    df['AWinRate'] = df['AWon'] / (df['APlayed'] + eps)
+    df['HDrawRate'] = df['HDrawn'] / (df['HPlayed'] + eps)
+    df['ADrawRate'] = df['ADrawn'] / (df['APlayed'] + eps)
+    df['HLossRate'] = df['HLost'] / (df['HPlayed'] + eps)
+    df['ALossRate'] = df['ALost'] / (df['APlayed'] + eps)
+
+    df['PosDiff'] = df['APos'] - df['HPos']
+    df['PosRatio'] = df['HPos'] / (df['APos'] + eps)
+
+    # Pre-match betting odds features
+    home, draw, away = (df[[f'{b}{r}' for b in ['B365', 'BW', 'PS', 'WH']]].to_numpy(dtype=float)
+                        for r in 'HDA')
+    df['AvgH'], df['AvgD'], df['AvgA'] = home.mean(axis=1), draw.mean(axis=1), away.mean(axis=1)
+    df['MaxH'], df['MaxD'], df['MaxA'] = home.max(axis=1), draw.max(axis=1), away.max(axis=1)
+
+    df['HDRatio'] = df['AvgH'] / (df['AvgD'] + eps)
+    df['HARatio'] = df['AvgH'] / (df['AvgA'] + eps)
+    df['DARatio'] = df['AvgD'] / (df['AvgA'] + eps)
+
+    df = df[KEY_COLS + FEATURE_COLS].copy()
+    df['source_file'] = os.path.basename(file_path)
+    return df
+
+
+def build_features(full=False, folder=folder_path, db_path=database_path):
+    start = time.perf_counter()
+    club_path = os.path.join(folder, 'club_stats.csv')
+    version = feature_version(club_path)
+    files = sorted(file for file in os.listdir(folder) if file.endswith('E0.csv'))
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(create_manifest)
+    stale = conn.execute("SELECT 1 FROM in_match_features_manifest WHERE feature_version != ? LIMIT 1",
+                         (version,)).fetchone()
+    if full or stale:
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS in_match_features")
+            conn.execute("DELETE FROM in_match_features_manifest")
+    known = dict(conn.execute("SELECT source_file, sha256 FROM in_match_features_manifest"))
+
+    changed = []
+    for file in files:
+        sha256 = file_sha256(os.path.join(folder, file))
+        if known.get(file) != sha256:
+            changed.append((file, sha256))
+    removed = [file for file in known if file not in files]
+
+    club_df = None
+    if changed:
+        club_df = pd.read_csv(club_path)
+        club_df.columns = club_df.columns.str.strip()
+
+    # Replacements for all changed seasons land in one transaction
+    rows = 0
+    with conn:
+        has_table = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'in_match_features'").fetchone()
+        for file in removed + [file for file, _ in changed]:
+            if has_table:
+                conn.execute("DELETE FROM in_match_features WHERE source_file = ?", (file,))
+            conn.execute("DELETE FROM in_match_features_manifest WHERE source_file = ?", (file,))
+        for file, sha256 in changed:
+            try:
+                df = build_season(os.path.join(folder, file), club_df)
+            except Exception as e:
+                print(f"Error reading {file}: {e}")
+                continue
+            df.to_sql('in_match_features', conn, if_exists='append', index=False)
+            conn.execute("INSERT INTO in_match_features_manifest VALUES (?, ?, ?, ?, ?, ?)",
+                         (file, df['Season'].iloc[0], sha256, version, len(df), time.time()))
+            rows += len(df)
+        if changed:
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_in_match_features_source ON in_match_features (source_file)")
+    conn.close()
+    print(f"in_match_features (version {version}): {len(changed)} season(s) built ({rows} rows), "
+          f"{len(removed)} removed, {len(files) - len(changed)} unchanged in {time.perf_counter() - start:.2f}s")
+    return rows
+
+
+def load_features(db_path=database_path):
+    # Training / evaluation input: one row per match, ordered by year as the old in-memory pipeline was
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query("SELECT * FROM in_match_features ORDER BY Year, rowid", conn)
+    conn.close()
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build / refresh the in-match feature table")
+    parser.add_argument('--full', action='store_true', help="drop the table and rebuild every season")
+    args = parser.parse_args()
+    build_features(args.full)
@@ -2,22 +2,62 @@ import os
 import numpy as np
 import pandas as pd
 import streamlit as st
-import joblib
+from components.model_registry import load_artifact
+from components.numpy_inference import shared_model
+from components.club_index import ClubIndex
+# Column order the in-match scaler and model were fitted on, shared with the training pipeline
+from components.in_match_features import FEATURE_COLS
+from components import perf
+
+
+eps = 1e-6
+
 
 # ===== Data and model loading =====
-@st.cache_data
-def load_data():
+def read_data():
     base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # 项目根目录
     club_stats = pd.read_csv(os.path.join(base, "data", "club_stats.csv"))
     winrates = pd.read_csv(os.path.join(base, "data", "team_winrates.csv"))
     return club_stats, winrates
 
+
+# Shared by every session of the process, read-only (cache_data would copy both frames per caller)
+@st.cache_resource
+def load_data():
+    return read_data()
+
 def load_model_and_scaler():
-    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    model = joblib.load(os.path.join(base, "models", "in_match_result_model.pkl"))
-    scaler = joblib.load(os.path.join(base, "models", "in_match_result_scaler.pkl"))
+    model = load_artifact("in_match_result_model.pkl")
+    scaler = load_artifact("in_match_result_scaler.pkl")
     return model, scaler
 
+# ===== Feature construction (shared with components/live_scoring.py) =====
+@st.cache_resource
+def load_club_index():
+    club_stats, winrates = read_data()
+    return ClubIndex(club_stats, winrates)
+
+
+def team_features(index, home_team, away_team, season=None):
+    # Latest-season stats unless a season such as '2023/24' is given; IndexError if a team is unknown
+    return index.team_features(home_team, away_team, season)
+
+
+def odds_features(odd_h, odd_d, odd_a):
+    # A single quoted price is used for every bookmaker column, as in the UI
+    return {
+        'B365H': odd_h, 'B365D': odd_d, 'B365A': odd_a,
+        'BWH': odd_h, 'BWD': odd_d, 'BWA': odd_a,
+        'PSH': odd_h, 'PSD': odd_d, 'PSA': odd_a,
+        'WHH': odd_h, 'WHD': odd_d, 'WHA': odd_a,
+        'AvgH': odd_h, 'AvgD': odd_d, 'AvgA': odd_a,
+        'MaxH': odd_h, 'MaxD': odd_d, 'MaxA': odd_a,
+        'HDRatio': odd_h / (odd_d + eps),
+        'HARatio': odd_h / (odd_a + eps),
+        'DARatio': odd_d / (odd_a + eps)
+    }
+
+
 # ===== Betting suggestion function =====
 def betting_recommendation(pred_result, home_winrate, away_winrate, draw_gap=0.05):
     if pred_result == 'H':
@@ -49,46 +89,30 @@ def main():
 
     if st.button("🔮 Predict"):
         try:
-            # 提取每支队伍最新的赛季记录
-            recent_home = club_stats[club_stats["Club"] == home_team].sort_values("Season", ascending=False).iloc[0]
-            recent_away = club_stats[club_stats["Club"] == away_team].sort_values("Season", ascending=False).iloc[0]
-            win_row = winrates[winrates["HomeTeam"] == home_team].iloc[0]
-            away_win_row = winrates[winrates["HomeTeam"] == away_team].iloc[0]
+            team_values = team_features(load_club_index(), home_team, away_team)
         except IndexError:
             st.error("❌ No data found for selected teams.")
             return
 
-        home_winrate, away_winrate = win_row["HomeWinRate"], away_win_row["AwayWinRate"]
-        eps = 1e-6
-
+        home_winrate, away_winrate = team_values["HWinRate"], team_values["AWinRate"]
         df_input = pd.DataFrame([{
             'HTHG': hthg, 'HTAG': htag,
-            'B365H': odd_h, 'B365D': odd_d, 'B365A': odd_a,
-            'BWH': odd_h, 'BWD': odd_d, 'BWA': odd_a,
-            'PSH': odd_h, 'PSD': odd_d, 'PSA': odd_a,
-            'WHH': odd_h, 'WHD': odd_d, 'WHA': odd_a,
-            'AvgH': odd_h, 'AvgD': odd_d, 'AvgA': odd_a,
-            'MaxH': odd_h, 'MaxD': odd_d, 'MaxA': odd_a,
-            'HPos': recent_home["Position"], 'HPlayed': recent_home["Played"],
-            'HWon': recent_home["Won"], 'HDrawn': recent_home["Drawn"], 'HLost': recent_home["Lost"],
-            'APos': recent_away["Position"], 'APlayed': recent_away["Played"],
-            'AWon': recent_away["Won"], 'ADrawn': recent_away["Drawn"], 'ALost': recent_away["Lost"],
-            'HWinRate': home_winrate, 'AWinRate': away_winrate,
-            'HDrawRate': recent_home["Drawn"] / (recent_home["Played"] + eps),
-            'ADrawRate': recent_away["Drawn"] / (recent_away["Played"] + eps),
-            'HLossRate': recent_home["Lost"] / (recent_home["Played"] + eps),
-            'ALossRate': recent_away["Lost"] / (recent_away["Played"] + eps),
-            'PosDiff': recent_away["Position"] - recent_home["Position"],
-            'PosRatio': recent_home["Position"] / (recent_away["Position"] + eps),
-            'HDRatio': odd_h / (odd_d + eps),
-            'HARatio': odd_h / (odd_a + eps),
-            'DARatio': odd_d / (odd_a + eps)
-        }])
-
-        model, scaler = load_model_and_scaler()
-        X_scaled = scaler.transform(df_input)
-        pred_proba = model.predict_proba(X_scaled)[0]
-        label_order = model.classes_
+            **odds_features(odd_h, odd_d, odd_a),
+            **team_values
+        }])[FEATURE_COLS]
+
+        shared = shared_model('in_match_result_model')
+        if shared is None:
+            model, scaler = load_model_and_scaler()
+        with perf.span('predict.in_match'):
+            if shared is not None:
+                # The scaler is folded into the memory-mapped export
+                pred_proba = shared.predict_proba(df_input.to_numpy(dtype=np.float64))[0]
+                label_order = shared.classes_
+            else:
+                X_scaled = scaler.transform(df_input)
+                pred_proba = model.predict_proba(X_scaled)[0]
+                label_order = model.classes_
         pred_label = label_order[np.argmax(pred_proba)]
 
         label_text = {'H': '🏠 Home Win', 'D': '⚖️ Draw', 'A': '🏟️ Away Win'}
@@ -0,0 +1,223 @@
+# components/live_scoring.py
+# Streaming in-play scoring: keeps per-match feature vectors and re-scores matches on score / odds updates.
+#
+# Input is JSON lines, one update per line, e.g.
+#   {"match_id": "m1", "home": "Arsenal", "away": "Chelsea", "hthg": 0, "htag": 0, "odds_h": 2.1, "odds_d": 3.2, "odds_a": 3.6}
+#   {"match_id": "m1", "hthg": 1}
+#   {"match_id": "m1", "odds_h": 1.6}
+# An optional "season" (e.g. "2023/24") scores a historical match with that season's table.
+# Output is one JSON line per update with H/D/A probabilities and latency metrics.
+#
+#   python -m components.live_scoring < updates.jsonl
+#   python -m components.live_scoring --socket 127.0.0.1:9009
+#   python -m components.live_scoring --demo 500
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import socketserver
+from collections import deque
+
+import numpy as np
+
+from components.in_match_predict import FEATURE_COLS, read_data, load_model_and_scaler, odds_features
+from components.club_index import ClubIndex, TEAM_FEATURE_KEYS as TEAM_KEYS
+
+ODDS_KEYS = ['B365H', 'B365D', 'B365A', 'BWH', 'BWD', 'BWA', 'PSH', 'PSD', 'PSA', 'WHH', 'WHD', 'WHA',
+             'AvgH', 'AvgD', 'AvgA', 'MaxH', 'MaxD', 'MaxA', 'HDRatio', 'HARatio', 'DARatio']
+TEAM_IDX = np.array([FEATURE_COLS.index(k) for k in TEAM_KEYS])
+ODDS_IDX = np.array([FEATURE_COLS.index(k) for k in ODDS_KEYS])
+HTHG_IDX, HTAG_IDX = FEATURE_COLS.index('HTHG'), FEATURE_COLS.index('HTAG')
+
+DEFAULT_ODDS = [2.5, 3.2, 3.0]
+METRIC_WINDOW = 10_000
+
+
+class MatchState:
+    __slots__ = ('match_id', 'home', 'away', 'season', 'odds', 'x', 'ready')
+
+    def __init__(self, match_id):
+        self.match_id = match_id
+        self.home = None
+        self.away = None
+        self.season = None
+        self.odds = list(DEFAULT_ODDS)
+        self.x = np.zeros(len(FEATURE_COLS))
+        self.x[ODDS_IDX] = [odds_features(*self.odds)[k] for k in ODDS_KEYS]
+        self.ready = False
+
+
+class LiveScoringEngine:
+    def __init__(self, club_stats=None, winrates=None, model=None, scaler=None):
+        if club_stats is None or winrates is None:
+            club_stats, winrates = read_data()
+        if model is None or scaler is None:
+            model, scaler = load_model_and_scaler()
+        self.index = ClubIndex(club_stats, winrates)
+        self.model = model
+        # StandardScaler applied by hand: avoids sklearn's per-call validation
+        self.mean, self.scale = scaler.mean_, scaler.scale_
+        self.class_idx = [list(model.classes_).index(c) for c in ('H', 'D', 'A')]
+        self.matches = {}
+        self.lock = threading.Lock()
+        self.feature_us = deque(maxlen=METRIC_WINDOW)
+        self.model_us = deque(maxlen=METRIC_WINDOW)
+
+    def apply(self, update):
+        # Recompute only the feature slots touched by this update. Everything that can raise (unknown team or
+        # season, bad odds) is computed first, so a rejected update leaves the match exactly as it was
+        match_id = update['match_id']
+        state = self.matches.get(match_id) or MatchState(match_id)
+
+        teams = None
+        if 'home' in update or 'away' in update or 'season' in update:
+            home = update.get('home', state.home)
+            away = update.get('away', state.away)
+            season = update.get('season', state.season)
+            teams = (home, away, season, self.index.team_vector(home, away, season))
+        odds = None
+        if 'odds_h' in update or 'odds_d' in update or 'odds_a' in update:
+            odds = [update.get('odds_h', state.odds[0]), update.get('odds_d', state.odds[1]),
+                    update.get('odds_a', state.odds[2])]
+            values = odds_features(*odds)
+            odds_vector = [values[k] for k in ODDS_KEYS]
+        goals = [(idx, float(update[key])) for key, idx in (('hthg', HTHG_IDX), ('htag', HTAG_IDX)) if key in update]
+
+        self.matches[match_id] = state
+        if teams is not None:
+            state.home, state.away, state.season, state.x[TEAM_IDX] = teams
+            state.ready = True
+        for idx, goals_at_half in goals:
+            state.x[idx] = goals_at_half
+        if odds is not None:
+            state.odds = odds
+            state.x[ODDS_IDX] = odds_vector
+        return state
+
+    def process_batch(self, updates):
+        results = [None] * len(updates)
+        scored = []
+        with self.lock:
+            for i, update in enumerate(updates):
+                start = time.perf_counter()
+                try:
+                    state = self.apply(update)
+                except (KeyError, IndexError, TypeError, ValueError) as e:
+                    results[i] = {'match_id': update.get('match_id'), 'error': f"{type(e).__name__}: {e}"}
+                    continue
+                feature_us = (time.perf_counter() - start) * 1e6
+                self.feature_us.append(feature_us)
+                if not state.ready:
+                    results[i] = {'match_id': state.match_id, 'error': "home/away teams not set"}
+                    continue
+                scored.append((i, state, feature_us))
+
+            if scored:
+                start = time.perf_counter()
+                X = (np.stack([state.x for _, state, _ in scored]) - self.mean) / self.scale
+                proba = self.model.predict_proba(X)[:, self.class_idx]
+                model_us = (time.perf_counter() - start) * 1e6
+                self.model_us.append(model_us)
+                for (i, state, feature_us), (p_h, p_d, p_a) in zip(scored, proba):
+                    results[i] = {
+                        'match_id': state.match_id,
+                        'H': round(float(p_h), 4), 'D': round(float(p_d), 4), 'A': round(float(p_a), 4),
+                        'feature_us': round(feature_us, 1),
+                        'model_us': round(model_us / len(scored), 1),
+                    }
+        return results
+
+    def metrics(self):
+        def pct(values, q):
+            return round(float(np.percentile(values, q)), 1) if values else None
+
+        feature_us, model_us = list(self.feature_us), list(self.model_us)
+        return {
+            'matches': len(self.matches),
+            'feature_us_p50': pct(feature_us, 50), 'feature_us_p99': pct(feature_us, 99),
+            'model_us_p50': pct(model_us, 50), 'model_us_p99': pct(model_us, 99),
+        }
+
+
+def run_stream(engine, lines, out, batch_size=1):
+    batch = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            update = json.loads(line)
+        except json.JSONDecodeError as e:
+            out.write(json.dumps({'error': f"bad JSON: {e}"}) + "\n")
+            continue
+        if not isinstance(update, dict):
+            out.write(json.dumps({'error': f"expected a JSON object, got {type(update).__name__}"}) + "\n")
+            continue
+        batch.append(update)
+        if len(batch) >= batch_size:
+            for result in engine.process_batch(batch):
+                out.write(json.dumps(result) + "\n")
+            out.flush()
+            batch = []
+    if batch:
+        for result in engine.process_batch(batch):
+            out.write(json.dumps(result) + "\n")
+        out.flush()
+
+
+def serve_socket(engine, host, port, batch_size=1):
+    # Local stand-in for a feed: every TCP connection streams JSON lines in and gets results back
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            lines = io.TextIOWrapper(self.rfile, encoding='utf-8')
+            out = io.TextIOWrapper(self.wfile, encoding='utf-8', write_through=True)
+            run_stream(engine, lines, out, batch_size)
+
+    with socketserver.ThreadingTCPServer((host, port), Handler) as server:
+        print(f"Listening on {host}:{port}", file=sys.stderr)
+        server.serve_forever()
+
+
+def demo_updates(teams, n_matches, n_updates, seed=0):
+    rng = random.Random(seed)
+    for m in range(n_matches):
+        home, away = rng.sample(teams, 2)
+        yield {'match_id': f"m{m}", 'home': home, 'away': away, 'hthg': 0, 'htag': 0,
+               'odds_h': round(rng.uniform(1.5, 4), 2), 'odds_d': round(rng.uniform(2.8, 4), 2),
+               'odds_a': round(rng.uniform(1.5, 5), 2)}
+    for _ in range(n_updates):
+        update = {'match_id': f"m{rng.randrange(n_matches)}"}
+        if rng.random() < 0.2:
+            update[rng.choice(['hthg', 'htag'])] = rng.randint(0, 3)
+        else:
+            update[rng.choice(['odds_h', 'odds_d', 'odds_a'])] = round(rng.uniform(1.2, 6), 2)
+        yield update
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Stream in-play updates through the in-match model")
+    parser.add_argument('--socket', help="HOST:PORT to serve JSON lines over TCP instead of stdin/stdout")
+    parser.add_argument('--batch', type=int, default=1, help="updates scored per model call")
+    parser.add_argument('--demo', type=int, metavar='MATCHES', help="replay random updates for this many matches")
+    args = parser.parse_args()
+
+    engine = LiveScoringEngine()
+    if args.socket:
+        host, port = args.socket.rsplit(':', 1)
+        serve_socket(engine, host, int(port), args.batch)
+    elif args.demo:
+        teams = [club for club in engine.index.clubs
+                 if engine.index.latest[engine.index.club_idx[club]] >= 0
+                 and not np.isnan(engine.index.home_winrate[engine.index.club_idx[club]])]
+        lines = (json.dumps(u) for u in demo_updates(teams, args.demo, args.demo * 20))
+        with open(os.devnull, 'w') as sink:
+            start = time.perf_counter()
+            run_stream(engine, lines, sink, args.batch)
+        print(f"{args.demo * 21} updates in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    else:
+        run_stream(engine, sys.stdin, sys.stdout, args.batch)
+    print(json.dumps(engine.metrics()), file=sys.stderr)
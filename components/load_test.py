@@ -0,0 +1,196 @@
+# components/load_test.py
+# Load generator for components/prediction_service.py: keep-alive HTTP clients on localhost send random but
+# valid requests (teams / players from the bundled data) for a fixed duration, then report throughput,
+# latency percentiles and the batch sizes the service ended up using.
+#
+#   python -m components.load_test --spawn --endpoint in_match --clients 64 --duration 10
+#   python -m components.load_test --url http://127.0.0.1:8765 --endpoint all --processes 4
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import subprocess
+import http.client
+import multiprocessing
+from urllib.parse import urlparse
+
+import numpy as np
+
+from components.prediction_service import DEFAULT_WINDOW_MS
+
+
+# ===== Request payloads =====
+def payload_pool(endpoint, n=2_000, seed=0):
+    rng = random.Random(seed)
+    if endpoint == 'player_value':
+        from components.clean_data import load_table
+        players = load_table('player_stats').sample(n, replace=True, random_state=seed)
+        return [{'Age': int(p.age), 'Height': int(p.height_cm), 'Weight': int(p.weight_kg),
+                 'Potential': int(p.potential), 'Best position': p.best_position, 'Stamina': int(p.stamina),
+                 'Dribbling': int(p.dribbling), 'Short passing': int(p.short_passing)}
+                for p in players.itertuples()]
+    if endpoint == 'pre_match':
+        import sqlite3
+        from components.prediction_service import database_path
+        conn = sqlite3.connect(database_path)
+        teams = [row[0] for row in conn.execute("SELECT DISTINCT team FROM team_stats WHERE year = '2025'")]
+        conn.close()
+        return [dict(zip(('home', 'away'), rng.sample(teams, 2)), odds_h=round(rng.uniform(1.3, 3.5), 2),
+                     odds_d=round(rng.uniform(2.8, 4.5), 2), odds_a=round(rng.uniform(1.5, 4.0), 2))
+                for _ in range(n)]
+    from components.club_index import ClubIndex
+    from components.in_match_predict import read_data
+    index = ClubIndex(*read_data())
+    clubs = [c for c in index.clubs if index.latest[index.club_idx[c]] >= 0
+             and not np.isnan(index.home_winrate[index.club_idx[c]])]
+    return [dict(zip(('home', 'away'), rng.sample(clubs, 2)), hthg=rng.randint(0, 3), htag=rng.randint(0, 3),
+                 odds_h=round(rng.uniform(1.3, 5), 2), odds_d=round(rng.uniform(2.5, 4.5), 2),
+                 odds_a=round(rng.uniform(1.3, 8), 2))
+            for _ in range(n)]
+
+
+# ===== Clients =====
+def client_loop(host, port, requests, stop_at, latencies, errors):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    i = 0
+    while time.perf_counter() < stop_at:
+        path, body = requests[i % len(requests)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request('POST', path, body, headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors.append('connection')
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status != 200:
+            errors.append(response.status)
+    conn.close()
+
+
+def run_clients(host, port, requests, clients, duration, seed=0):
+    # One process' share of the load: `clients` threads, each with its own keep-alive connection
+    rng = random.Random(seed)
+    stop_at = time.perf_counter() + duration
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client_loop,
+                                args=(host, port, rng.sample(requests, len(requests)), stop_at, latencies, errors))
+               for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors
+
+
+def _run_clients_star(args):
+    return run_clients(*args)
+
+
+def get_json(host, port, path, conn=None):
+    own = conn is None
+    conn = conn or http.client.HTTPConnection(host, port, timeout=10)
+    conn.request('GET', path)
+    response = conn.getresponse()
+    body = response.read().decode()
+    if own:
+        conn.close()
+    return body if path == '/metrics' else json.loads(body)
+
+
+def batch_stats(metrics_text):
+    counts = {}
+    for line in metrics_text.splitlines():
+        if line.startswith(('fm_batch_items_total', 'fm_batches_total')):
+            name, value = line.rsplit(' ', 1)
+            counts[name] = float(value)
+    return counts
+
+
+def wait_for_health(host, port, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return get_json(host, port, '/health')
+        except (OSError, http.client.HTTPException):
+            time.sleep(0.5)
+    raise TimeoutError(f"service on {host}:{port} not healthy after {timeout}s")
+
+
+def load_test(url, endpoints, clients=32, processes=1, duration=10.0):
+    parsed = urlparse(url)
+    host, port = parsed.hostname, parsed.port or 80
+    health = wait_for_health(host, port)
+    endpoints = [e for e in endpoints if e in health['endpoints']]
+    if not endpoints:
+        raise SystemExit(f"none of the requested endpoints is served: {health['endpoints']}")
+
+    requests = [(f'/predict/{e}', json.dumps(p)) for e in endpoints for p in payload_pool(e)]
+    # One keep-alive connection for both snapshots: with --workers the same server process answers them,
+    # and the mean batch sizes are that worker's
+    metrics_conn = http.client.HTTPConnection(host, port, timeout=10)
+    before = batch_stats(get_json(host, port, '/metrics', metrics_conn))
+    per_process = max(clients // processes, 1)
+    jobs = [(host, port, requests, per_process, duration, seed) for seed in range(processes)]
+    start = time.perf_counter()
+    if processes == 1:
+        results = [run_clients(*jobs[0])]
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(_run_clients_star, jobs)
+    elapsed = time.perf_counter() - start
+    after = batch_stats(get_json(host, port, '/metrics', metrics_conn))
+    metrics_conn.close()
+
+    latencies = np.array([ms for result in results for ms in result[0]])
+    errors = [e for result in results for e in result[1]]
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (np.nan,) * 3
+    report = {
+        'endpoints': endpoints,
+        'clients': per_process * processes,
+        'requests': int(len(latencies)),
+        'errors': len(errors),
+        'requests_per_s': len(latencies) / elapsed,
+        'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+    }
+    for e in endpoints:
+        items = after.get(f'fm_batch_items_total{{model="{e}"}}', 0) - before.get(f'fm_batch_items_total{{model="{e}"}}', 0)
+        batches = after.get(f'fm_batches_total{{model="{e}"}}', 0) - before.get(f'fm_batches_total{{model="{e}"}}', 0)
+        report[f'{e}_mean_batch'] = items / batches if batches else 0.0
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load-test the prediction service on localhost")
+    parser.add_argument('--url', default='http://127.0.0.1:8765')
+    parser.add_argument('--endpoint', default='in_match', choices=['player_value', 'pre_match', 'in_match', 'all'])
+    parser.add_argument('--clients', type=int, default=32, help="concurrent keep-alive connections in total")
+    parser.add_argument('--processes', type=int, default=1, help="client processes the connections are spread over")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds")
+    parser.add_argument('--spawn', action='store_true', help="start the service for the run and stop it afterwards")
+    parser.add_argument('--window-ms', type=float, default=DEFAULT_WINDOW_MS, help="batch window of a spawned service")
+    parser.add_argument('--workers', type=int, default=1, help="processes of a spawned service")
+    args = parser.parse_args()
+
+    endpoints = ['player_value', 'pre_match', 'in_match'] if args.endpoint == 'all' else [args.endpoint]
+    server = None
+    if args.spawn:
+        parsed = urlparse(args.url)
+        server = subprocess.Popen([sys.executable, '-m', 'components.prediction_service', '--host', parsed.hostname,
+                                   '--port', str(parsed.port or 80), '--window-ms', str(args.window_ms),
+                                   '--workers', str(args.workers)])
+    try:
+        report = load_test(args.url, endpoints, args.clients, args.processes, args.duration)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    for key, value in report.items():
+        print(f"{key:<28}{value:.4g}" if isinstance(value, float) else f"{key:<28}{value}")
@@ -6,6 +6,7 @@ import random
 import pandas as pd
 import sqlite3
 from components.predict_match_result_model_pre_match import predict_match_result
+from components.season_simulator import simulate_season
 
 def run_season_simulation():
     # base_path = os.path.dirname(os.path.abspath(__file__))
@@ -48,5 +49,15 @@ def run_season_simulation():
         for match_num, result in st.session_state['match_results']:
             st.markdown(f"**Match {match_num}:** {result}")
 
+        # League outlook from the pre-match model (Monte Carlo over full seasons)
+        with st.expander("📈 League Outlook (Monte Carlo)"):
+            n_seasons = st.select_slider("Simulated seasons", [1_000, 10_000, 100_000], value=10_000)
+            if st.button("Simulate Seasons"):
+                result = simulate_season(n_seasons=n_seasons)
+                st.dataframe(result['summary'].style.format({
+                    'expected_points': '{:.1f}', 'expected_position': '{:.1f}',
+                    'title_odds': '{:.1%}', 'top4_odds': '{:.1%}', 'relegation_odds': '{:.1%}'
+                }))
+
         st.markdown("</div>", unsafe_allow_html=True)
 
@@ -0,0 +1,112 @@
+# components/model_registry.py
+# Process-wide cache for the pickled models/scalers under models/.
+# Every artifact is unpickled once per process and only reloaded when the file on disk changes.
+import os
+import threading
+import time
+
+from components import perf
+from components.save_data_to_sqlite import file_sha256
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
+
+# Seconds between two stat() calls for the same artifact; within this window the hot path never touches disk
+CHECK_INTERVAL = 2.0
+
+_entries = {}
+_lock = threading.Lock()
+_path_locks = {}
+
+
+def artifact_path(name):
+    return name if os.path.isabs(name) else os.path.join(MODELS_DIR, name)
+
+
+def _path_lock(path):
+    with _lock:
+        if path not in _path_locks:
+            _path_locks[path] = threading.Lock()
+        return _path_locks[path]
+
+
+def _hit(entry):
+    # Sessions read the registry concurrently; += on a shared dict entry is not atomic
+    with _lock:
+        entry['hits'] += 1
+    return entry['obj']
+
+
+def load_artifact(name):
+    path = artifact_path(name)
+    entry = _entries.get(path)
+    now = time.monotonic()
+    if entry is not None and now - entry['checked_at'] < CHECK_INTERVAL:
+        return _hit(entry)
+
+    with _path_lock(path):
+        entry = _entries.get(path)
+        if entry is not None and time.monotonic() - entry['checked_at'] < CHECK_INTERVAL:
+            return _hit(entry)
+
+        stat = os.stat(path)
+        if entry is not None:
+            if (entry['mtime_ns'], entry['size']) == (stat.st_mtime_ns, stat.st_size):
+                entry['checked_at'] = time.monotonic()
+                return _hit(entry)
+            # mtime changed: only unpickle again if the content did too (e.g. `touch` or a re-copy)
+            sha256 = file_sha256(path)
+            if sha256 == entry['sha256']:
+                entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size, checked_at=time.monotonic())
+                return _hit(entry)
+        else:
+            sha256 = file_sha256(path)
+
+        # Imported on first load: pages that never touch a model don't pay for joblib
+        import joblib
+
+        start = time.perf_counter()
+        with perf.span(f'model_load.{name}'):
+            obj = joblib.load(path)
+        elapsed = time.perf_counter() - start
+
+        previous = entry or {'loads': 0, 'load_seconds': 0.0, 'hits': 0}
+        # Replaced under _lock, which also guards the hit counts
+        with _lock:
+            _entries[path] = {
+                'obj': obj,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'sha256': sha256,
+                'checked_at': time.monotonic(),
+                'loads': previous['loads'] + 1,
+                'load_seconds': previous['load_seconds'] + elapsed,
+                'last_load_seconds': elapsed,
+                'hits': previous['hits'],
+            }
+        return obj
+
+
+def artifact_version(name):
+    # Short content hash of a loaded artifact, used to key caches and materialized tables
+    path = artifact_path(name)
+    if path not in _entries:
+        load_artifact(name)
+    return _entries[path]['sha256'][:12]
+
+
+def registry_stats():
+    return {
+        os.path.basename(path): {
+            'loads': entry['loads'],
+            'hits': entry['hits'],
+            'load_seconds': round(entry['load_seconds'], 4),
+            'last_load_seconds': round(entry['last_load_seconds'], 4),
+            'sha256': entry['sha256'][:12],
+        }
+        for path, entry in list(_entries.items())
+    }
+
+
+def clear_registry():
+    with _lock:
+        _entries.clear()
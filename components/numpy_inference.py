@@ -0,0 +1,311 @@
+# components/numpy_inference.py
+# Export the shipped sklearn models to flat NumPy artifacts and predict with NumPy only.
+#   forests  -> concatenated tree node arrays (children, feature, threshold, leaf values)
+#   logistic -> coefficients + intercept, and whether predict_proba is softmax or one-vs-rest
+# Scalers are folded into the same .npz as mean / scale vectors.
+#
+#   python -m components.numpy_inference            # export + parity check + latency comparison
+#
+# With SHARED_MODELS=1 the app predicts from these exports instead of the pickles. They are unpacked
+# once into plain .npy files under models/shared/ and memory-mapped read-only, so every app / worker
+# process on the box maps the same page-cache pages instead of unpickling its own copy of each forest.
+import os
+import time
+import shutil
+import threading
+
+import numpy as np
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
+SHARED_MODELS = os.environ.get('SHARED_MODELS') == '1'
+
+# artifact name -> (pickled model, pickled scaler or None)
+EXPORTS = {
+    'player_value_model': ('player_value_model.pkl', None),
+    'in_match_result_model': ('in_match_result_model.pkl', 'in_match_result_scaler.pkl'),
+    'pre_match_result_model': ('pre_match_result_model.pkl', 'pre_match_result_scaler.pkl'),
+}
+
+
+# ===== Export (needs sklearn / joblib) =====
+def _forest_arrays(model):
+    trees = [est.tree_ for est in model.estimators_]
+    sizes = np.array([t.node_count for t in trees])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    def shifted(children, offset):
+        return np.where(children >= 0, children + offset, -1)
+
+    values = []
+    for t in trees:
+        value = t.value[:, 0, :].astype(np.float64)
+        if hasattr(model, 'classes_'):
+            value = value / value.sum(axis=1, keepdims=True)
+        values.append(value)
+
+    return {
+        'kind': np.array('forest_classifier' if hasattr(model, 'classes_') else 'forest_regressor'),
+        'roots': offsets.astype(np.int64),
+        'left': np.concatenate([shifted(t.children_left, o) for t, o in zip(trees, offsets)]).astype(np.int64),
+        'right': np.concatenate([shifted(t.children_right, o) for t, o in zip(trees, offsets)]).astype(np.int64),
+        'feature': np.concatenate([t.feature for t in trees]).astype(np.int64),
+        'threshold': np.concatenate([t.threshold for t in trees]),
+        'missing_left': np.concatenate([
+            t.missing_go_to_left if hasattr(t, 'missing_go_to_left') else np.zeros(t.node_count, dtype=np.uint8)
+            for t in trees]).astype(bool),
+        'value': np.concatenate(values),
+        'max_depth': np.array(max(t.max_depth for t in trees)),
+    }
+
+
+def _logistic_arrays(model):
+    # Same rule as LogisticRegression.predict_proba: one-vs-rest for binary problems, liblinear or
+    # multi_class='ovr', softmax (multinomial) otherwise
+    multi_class = getattr(model, 'multi_class', 'auto')
+    ovr = multi_class == 'ovr' or (multi_class in ('auto', 'deprecated', 'warn')
+                                   and (len(model.classes_) <= 2 or model.solver == 'liblinear'))
+    return {
+        'kind': np.array('logistic'),
+        'coef': model.coef_.astype(np.float64),
+        'intercept': model.intercept_.astype(np.float64),
+        'multinomial': np.array(not ovr),
+    }
+
+
+def export_model(name, models_dir=MODELS_DIR):
+    import joblib
+    from components.model_registry import artifact_path
+    from components.save_data_to_sqlite import file_sha256
+
+    model_file, scaler_file = EXPORTS[name]
+    model = joblib.load(artifact_path(model_file))
+    arrays = _forest_arrays(model) if hasattr(model, 'estimators_') else _logistic_arrays(model)
+    if hasattr(model, 'classes_'):
+        arrays['classes'] = np.asarray(model.classes_)
+    if hasattr(model, 'feature_names_in_'):
+        arrays['feature_names'] = np.asarray(model.feature_names_in_, dtype=str)
+    arrays['source_sha256'] = np.array(file_sha256(artifact_path(model_file)))
+    if scaler_file:
+        scaler = joblib.load(artifact_path(scaler_file))
+        arrays['scaler_mean'] = scaler.mean_.astype(np.float64)
+        arrays['scaler_scale'] = scaler.scale_.astype(np.float64)
+    path = os.path.join(models_dir, f"{name}.npz")
+    np.savez(path, **arrays)
+    print(f"Exported {model_file} -> {os.path.basename(path)} ({os.path.getsize(path) / 1024:.0f} KB)")
+    return path
+
+
+# ===== Runtime (NumPy only) =====
+class NumpyModel:
+    def __init__(self, path, mmap=False):
+        if mmap:
+            # path is a directory written by unpack_shared(): one read-only mapping per array, viewed as a
+            # plain ndarray (np.memmap's subclass hooks cost more than the tree walk on small batches)
+            self.arrays = {file[:-4]: np.load(os.path.join(path, file), mmap_mode='r').view(np.ndarray)
+                           for file in os.listdir(path) if file.endswith('.npy')}
+        else:
+            with np.load(path, allow_pickle=False) as data:
+                self.arrays = {key: data[key] for key in data.files}
+        self.kind = str(self.arrays['kind'])
+        self.classes_ = self.arrays.get('classes')
+        self.feature_names = self.arrays.get('feature_names')
+        self.mean = self.arrays.get('scaler_mean')
+        self.scale = self.arrays.get('scaler_scale')
+
+    @property
+    def feature_names_in_(self):
+        # Same attribute as the sklearn model, so encode_players can lay out columns for either
+        return self.feature_names
+
+    def _prepare(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if self.mean is not None:
+            X = (X - self.mean) / self.scale
+        return X
+
+    def _leaf_values(self, X):
+        a = self.arrays
+        left, right, feature, threshold, missing_left = (
+            a['left'], a['right'], a['feature'], a['threshold'], a['missing_left'])
+        # sklearn evaluates trees on float32 inputs; do the same so thresholds split identically
+        X = X.astype(np.float32)
+        n_rows, n_trees = len(X), len(a['roots'])
+        node = np.tile(a['roots'], n_rows)
+        row = np.repeat(np.arange(n_rows), n_trees)
+        # Walk all (row, tree) pairs level by level, dropping pairs as soon as they reach a leaf
+        active = np.flatnonzero(left[node] >= 0)
+        while active.size:
+            current = node[active]
+            x = X[row[active], feature[current]]
+            go_left = np.where(np.isnan(x), missing_left[current], x <= threshold[current])
+            current = np.where(go_left, left[current], right[current])
+            node[active] = current
+            active = active[left[current] >= 0]
+        node = node.reshape(n_rows, n_trees)
+        return a['value'][node]  # (rows, trees, outputs)
+
+    def predict_proba(self, X):
+        X = self._prepare(X)
+        if self.kind == 'logistic':
+            decision = X @ self.arrays['coef'].T + self.arrays['intercept']
+            if decision.shape[1] == 1:
+                p = 1 / (1 + np.exp(-decision[:, 0]))
+                return np.column_stack([1 - p, p])
+            if self.arrays.get('multinomial', False):
+                decision = decision - decision.max(axis=1, keepdims=True)
+                p = np.exp(decision)
+            else:
+                # one-vs-rest (liblinear), normalised as in sklearn; exports without the flag predate it
+                p = 1 / (1 + np.exp(-decision))
+            return p / p.sum(axis=1, keepdims=True)
+        return self._leaf_values(X).mean(axis=1)
+
+    def predict(self, X):
+        if self.kind == 'forest_regressor':
+            return self._leaf_values(self._prepare(X)).mean(axis=1)[:, 0]
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def load_numpy_model(name, models_dir=MODELS_DIR, mmap=False):
+    path = os.path.join(models_dir, f"{name}.npz")
+    mtime = os.path.getmtime(path)
+    with _loaded_lock:
+        cached = _loaded.get((path, mmap))
+        if cached is None or cached[0] != mtime:
+            model = NumpyModel(unpack_shared(name, models_dir), mmap=True) if mmap else NumpyModel(path)
+            cached = _loaded[(path, mmap)] = (mtime, model)
+        return cached[1]
+
+
+# ===== Memory-mapped exports shared across processes =====
+def unpack_shared(name, models_dir=MODELS_DIR):
+    # .npz members cannot be memory-mapped: write them out once as .npy files, one directory per export
+    path = os.path.join(models_dir, f"{name}.npz")
+    shared_dir = os.path.join(models_dir, 'shared')
+    target = os.path.join(shared_dir, f"{name}-{os.stat(path).st_mtime_ns}")
+    if os.path.isdir(target):
+        return target
+    tmp_dir = f"{target}.{os.getpid()}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    with np.load(path, allow_pickle=False) as data:
+        for key in data.files:
+            np.save(os.path.join(tmp_dir, f"{key}.npy"), data[key])
+    try:
+        # Atomic publish: a worker never maps a half-written directory
+        os.rename(tmp_dir, target)
+    except OSError:
+        # Another worker published it first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return target
+    # Older unpacked versions; processes still mapping them keep their pages until they reload
+    for old in os.listdir(shared_dir):
+        if old.startswith(f"{name}-") and not old.endswith('.tmp') and old != os.path.basename(target):
+            shutil.rmtree(os.path.join(shared_dir, old), ignore_errors=True)
+    print(f"Unpacked {name}.npz for memory mapping -> {os.path.relpath(target, models_dir)}")
+    return target
+
+
+_current = {}
+
+
+def shared_model(name, models_dir=MODELS_DIR, enabled=None):
+    # Memory-mapped NumpyModel when enabled (default: SHARED_MODELS=1) and the export was made from the
+    # pickle currently on disk; None otherwise, and the caller keeps using the pickled sklearn model
+    if not (SHARED_MODELS if enabled is None else enabled):
+        return None
+    model_path = os.path.join(models_dir, EXPORTS[name][0])
+    export_path = os.path.join(models_dir, f"{name}.npz")
+    try:
+        key = (name, os.stat(model_path).st_mtime_ns, os.stat(export_path).st_mtime_ns)
+    except FileNotFoundError:
+        return None
+    if key not in _current:
+        from components.save_data_to_sqlite import file_sha256
+
+        with np.load(export_path, allow_pickle=False) as data:
+            _current[key] = str(data['source_sha256']) == file_sha256(model_path)
+        if not _current[key]:
+            print(f"{name}.npz is older than {EXPORTS[name][0]}: re-run python -m components.numpy_inference "
+                  f"to share it again; using the pickle meanwhile")
+    return load_numpy_model(name, models_dir, mmap=True) if _current[key] else None
+
+
+# ===== Parity check and latency comparison against sklearn =====
+def _sample_inputs(name, n, seed=0):
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    if name == 'player_value_model':
+        from components.clean_data import load_table
+        from components.predict_player_value_model import encode_players, load_player_value_model
+        players = load_table('player_stats')
+        return encode_players(players.sample(n, replace=True, random_state=seed), load_player_value_model())
+    if name == 'in_match_result_model':
+        from components.in_match_predict import FEATURE_COLS, read_data, odds_features
+        from components.club_index import ClubIndex
+        index = ClubIndex(*read_data())
+        clubs = [c for c in index.clubs if index.latest[index.club_idx[c]] >= 0
+                 and not np.isnan(index.home_winrate[index.club_idx[c]])]
+        rows = []
+        for _ in range(n):
+            home, away = rng.choice(clubs, 2, replace=False)
+            odds = rng.uniform([1.3, 2.5, 1.3], [5, 4.5, 8])
+            rows.append({'HTHG': rng.integers(0, 4), 'HTAG': rng.integers(0, 4),
+                         **odds_features(*odds), **index.team_features(home, away)})
+        return pd.DataFrame(rows)[FEATURE_COLS]
+    from components.predict_match_result_model_pre_match import FEATURES
+    probs = rng.dirichlet([4, 2.5, 3], n)
+    diffs = rng.normal(0, 5, (n, 5))
+    return pd.DataFrame(np.column_stack([probs, diffs]), columns=FEATURES)
+
+
+def check_parity(name, n=10_000, repeat=20):
+    from components.model_registry import load_artifact
+
+    model_file, scaler_file = EXPORTS[name]
+    model = load_artifact(model_file)
+    scaler = load_artifact(scaler_file) if scaler_file else None
+    fast = load_numpy_model(name)
+    X = _sample_inputs(name, n)
+
+    def sklearn_predict(frame):
+        features = scaler.transform(frame) if scaler is not None else frame
+        return model.predict(features) if fast.kind == 'forest_regressor' else model.predict_proba(features)
+
+    def numpy_predict(frame):
+        values = frame.to_numpy(dtype=np.float64)
+        return fast.predict(values) if fast.kind == 'forest_regressor' else fast.predict_proba(values)
+
+    max_diff = float(np.max(np.abs(sklearn_predict(X) - numpy_predict(X))))
+    assert max_diff < 1e-9, f"{name}: NumPy export differs from sklearn by {max_diff}"
+
+    def latency(fn, frame, times):
+        start = time.perf_counter()
+        for _ in range(times):
+            fn(frame)
+        return (time.perf_counter() - start) / times * 1000
+
+    one = X.iloc[:1]
+    report = {
+        'max_abs_diff': max_diff,
+        'sklearn_1_row_ms': latency(sklearn_predict, one, repeat),
+        'numpy_1_row_ms': latency(numpy_predict, one, repeat),
+        'sklearn_10k_rows_ms': latency(sklearn_predict, X, 3),
+        'numpy_10k_rows_ms': latency(numpy_predict, X, 3),
+    }
+    print(f"{name}: " + ", ".join(f"{k}={v:.4g}" for k, v in report.items()))
+    return report
+
+
+if __name__ == '__main__':
+    for name, (model_file, _) in EXPORTS.items():
+        if not os.path.exists(os.path.join(MODELS_DIR, model_file)):
+            print(f"Skipping {name}: {model_file} not found")
+            continue
+        export_model(name)
+        check_parity(name)
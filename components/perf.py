@@ -0,0 +1,255 @@
+# components/perf.py
+# Lightweight timing spans for Streamlit reruns (sections, model loads, SQL queries, predictions).
+# Spans are only recorded while a rerun is being profiled: the sidebar performance panel is on, or
+# PERF_EXPORT_PATH is set. Otherwise span() hands back a shared no-op context manager.
+#
+#   PERF_EXPORT_PATH=data/perf.prom  streamlit run app.py   # Prometheus text file, rewritten after each rerun
+#   PERF_EXPORT_PATH=data/perf.jsonl streamlit run app.py   # one JSON line per rerun
+import os
+import json
+import time
+import threading
+import contextlib
+import functools
+from collections import defaultdict, deque
+
+EXPORT_PATH = os.environ.get('PERF_EXPORT_PATH')
+WINDOW = 1_000  # samples kept per span for the percentiles
+
+# Streamlit runs every session's script in its own thread: the rerun being profiled is thread-local
+_local = threading.local()
+_samples = defaultdict(lambda: deque(maxlen=WINDOW))
+_samples_lock = threading.Lock()
+_export_lock = threading.Lock()
+_NOOP = contextlib.nullcontext()
+
+# First render of each mode in this process (imports + data loading + model loads), always recorded
+_first_render = {}
+
+
+class _Span:
+    __slots__ = ('name', 'start', 'spans')
+
+    def __init__(self, name, spans):
+        self.name = name
+        self.spans = spans
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.spans.append((self.name, (time.perf_counter() - self.start) * 1000))
+        return False
+
+
+def span(name):
+    spans = getattr(_local, 'spans', None)
+    return _NOOP if spans is None else _Span(name, spans)
+
+
+def timed(name):
+    # Decorator form of span() for functions called from several places
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            spans = getattr(_local, 'spans', None)
+            if spans is None:
+                return fn(*args, **kwargs)
+            with _Span(name, spans):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ===== Rerun lifecycle (called from app.py) =====
+def start_rerun(enabled):
+    _local.spans = [] if enabled or EXPORT_PATH else None
+    _local.started = time.perf_counter()
+
+
+def end_rerun():
+    spans = getattr(_local, 'spans', None)
+    _local.spans = None
+    if spans is None:
+        return
+    spans.append(('rerun', (time.perf_counter() - _local.started) * 1000))
+    with _samples_lock:
+        for name, ms in spans:
+            _samples[name].append(ms)
+    if EXPORT_PATH:
+        export(spans)
+
+
+def record(name, ms):
+    # For callers outside a Streamlit rerun (e.g. components/prediction_service.py): always recorded
+    with _samples_lock:
+        _samples[name].append(ms)
+
+
+def record_first_render(mode, started):
+    # Cheap enough to run on every rerun: only the first call per mode stores and prints anything
+    if mode in _first_render:
+        return
+    ms = (time.perf_counter() - started) * 1000
+    with _samples_lock:
+        if mode in _first_render:
+            return
+        _first_render[mode] = ms
+    print(f"Startup: first render of '{mode}' took {ms:.0f} ms")
+
+
+def startup_report():
+    return dict(_first_render)
+
+
+# ===== Aggregation and export =====
+def summary():
+    # Per span: count and p50 / p95 / p99 / mean in milliseconds over the last WINDOW samples
+    import numpy as np
+
+    with _samples_lock:
+        snapshot = {name: np.array(values) for name, values in _samples.items() if values}
+    rows = []
+    for name, values in sorted(snapshot.items()):
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        rows.append({'span': name, 'count': len(values), 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+                     'mean_ms': values.mean()})
+    return rows
+
+
+def prometheus_text():
+    lines = ['# HELP fm_span_seconds Span durations of Streamlit reruns / service requests (recent window)',
+             '# TYPE fm_span_seconds summary']
+    for row in summary():
+        label = f'span="{row["span"]}"'
+        for q in ('50', '95', '99'):
+            lines.append(f'fm_span_seconds{{{label},quantile="0.{q}"}} {row[f"p{q}_ms"] / 1000:.6f}')
+        lines.append(f'fm_span_seconds_count{{{label}}} {row["count"]}')
+        lines.append(f'fm_span_seconds_sum{{{label}}} {row["mean_ms"] * row["count"] / 1000:.6f}')
+    memory = process_memory()
+    lines += ['# HELP fm_process_resident_bytes Resident memory of this server process',
+              '# TYPE fm_process_resident_bytes gauge']
+    for kind in ('rss', 'private', 'shared'):
+        if memory[f'{kind}_mb'] is not None:
+            lines.append(f'fm_process_resident_bytes{{pid="{os.getpid()}",kind="{kind}"}} '
+                         f'{memory[f"{kind}_mb"] * 2**20:.0f}')
+    sessions = active_sessions()
+    if sessions is not None:
+        lines += ['# TYPE fm_active_sessions gauge', f'fm_active_sessions{{pid="{os.getpid()}"}} {sessions}']
+    return "\n".join(lines) + "\n"
+
+
+def export(spans, path=None):
+    path = path or EXPORT_PATH
+    with _export_lock:
+        if path.endswith('.jsonl'):
+            record = {'ts': time.time(), 'thread': threading.current_thread().name,
+                      'spans': [{'span': name, 'ms': round(ms, 3)} for name, ms in spans]}
+            with open(path, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+        else:
+            # Write-then-rename so a scraper never reads a half-written file
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(prometheus_text())
+            os.replace(tmp_path, path)
+
+
+# ===== Per-session memory =====
+def deep_size(obj, seen=None):
+    # Approximate bytes held by obj: containers and slotted records are walked, DataFrames use memory_usage
+    import sys
+
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if hasattr(obj, 'memory_usage') and hasattr(obj, 'columns'):
+        return int(obj.memory_usage(deep=True).sum())
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif hasattr(obj, '__slots__'):
+        size += sum(deep_size(getattr(obj, slot, None), seen) for slot in obj.__slots__)
+    elif hasattr(obj, '__dict__'):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+# ===== Process memory =====
+def process_memory(pid='self'):
+    # Resident memory in MB. 'private' is anonymous memory (unpickled models, DataFrames, session state);
+    # 'shared' is file-backed / shared memory (memory-mapped caches and models), which the page cache
+    # holds once for every process mapping the same files
+    fields = {}
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('VmRSS', 'RssAnon', 'RssFile', 'RssShmem'):
+                    fields[key] = int(value.split()[0]) / 1024
+    except OSError:
+        # Not Linux: only the peak RSS of this process is available
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {'rss_mb': peak / (2**20 if sys.platform == 'darwin' else 1024), 'private_mb': None, 'shared_mb': None}
+    return {'rss_mb': fields.get('VmRSS', 0.0), 'private_mb': fields.get('RssAnon', 0.0),
+            'shared_mb': fields.get('RssFile', 0.0) + fields.get('RssShmem', 0.0)}
+
+
+def active_sessions():
+    # Number of browser sessions connected to this server process (None outside `streamlit run`)
+    try:
+        from streamlit import runtime
+        return runtime.get_instance()._session_mgr.num_active_sessions()
+    except Exception:
+        return None
+
+
+def memory_report(session_state=None):
+    report = process_memory()
+    report['pid'] = os.getpid()
+    report['sessions'] = active_sessions()
+    if session_state is not None:
+        report['session_kb'] = deep_size({key: session_state[key] for key in session_state}) / 1024
+    if report['sessions'] and report['private_mb'] is not None:
+        # What one more session costs once the shared assets are loaded is closer to session_kb;
+        # this is the average share of the process' private memory
+        report['private_mb_per_session'] = report['private_mb'] / report['sessions']
+    return report
+
+
+def reset():
+    with _samples_lock:
+        _samples.clear()
+
+
+def render_panel():
+    import pandas as pd
+    import streamlit as st
+
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        memory = memory_report(st.session_state)
+        st.caption(f"Session state: {memory['session_kb']:,.1f} KB")
+        if memory['private_mb'] is None:
+            st.caption(f"Process {memory['pid']}: peak RSS {memory['rss_mb']:,.0f} MB")
+        else:
+            sessions = f", {memory['sessions']} session(s)" if memory['sessions'] else ""
+            st.caption(f"Process {memory['pid']}: RSS {memory['rss_mb']:,.0f} MB "
+                       f"({memory['private_mb']:,.0f} MB private, {memory['shared_mb']:,.0f} MB shared{sessions})")
+        if _first_render:
+            st.caption("First render per mode: " +
+                       ", ".join(f"{mode} {ms:.0f} ms" for mode, ms in _first_render.items()))
+        rows = summary()
+        if not rows:
+            st.caption("No spans recorded yet: interact with the page to collect timings.")
+            return
+        df = pd.DataFrame(rows).set_index('span')
+        st.dataframe(df.style.format({'p50_ms': '{:.1f}', 'p95_ms': '{:.1f}', 'p99_ms': '{:.1f}',
+                                      'mean_ms': '{:.1f}'}))
+        if st.button("Clear timings"):
+            reset()
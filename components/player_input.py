@@ -1,19 +1,20 @@
 # components/player_input.py
-import os
-
 import streamlit as st
-import pandas as pd
-import sqlite3
 from components.predict_player_value_model import predict_player_value
+from components.player_value_table import player_value
+from components.player_query import list_positions, count_players, top_players
+from components.clean_data import load_table
+from components.squad import Player
 
 
-@st.cache_data
+# The app's preset picker queries SQLite through player_query; this full-table frame is only built by
+# benchmark.py. Columns are views on the memory-mapped player_stats cache (see components/clean_data.py),
+# so it is cheap to rebuild and needs no Streamlit cache
 def load_players():
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    database_path = os.path.join(base_path, '..', 'data', 'allData.sl3')
-    conn = sqlite3.connect(database_path)
-    df = pd.read_sql_query("select * from player_stats", conn)
-    conn.close()
+    df = load_table('player_stats', columns=[
+        'id', 'full_name', 'age', 'height_cm', 'weight_kg', 'potential', 'best_position',
+        'stamina', 'dribbling', 'short_passing', 'year'
+    ])
     df.rename(columns={
         'full_name': 'Full Name',
         'age': 'Age',
@@ -26,13 +27,10 @@ def load_players():
         'weight_kg': 'Weight'
     }, inplace=True)
 
-    return df[[
-        'Full Name', 'Age', 'Height', 'Weight', 'Potential', 'Best position',
-        'Stamina', 'Dribbling', 'Short passing', 'year'
-    ]].dropna()
-
-
-preset_df = load_players()
+    # dropna() always copies; only pay for it when there is something to drop
+    if df.isna().any(axis=None):
+        df = df.dropna()
+    return df
 
 
 def handle_player_input(mode):
@@ -43,7 +41,7 @@ def handle_player_input(mode):
         height = st.sidebar.number_input("Height (cm)", 150, 220, 180)
         weight = st.sidebar.number_input("Weight (kg)", 50, 120, 75)
         potential = st.sidebar.slider("Potential", 40, 100, 80)
-        position = st.sidebar.selectbox("Best Position", sorted(preset_df['Best position'].dropna().unique()))
+        position = st.sidebar.selectbox("Best Position", list_positions())
         stamina = st.sidebar.slider("Stamina", 20, 100, 70)
         dribbling = st.sidebar.slider("Dribbling", 20, 100, 70)
         short_passing = st.sidebar.slider("Short Passing", 20, 100, 70)
@@ -60,9 +58,8 @@ def handle_player_input(mode):
                 'Dribbling': dribbling,
                 'Short passing': short_passing
             }
-            value = round(predict_player_value(input_data), 2)
-            input_data['Value'] = format(value, ',.2f')
-            st.session_state['current_player'] = input_data
+            value = predict_player_value(input_data)
+            st.session_state['current_player'] = Player.from_input(input_data, value)
             st.sidebar.success(f"Estimated Value: €{value:,.0f}")
 
     elif mode == "Choose Preset Player":
@@ -72,37 +69,32 @@ def handle_player_input(mode):
             st.session_state['position_filter'] = []
         st.session_state['position_filter'] = st.sidebar.multiselect(
             "Filter by Position",
-            sorted(preset_df['Best position'].dropna().unique()),
+            list_positions(),
             default=st.session_state['position_filter']
         )
         position_filter = st.session_state['position_filter']
-        filtered_df = preset_df.copy()
-        filtered_df = filtered_df[filtered_df['year'] == '2025']
-        if position_filter:
-            filtered_df = filtered_df[filtered_df['Best position'].isin(position_filter)]
-        if search_name:
-            filtered_df = filtered_df[filtered_df['Full Name'].str.contains(search_name, case=False)]
-        st.sidebar.markdown(f"Available Preset Players: **{len(filtered_df['Full Name'].unique())}**")
+        st.sidebar.markdown(
+            f"Available Preset Players: **{count_players('2025', position_filter, search_name)}**")
 
         # Recommended top 10 players (sorted by potential)
-        filtered_df['Potential'] = pd.to_numeric(filtered_df['Potential'], errors='coerce')
-        recommended_df = filtered_df.sort_values(by='Potential', ascending=False).head(10)
+        recommended_df = top_players('2025', position_filter, search_name, limit=10)
         st.markdown("Top 10 Recommended Players")
         st.dataframe(recommended_df[['Full Name', 'Age', 'Potential', 'Stamina', 'Dribbling', 'Short passing']])
         selected = st.radio("Choose Recommended Players", recommended_df['Full Name'].tolist(), index=0)
         player_row = recommended_df[recommended_df['Full Name'] == selected].iloc[0]
         input_data = {
             'Name': player_row['Full Name'],
-            'Age': player_row['Age'],
-            'Height': int(float(str(player_row['Height']).strip())),
-            'Weight': int(float(str(player_row['Weight']).strip())),
-            'Potential': float(str(player_row['Potential']).split('\n')[0]),
+            'Age': int(player_row['Age']),
+            'Height': int(player_row['Height']),
+            'Weight': int(player_row['Weight']),
+            'Potential': float(player_row['Potential']),
             'Best position': player_row['Best position'],
-            'Stamina': float(str(player_row['Stamina']).split('\n')[0]),
-            'Dribbling': float(str(player_row['Dribbling']).split('\n')[0]),
-            'Short passing': float(str(player_row['Short passing']).split('\n')[0])
+            'Stamina': float(player_row['Stamina']),
+            'Dribbling': float(player_row['Dribbling']),
+            'Short passing': float(player_row['Short passing'])
         }
-        value = predict_player_value(input_data)
-        input_data['Value'] = round(value, 2)
-        st.session_state['current_player'] = input_data
+        # Preset players are valued from their full player_stats row, like the precompute job: the stored value,
+        # or one computed and stored now if the row is not materialized yet
+        value = player_value(player_row['id'])
+        st.session_state['current_player'] = Player.from_input(input_data, value, player_id=int(player_row['id']))
         st.sidebar.success(f"Estimated Value: €{value:,.0f}")
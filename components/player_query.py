@@ -0,0 +1,105 @@
+# components/player_query.py
+# Query layer for the preset player picker: filtering, name search and top-N run inside SQLite,
+# so only the rows that are displayed ever reach pandas.
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from components import perf
+from components.save_data_to_sqlite import ensure_player_name_index
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+database_path = os.path.join(base_path, '..', 'data', 'allData.sl3')
+
+PLAYER_COLUMNS = """id,
+    full_name AS "Full Name",
+    age AS "Age",
+    height_cm AS "Height",
+    weight_kg AS "Weight",
+    potential AS "Potential",
+    best_position AS "Best position",
+    stamina AS "Stamina",
+    dribbling AS "Dribbling",
+    short_passing AS "Short passing",
+    year"""
+
+# Same rows load_players keeps after dropna()
+NOT_NULL = """full_name IS NOT NULL AND age IS NOT NULL AND height_cm IS NOT NULL AND weight_kg IS NOT NULL
+    AND potential IS NOT NULL AND best_position IS NOT NULL AND stamina IS NOT NULL
+    AND dribbling IS NOT NULL AND short_passing IS NOT NULL"""
+
+_ready = set()
+_ready_lock = threading.Lock()
+
+
+def ensure_player_indexes(conn, db_path=database_path):
+    with _ready_lock:
+        if db_path in _ready:
+            return
+        conn.execute("""CREATE INDEX IF NOT EXISTS idx_player_year_position_potential
+            ON player_stats (year, best_position, potential DESC)""")
+        conn.execute("""CREATE INDEX IF NOT EXISTS idx_player_year_potential
+            ON player_stats (year, potential DESC)""")
+        # Trigram name index (case-insensitive substring search, like str.contains). sync_table keeps it in sync
+        # with every partition it loads; this only sets it up on databases loaded before it did
+        ensure_player_name_index(conn)
+        conn.commit()
+        _ready.add(db_path)
+
+
+def connect(db_path=database_path):
+    conn = sqlite3.connect(db_path)
+    ensure_player_indexes(conn, db_path)
+    return conn
+
+
+def _where(year, positions, search):
+    clauses = ["year = ?", NOT_NULL]
+    params = [str(year)]
+    if positions:
+        clauses.append(f"best_position IN ({', '.join('?' * len(positions))})")
+        params.extend(positions)
+    if search:
+        if len(search) >= 3:
+            clauses.append("id IN (SELECT rowid FROM player_name_fts WHERE player_name_fts MATCH ?)")
+            params.append('"' + search.replace('"', '""') + '"')
+        else:
+            # Trigram index needs at least 3 characters
+            clauses.append("full_name LIKE ? ESCAPE '\\'")
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+    return " AND ".join(clauses), params
+
+
+@perf.timed('sql.list_positions')
+def list_positions(year='2025', db_path=database_path):
+    conn = connect(db_path)
+    rows = conn.execute(
+        "SELECT DISTINCT best_position FROM player_stats WHERE year = ? AND best_position IS NOT NULL "
+        "ORDER BY best_position", (str(year),)
+    ).fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+
+@perf.timed('sql.count_players')
+def count_players(year='2025', positions=None, search='', db_path=database_path):
+    where, params = _where(year, positions, search)
+    conn = connect(db_path)
+    count = conn.execute(f"SELECT COUNT(DISTINCT full_name) FROM player_stats WHERE {where}", params).fetchone()[0]
+    conn.close()
+    return count
+
+
+@perf.timed('sql.top_players')
+def top_players(year='2025', positions=None, search='', limit=10, db_path=database_path):
+    where, params = _where(year, positions, search)
+    conn = connect(db_path)
+    df = pd.read_sql_query(
+        f"SELECT {PLAYER_COLUMNS} FROM player_stats WHERE {where} ORDER BY potential DESC, id LIMIT ?",
+        conn, params=params + [int(limit)]
+    )
+    conn.close()
+    return df
@@ -0,0 +1,177 @@
+# components/player_value_table.py
+# Materialized player valuations: predicted value of every player_stats row, keyed by (player id, model version).
+# Run `python -m components.player_value_table` from the project root after (re)training the value model
+# or reloading player_stats: the ETL deletes the valuations of every partition it replaces (new ids), and a
+# rebuild prunes the rows of older model versions (--keep-old keeps them).
+import os
+import json
+import sqlite3
+import sys
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from components import perf
+from components.model_registry import artifact_version
+from components.predict_player_value_model import load_player_value_model, predict_player_values
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+database_path = os.path.join(base_path, '..', 'data', 'allData.sl3')
+
+CHUNK_SIZE = 5000
+
+# Model versions already checked for stored rows in this process
+_checked_versions = set()
+_checked_lock = threading.Lock()
+
+create_player_value_predictions = """CREATE TABLE IF NOT EXISTS player_value_predictions (
+    player_id INTEGER NOT NULL,
+    model_version TEXT NOT NULL,
+    predicted_value REAL NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (player_id, model_version)
+) WITHOUT ROWID;"""
+
+
+def ensure_table(conn):
+    conn.execute(create_player_value_predictions)
+
+
+def current_model_version():
+    load_player_value_model()
+    return artifact_version('player_value_model.pkl')
+
+
+def _predict_chunk(df_chunk):
+    values = predict_player_values(df_chunk)
+    return list(zip(df_chunk['id'].astype(int).tolist(), values.astype(float).tolist()))
+
+
+def rebuild_player_values(workers=None, prune=True, db_path=database_path):
+    version = current_model_version()
+    conn = sqlite3.connect(db_path)
+    ensure_table(conn)
+
+    # Incremental: only rows that have no prediction for this model version yet
+    missing = pd.read_sql_query("""SELECT p.* FROM player_stats AS p
+        LEFT JOIN player_value_predictions AS v
+            ON v.player_id = p.id AND v.model_version = ?
+        WHERE v.player_id IS NULL""", conn, params=(version,))
+    print(f"Model version {version}: {len(missing)} player rows to value")
+
+    start = time.perf_counter()
+    chunks = [missing.iloc[i:i + CHUNK_SIZE] for i in range(0, len(missing), CHUNK_SIZE)]
+    if workers is None:
+        workers = min(len(chunks), os.cpu_count() or 1)
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_predict_chunk, chunks))
+    else:
+        results = [_predict_chunk(chunk) for chunk in chunks]
+
+    now = time.time()
+    with conn:
+        for rows in results:
+            conn.executemany(
+                "INSERT OR REPLACE INTO player_value_predictions VALUES (?, ?, ?, ?)",
+                [(player_id, version, value, now) for player_id, value in rows]
+            )
+        if prune:
+            # Rows of older model versions are never read again
+            pruned = conn.execute("DELETE FROM player_value_predictions WHERE model_version != ?", (version,))
+            if pruned.rowcount:
+                print(f"Pruned {pruned.rowcount} valuations of older model versions")
+    conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Valued {len(missing)} players in {elapsed:.2f}s with {max(workers, 1)} worker(s)")
+    return len(missing)
+
+
+def _warn_if_empty(conn, version):
+    # After a retrain nothing is stored for the new version: every lookup would fall back to live prediction
+    with _checked_lock:
+        if version in _checked_versions:
+            return
+        _checked_versions.add(version)
+    try:
+        stored = conn.execute("SELECT 1 FROM player_value_predictions WHERE model_version = ? LIMIT 1",
+                              (version,)).fetchone()
+    except sqlite3.OperationalError:
+        stored = None
+    if stored is None:
+        print(f"No stored player valuations for model version {version}: "
+              "run `python -m components.player_value_table` to materialize them")
+
+
+def _value_missing(conn, ids, version):
+    # Values the given player_stats ids from their full rows (same features as rebuild_player_values)
+    # and stores them, so the next lookup hits
+    missing = pd.read_sql_query("SELECT * FROM player_stats WHERE id IN (SELECT value FROM json_each(?))",
+                                conn, params=(json.dumps([int(i) for i in ids]),))
+    rows = _predict_chunk(missing) if len(missing) else []
+    if rows:
+        ensure_table(conn)
+        now = time.time()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO player_value_predictions VALUES (?, ?, ?, ?)",
+                             [(player_id, version, value, now) for player_id, value in rows])
+    return dict(rows)
+
+
+@perf.timed('sql.lookup_player_value')
+def lookup_player_value(player_id, db_path=database_path):
+    # Returns None when the row has not been materialized for the current model yet
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT predicted_value FROM player_value_predictions WHERE player_id = ? AND model_version = ?",
+            (int(player_id), current_model_version())
+        ).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def player_value(player_id, db_path=database_path):
+    # Value of one preset player: the stored valuation, or one computed from its player_stats row and stored
+    value = lookup_player_value(player_id, db_path)
+    if value is not None:
+        return value
+    conn = sqlite3.connect(db_path)
+    try:
+        _warn_if_empty(conn, current_model_version())
+        return _value_missing(conn, [player_id], current_model_version()).get(int(player_id))
+    finally:
+        conn.close()
+
+
+def player_values(df, db_path=database_path):
+    # Predicted value of every player_stats row in df (aligned with df.index, which must carry the id column):
+    # one query for the materialized rows, one batched model call on the full rows of the rest
+    version = current_model_version()
+    conn = sqlite3.connect(db_path)
+    try:
+        _warn_if_empty(conn, version)
+        try:
+            stored = dict(conn.execute(
+                "SELECT player_id, predicted_value FROM player_value_predictions WHERE model_version = ?",
+                (version,)))
+        except sqlite3.OperationalError:
+            stored = {}
+        values = df['id'].map(stored).astype(float)
+        missing = values.isna()
+        if missing.any():
+            computed = _value_missing(conn, df.loc[missing, 'id'].unique(), version)
+            values[missing] = df.loc[missing, 'id'].map(computed).astype(float)
+    finally:
+        conn.close()
+    return values
+
+
+if __name__ == '__main__':
+    rebuild_player_values(prune='--keep-old' not in sys.argv)
@@ -5,7 +5,8 @@ import sqlite3
 import numpy as np
 import pandas as pd
 import streamlit as st
-from components.predict_match_result_model_pre_match import predict_match_result
+from components.fixture_matrix import DEFAULT_ODDS, fixture_matrix, lookup_fixture
+from components import perf
 
 def show_all_teams(mode):
     if mode == "Match Predict (Pre-match)":
@@ -17,9 +18,10 @@ def show_all_teams(mode):
             st.error(f"❌ Database not found: {db_path}")
             return
 
-        conn = sqlite3.connect(db_path)
-        df = pd.read_sql_query("SELECT * FROM team_stats WHERE year = '2025'", conn)
-        conn.close()
+        with perf.span('sql.team_stats_2025'):
+            conn = sqlite3.connect(db_path)
+            df = pd.read_sql_query("SELECT * FROM team_stats WHERE year = '2025'", conn)
+            conn.close()
 
         if df.empty:
             st.warning("⚠️ No team data found for 2025.")
@@ -28,6 +30,14 @@ def show_all_teams(mode):
         # Display all team data
         st.dataframe(df)
 
+        # League-wide home-vs-away heatmap under the default odds assumption
+        with st.expander("🗺️ Home Win Probability Heatmap"):
+            league = st.selectbox("League", sorted(df['league'].unique()), key="heatmap_league")
+            league_teams = df.loc[df['league'] == league, 'team'].drop_duplicates().tolist()
+            matrix = fixture_matrix(df, DEFAULT_ODDS)['home_win'].loc[league_teams, league_teams]
+            st.caption(f"Rows: home team, columns: away team. Odds assumed: {DEFAULT_ODDS}")
+            st.dataframe(matrix.style.background_gradient(cmap='RdYlGn', axis=None).format('{:.0%}', na_rep=''))
+
         # Let user selects two teams
         st.markdown("### ⚔️ Predict a Match Between Two Teams")
         team_names = df['team'].tolist()
@@ -43,9 +53,6 @@ def show_all_teams(mode):
             input_b365_a = st.text_input("Away Win Odds", "")
 
         if st.button("🔮 Predict Match Result"):
-            row_home = df[df['team'] == team_home].iloc[0]
-            row_away = df[df['team'] == team_away].iloc[0]
-
             try:
                 b365_h = float(input_b365_h) if input_b365_h else round(np.random.uniform(1.3, 3.5), 2)
             except ValueError:
@@ -62,25 +69,9 @@ def show_all_teams(mode):
             b365_d = np.round(np.random.uniform(2.8, 4.5), 2)  # Draw odds
             # b365_a = np.round(np.random.uniform(1.5, 4.0), 2)  # Away win odds
 
-            inverse = 1 / np.array([b365_h, b365_d, b365_a])
-            total = inverse.sum()
-            prob_h = inverse[0] / total
-            prob_d = inverse[1] / total
-            prob_a = inverse[2] / total
-
-            # Constructing prediction input
-            df_match = pd.DataFrame([{
-                "b365_prob_h": prob_h,
-                "b365_prob_d": prob_d,
-                "b365_prob_a": prob_a,
-                "overall_diff": row_home['overall'] - row_away['overall'],
-                "attack_diff": row_home['attack'] - row_away['attack'],
-                "midfield_diff": row_home['midfield'] - row_away['midfield'],
-                "defence_diff": row_home['defence'] - row_away['defence'],
-                "age_diff": row_home['starting_xi_avg_age'] - row_away['starting_xi_avg_age']
-            }])
-
-            result = predict_match_result(df_match)
+            # Random draw odds make every click a new odds assumption: lookup_fixture scores just this pair
+            # unless the matrix for these odds is already cached
+            result = lookup_fixture(df, team_home, team_away, (b365_h, b365_d, b365_a))
 
             st.success(f"🏆 Predicted Result: **{team_home} vs {team_away} → {result['prediction']}**")
             st.markdown(f"""
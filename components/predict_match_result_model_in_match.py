@@ -1,243 +1,28 @@
+# components/predict_match_result_model_in_match.py
+# Train the in-match RandomForest from the in_match_features table (see components/in_match_features.py).
+# Run from the project root: python -m components.predict_match_result_model_in_match [--budget 100]
 import os
+import json
+import math
+import time
+import argparse
 
 import joblib
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split, StratifiedKFold, GridSearchCV
+from sklearn.model_selection import StratifiedKFold, ParameterGrid
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import cross_val_predict
-import matplotlib.pyplot as plt
-import seaborn as sns  # Load Datasets
 
+from components.in_match_features import FEATURE_COLS, build_features, load_features
 
 pd.set_option('display.max_rows', 100)
 pd.set_option('display.max_columns', None)
 pd.set_option('display.width', None)
 pd.set_option('display.max_colwidth', None)
 
-folder_path = '../data/in_match_predict'
-save_path = "../models"
-
-csv_files = [file for file in os.listdir(folder_path) if file.endswith('E0.csv')]
-
-dataframes = []
-column_sets = []
-all_cols = set()
-
-for file in csv_files:
-    file_path = os.path.join(folder_path, file)
-    try:
-        # Extract and format season
-        raw_season = file.split(' ')[1]  # e.g. '2020-2021'
-        start_year, end_year = raw_season.split('-')
-        season = f"{start_year}/{end_year[2:]}"  # e.g. '2020/21'
-
-        df = pd.read_csv(file_path)
-        df['Season'] = season
-        dataframes.append(df)
-
-        header_df = pd.read_csv(file_path, nrows=0)
-        cols = set(header_df.columns)
-        column_sets.append(cols)
-        all_cols.update(cols)
-    except Exception as e:
-        print(f"Error reading {file}: {e}")
-
-merged_df = pd.concat(dataframes, ignore_index=True)
-
-common_cols = set.intersection(*column_sets)
-non_shared_cols = all_cols - common_cols
-
-# Save the csv file to dataset folder
-# merged_df.to_csv(os.path.join(folder_path, 'E0_merged.csv'), index=False)
-# print(f"\n Merged dataset saved to: {os.path.join(folder_path, 'E0_merged.csv')}")
-
-# merged_df.to_csv("E0_merged.csv", index=False)
-print(f"The size of merged dataset is : {merged_df.shape}")
-
-# Sort the dataset based on Division and Year
-
-merged_df['Date'] = pd.to_datetime(merged_df['Date'], dayfirst=True)
-merged_df['Year'] = merged_df['Date'].dt.year
-
-merged_df['Div_num'] = merged_df['Div'].str.extract(r'E(\d)').astype(int)
-
-merged_df = merged_df.sort_values(by=['Year', 'Div_num'], ascending=[True, False])
-
-merged_df.drop(columns='Div_num', inplace=True)
-
-# Load club stats
-club_df = pd.read_csv(os.path.join(folder_path, 'club_stats.csv'))
-
-# club_df.head()
-
-# Check Unquie Team Name
-# print("\n------Unique HomeTeams in merged_df------\n")
-# print(merged_df['HomeTeam'].unique())
-#
-# print("\n------ Unique AwayTeams in merged_df-------\n")
-# print(merged_df['AwayTeam'].unique())
-#
-# print("\n------Unique Clubs in club_df------\n")
-# print(club_df['Club'].unique())
-
-# Mapping dictionary from short names to full club names
-team_name = {
-    'Man City': 'Manchester City',
-    'Man United': 'Manchester United',
-    'Sheffield United': 'Sheffield United',
-    'West Ham': 'West Ham United',
-    'West Brom': 'West Bromwich Albion',
-    'Brighton': 'Brighton & Hove Albion',
-    'Wolves': 'Wolverhampton Wanderers',
-    'Spurs': 'Tottenham Hotspur',
-    'Tottenham': 'Tottenham Hotspur',
-    'Newcastle': 'Newcastle United',
-    "Nott'm Forest": 'Nottingham Forest',
-    'Leeds': 'Leeds United',
-    'Norwich': 'Norwich City',
-    'Luton': 'Luton Town',
-    'Ipswich': 'Ipswich Town',
-    'Leicester': 'Leicester City',
-}
-
-
-def map_team_name(name):
-    return team_name.get(name, name)
-
-
-# Map to full club names for HomeTeam and AwayTeam
-merged_df['HomeTeam'] = merged_df['HomeTeam'].apply(map_team_name)
-merged_df['AwayTeam'] = merged_df['AwayTeam'].apply(map_team_name)
-
-# Strip any leading/trailing spaces from column names
-club_df.columns = club_df.columns.str.strip()
-
-# Prepare home stats with renamed columns
-home_stats = club_df.rename(columns={
-    'Club': 'HomeTeam',
-    'Position': 'HPos',
-    'Played': 'HPlayed',
-    'Won': 'HWon',
-    'Drawn': 'HDrawn',
-    'Lost': 'HLost'
-})
-
-# Prepare away stats with renamed columns
-away_stats = club_df.rename(columns={
-    'Club': 'AwayTeam',
-    'Position': 'APos',
-    'Played': 'APlayed',
-    'Won': 'AWon',
-    'Drawn': 'ADrawn',
-    'Lost': 'ALost'
-})
-
-# Merge df with the home_stats and away_stats
-merged_df = merged_df.merge(home_stats, how='left', on=['Season', 'HomeTeam'])
-merged_df = merged_df.merge(away_stats, how='left', on=['Season', 'AwayTeam'])
-# Defines the columns
-
-cols_to_keep = [
-    'Div', 'Date', 'Time', 'HomeTeam', 'AwayTeam',
-    'FTHG', 'FTAG', 'FTR', 'HTHG', 'HTAG', 'HTR',
-    'HS', 'AS', 'HST', 'AST',
-    'HF', 'AF', 'HC', 'AC',  # Fouls / Corners
-    'HY', 'AY', 'HR', 'AR',  # Yellow/Red Cards
-    'B365H', 'B365D', 'B365A',  # B356
-    'BWH', 'BWD', 'BWA',  # Pinnacle
-    'PSH', 'PSD', 'PSA',  # Bet&Win
-    'WHH', 'WHD', 'WHA',  # William Hill
-    'Season',
-    'HPos', 'HPlayed', 'HWon', 'HDrawn', 'HLost',
-    'APos', 'APlayed', 'AWon', 'ADrawn', 'ALost'
-]
-
-# List of columns to convert
-numeric_cols = [
-    'FTHG', 'FTAG', 'HTHG', 'HTAG',
-    'HS', 'AS', 'HST', 'AST',
-    'HF', 'AF', 'HC', 'AC',  # Fouls / Corners
-    'HY', 'AY', 'HR', 'AR',  # Yellow/Red Cards
-    'B365H', 'B365D', 'B365A',  # B365
-    'BWH', 'BWD', 'BWA',  # Pinnacle
-    'PSH', 'PSD', 'PSA',  # Bet&Win
-    'WHH', 'WHD', 'WHA',  # William Hill
-    'HPos', 'HPlayed', 'HWon', 'HDrawn', 'HLost',
-    'APos', 'APlayed', 'AWon', 'ADrawn', 'ALost'
-]
-
-betting_cols = [
-    'B365H', 'B365D', 'B365A',
-    'BWH', 'BWD', 'BWA',
-    'PSH', 'PSD', 'PSA',
-    'WHH', 'WHD', 'WHA'
-]
-
-# Impute betting columns
-merged_df[betting_cols] = merged_df[betting_cols].fillna(0)
-
-# avoid division by zero
-eps = 1e-6
-
-# Pre-match form & ranking features
-merged_df['HWinRate'] = merged_df['HWon'] / (merged_df['HPlayed'] + eps)
-merged_df['AWinRate'] = merged_df['AWon'] / (merged_df['APlayed'] + eps)
-merged_df['HDrawRate'] = merged_df['HDrawn'] / (merged_df['HPlayed'] + eps)
-merged_df['ADrawRate'] = merged_df['ADrawn'] / (merged_df['APlayed'] + eps)
-merged_df['HLossRate'] = merged_df['HLost'] / (merged_df['HPlayed'] + eps)
-merged_df['ALossRate'] = merged_df['ALost'] / (merged_df['APlayed'] + eps)
-
-merged_df['PosDiff'] = merged_df['APos'] - merged_df['HPos']
-merged_df['PosRatio'] = merged_df['HPos'] / (merged_df['APos'] + eps)
-
-# Pre-match betting odds features
-merged_df['AvgH'] = merged_df[['B365H', 'BWH', 'PSH', 'WHH']].mean(axis=1)
-merged_df['AvgD'] = merged_df[['B365D', 'BWD', 'PSD', 'WHD']].mean(axis=1)
-merged_df['AvgA'] = merged_df[['B365A', 'BWA', 'PSA', 'WHA']].mean(axis=1)
-
-merged_df['MaxH'] = merged_df[['B365H', 'BWH', 'PSH', 'WHH']].max(axis=1)
-merged_df['MaxD'] = merged_df[['B365D', 'BWD', 'PSD', 'WHD']].max(axis=1)
-merged_df['MaxA'] = merged_df[['B365A', 'BWA', 'PSA', 'WHA']].max(axis=1)
-
-merged_df['HDRatio'] = merged_df['AvgH'] / (merged_df['AvgD'] + eps)
-merged_df['HARatio'] = merged_df['AvgH'] / (merged_df['AvgA'] + eps)
-merged_df['DARatio'] = merged_df['AvgD'] / (merged_df['AvgA'] + eps)
-
-# Save the csv file to dataset folder
-# merged_df.to_csv(os.path.join(folder_path, 'final.csv'), index=False)
-# print(f"\n Merged dataset saved to: {os.path.join(folder_path, 'final.csv')}")
-
-# Features
-feature_cols = [
-    'HTHG', 'HTAG',
-    'B365H', 'B365D', 'B365A',
-    'BWH', 'BWD', 'BWA',
-    'PSH', 'PSD', 'PSA',
-    'WHH', 'WHD', 'WHA',
-    'AvgH', 'AvgD', 'AvgA',
-    'MaxH', 'MaxD', 'MaxA',
-    'HPos', 'HPlayed', 'HWon', 'HDrawn', 'HLost',
-    'APos', 'APlayed', 'AWon', 'ADrawn', 'ALost',
-    'HWinRate', 'AWinRate',
-    'HDrawRate', 'ADrawRate',
-    'HLossRate', 'ALossRate',
-    'PosDiff', 'PosRatio',
-    'HDRatio', 'HARatio', 'DARatio'
-]
-
-X = merged_df[feature_cols]
-y = merged_df['FTR']  # Target: H, D, A
-
-# Features Scaling
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-
-# Cross-Validation Setup
-cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
-
-# Grid Search for Best Parameters
+save_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models')
 
 param_grid = {
     'n_estimators': [100, 200],
@@ -248,32 +33,155 @@ param_grid = {
     'class_weight': ['balanced', 'balanced_subsample']  # Handle imbalanced classes
 }
 
-rf = RandomForestClassifier(random_state=42)
-
-grid_search = GridSearchCV(
-    rf,
-    param_grid,
-    cv=cv,
-    scoring='accuracy',
-    n_jobs=-1,
-    verbose=1
-)
-
-grid_search.fit(X_scaled, y)
-
-# Model Evaluation
-best_model = grid_search.best_estimator_
-print("\n ------ Best Parameters ------ \n")
-print(grid_search.best_params_)
-
-# Evaluate using cross-validated predictions
-y_pred = cross_val_predict(best_model, X_scaled, y, cv=cv)
-
-print("\n ------ Confusion Matrix ------ \n")
-print(confusion_matrix(y, y_pred))
-
-print("\n ------ Classification Report ------ \n ")
-print(classification_report(y, y_pred))
 
-joblib.dump(best_model, os.path.join(save_path, "in_match_result_model.pkl"))
-joblib.dump(scaler, os.path.join(save_path, "in_match_result_scaler.pkl"))
+# ===== Successive-halving search =====
+# Every candidate starts on a small slice of each training fold; only the best 1/factor move on to
+# a factor-times bigger slice, until the survivors are scored on the full folds.
+def scaled_folds(X, y, cv, seed):
+    # Scaler fitted on each training fold only, computed once and shared by every candidate and rung.
+    # `order` is a fixed shuffle of the training rows, so a rung's slice is always a prefix of the next one.
+    rng = np.random.default_rng(seed)
+    folds = []
+    for train_idx, val_idx in cv.split(X, y):
+        fold_scaler = StandardScaler().fit(X.iloc[train_idx])
+        folds.append({
+            'X_train': fold_scaler.transform(X.iloc[train_idx]),
+            'y_train': y.iloc[train_idx].to_numpy(),
+            'X_val': fold_scaler.transform(X.iloc[val_idx]),
+            'y_val': y.iloc[val_idx].to_numpy(),
+            'val_idx': val_idx,
+            'order': rng.permutation(len(train_idx)),
+        })
+    return folds
+
+
+def evaluate(params, folds, n_rows, n_samples, seed):
+    # Mean validation accuracy over the folds, plus the out-of-fold predictions
+    oof = np.empty(n_samples, dtype=object)
+    scores = []
+    for fold in folds:
+        rows = fold['order'][:n_rows]
+        model = RandomForestClassifier(random_state=seed, n_jobs=-1, **params)
+        model.fit(fold['X_train'][rows], fold['y_train'][rows])
+        pred = model.predict(fold['X_val'])
+        oof[fold['val_idx']] = pred
+        scores.append(accuracy_score(fold['y_val'], pred))
+    return float(np.mean(scores)), oof
+
+
+def plan_rungs(n_candidates, max_resources, min_resources, factor):
+    # Rows per fold and number of candidates for every rung. When the data is too small for enough
+    # rungs, the first cut is made more aggressive so the last (full-data) rung still has <= factor left.
+    n_rungs = 1 + min(int(math.log(n_candidates, factor)), int(math.log(max_resources / min_resources, factor)))
+    resources = [max_resources // factor ** (n_rungs - 1 - i) for i in range(n_rungs)]
+    needed = math.ceil(math.log(n_candidates / factor, factor)) if n_candidates > factor else 0
+    extra = max(0, needed - (n_rungs - 1))
+    candidates = [n_candidates]
+    for rung in range(1, n_rungs):
+        candidates.append(math.ceil(candidates[-1] / factor ** (1 + (extra if rung == 1 else 0))))
+    return resources, candidates
+
+
+def planned_cost(n_candidates, max_resources, min_resources, factor, n_folds):
+    # In full-data forest fits: a fit on a fraction f of the rows counts as f
+    resources, candidates = plan_rungs(n_candidates, max_resources, min_resources, factor)
+    return sum(n * n_folds * r / max_resources for r, n in zip(resources, candidates))
+
+
+def successive_halving(param_grid, folds, n_samples, factor=3, min_resources=None, budget=None, seed=42):
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    candidates = list(ParameterGrid(param_grid))
+    max_resources = min(len(fold['order']) for fold in folds)
+    min_resources = min(max_resources, min_resources or max(max_resources // factor ** 4, 200))
+
+    # Over budget: score a random subset of the grid instead of cutting rungs short
+    n_candidates = len(candidates)
+    while budget and n_candidates > 1 and \
+            planned_cost(n_candidates, max_resources, min_resources, factor, len(folds)) > budget:
+        n_candidates -= 1
+    if n_candidates < len(candidates):
+        candidates = [candidates[i] for i in rng.choice(len(candidates), n_candidates, replace=False)]
+
+    resources, schedule = plan_rungs(len(candidates), max_resources, min_resources, factor)
+    fits, cost, history = 0, 0.0, []
+    for rung, n_rows in enumerate(resources):
+        results = []
+        for params in candidates:
+            score, oof = evaluate(params, folds, n_rows, n_samples, seed)
+            results.append((score, params, oof))
+        fits += len(candidates) * len(folds)
+        cost += len(candidates) * len(folds) * n_rows / max_resources
+        results.sort(key=lambda r: r[0], reverse=True)
+        history.append({'rung': rung, 'rows_per_fold': int(n_rows), 'candidates': len(candidates),
+                        'best_score': results[0][0]})
+        print(f"Rung {rung}: {len(candidates)} candidates on {n_rows} rows/fold, best accuracy {results[0][0]:.4f}")
+        if rung < len(resources) - 1:
+            candidates = [params for _, params, _ in results[:schedule[rung + 1]]]
+
+    best_score, best_params, best_oof = results[0]
+    return {
+        'best_params': best_params,
+        'best_score': best_score,
+        'oof_predictions': best_oof,  # full-data fold predictions of the winner, reused for the report
+        'fits': fits,
+        'full_fit_equivalents': cost,
+        'exhaustive_fits': len(ParameterGrid(param_grid)) * len(folds) + len(folds),
+        'seconds': time.perf_counter() - start,
+        'rungs': history,
+    }
+
+
+def main(args):
+    # Features come from the versioned in_match_features table; only new or changed seasons are rebuilt
+    build_features(full=args.rebuild_features)
+    merged_df = load_features()
+    print(f"The size of the feature table is : {merged_df.shape}")
+
+    X = merged_df[FEATURE_COLS]
+    y = merged_df['FTR']  # Target: H, D, A
+
+    # Cross-Validation Setup
+    cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+
+    folds = scaled_folds(X, y, cv, args.seed)
+    search = successive_halving(param_grid, folds, len(y), args.factor, args.min_resources, args.budget, args.seed)
+
+    print("\n ------ Best Parameters ------ \n")
+    print(search['best_params'])
+    print(f"CV accuracy {search['best_score']:.4f}; search cost: {search['fits']} forest fits "
+          f"(~{search['full_fit_equivalents']:.1f} full-data fits, exhaustive grid + cross_val_predict: "
+          f"{search['exhaustive_fits']}) in {search['seconds']:.1f}s")
+
+    # Evaluate using the winner's out-of-fold predictions from the last rung (no second cross-validation)
+    y_pred = search['oof_predictions']
+
+    print("\n ------ Confusion Matrix ------ \n")
+    print(confusion_matrix(y, y_pred))
+
+    print("\n ------ Classification Report ------ \n ")
+    print(classification_report(y, y_pred))
+
+    # Final model on every row, with the scaler the app applies at prediction time
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    best_model = RandomForestClassifier(random_state=args.seed, n_jobs=-1, **search['best_params'])
+    best_model.fit(X_scaled, y)
+
+    joblib.dump(best_model, os.path.join(save_path, "in_match_result_model.pkl"))
+    joblib.dump(scaler, os.path.join(save_path, "in_match_result_scaler.pkl"))
+    with open(os.path.join(save_path, "in_match_result_search.json"), 'w') as f:
+        json.dump({key: value for key, value in search.items() if key != 'oof_predictions'}, f, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the in-match RandomForest with a successive-halving search")
+    parser.add_argument('--factor', type=int, default=3, help="keep the best 1/factor of candidates per rung")
+    parser.add_argument('--min-resources', type=int, default=None,
+                        help="training rows per fold in the first rung (default: full fold / factor^4, at least 200)")
+    parser.add_argument('--budget', type=float, default=None,
+                        help="max search cost in full-data forest fits; candidates are sampled down to fit")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--rebuild-features', action='store_true', help="rebuild the feature table from every season")
+    args = parser.parse_args()
+    main(args)
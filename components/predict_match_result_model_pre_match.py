@@ -1,34 +1,59 @@
 # components/predict_match_result_model_pre_match.py
 
-import os
 import numpy as np
 import pandas as pd
 from glob import glob
-import joblib
+from components.model_registry import load_artifact
+from components import perf
+
+FEATURES = [
+    'b365_prob_h', 'b365_prob_d', 'b365_prob_a',
+    'overall_diff', 'attack_diff', 'midfield_diff',
+    'defence_diff', 'age_diff'
+]
+
+
+def implied_probabilities(odds_h, odds_d, odds_a):
+    # Bookmaker odds -> normalised implied probabilities (works on scalars and arrays)
+    inverse = 1 / np.array([odds_h, odds_d, odds_a], dtype=float)
+    return inverse / inverse.sum(axis=0)
+
+
+def build_match_features(home, away, prob_h, prob_d, prob_a):
+    # home / away: team_stats rows, either single Series or DataFrames aligned row by row
+    def diff(col):
+        return np.atleast_1d(np.asarray(home[col], dtype=float) - np.asarray(away[col], dtype=float))
+
+    overall_diff = diff('overall')
+    n = len(overall_diff)
+    return pd.DataFrame({
+        "b365_prob_h": np.broadcast_to(prob_h, n),
+        "b365_prob_d": np.broadcast_to(prob_d, n),
+        "b365_prob_a": np.broadcast_to(prob_a, n),
+        "overall_diff": overall_diff,
+        "attack_diff": diff('attack'),
+        "midfield_diff": diff('midfield'),
+        "defence_diff": diff('defence'),
+        "age_diff": diff('starting_xi_avg_age')
+    })
+
+
+@perf.timed('predict.pre_match')
+def predict_match_probabilities(df_match):
+    # [P(Home Win), P(Away Win)] for every row of df_match in one scaler + model pass
+    _model = load_artifact('pre_match_result_model.pkl')
+    scaler = load_artifact('pre_match_result_scaler.pkl')
+    X_new_scaled = scaler.transform(df_match[FEATURES])
+    return _model.predict_proba(X_new_scaled)
+
 
 def predict_match_result(df_match):
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    model_path = os.path.join(base_path, '..', 'models', 'pre_match_result_model.pkl')
-    scaler_path = os.path.join(base_path, '..', 'models', 'pre_match_result_scaler.pkl')
-    _model = joblib.load(model_path)
-    scaler = joblib.load(scaler_path)
-    print("Loaded model type:", type(_model))
-    print("Is model fitted?", hasattr(_model, "coef_"))
-    features = [
-        'b365_prob_h', 'b365_prob_d', 'b365_prob_a',
-        'overall_diff', 'attack_diff', 'midfield_diff',
-        'defence_diff', 'age_diff'
-    ]
-    X_new = df_match[features]
-    X_new_scaled = scaler.transform(X_new)
-    pred = _model.predict(X_new_scaled)[0]
-    proba = _model.predict_proba(X_new_scaled)[0]
+    proba = predict_match_probabilities(df_match)[0]
     result_map = {0: 'Home Win', 1: 'Away Win'}
     return {
-        "prediction": result_map[pred],
+        "prediction": result_map[int(np.argmax(proba))],
         "probabilities": {
             "Home Win": round(proba[0], 3),
             "Away Win": round(proba[1], 3)
         }
     }
-
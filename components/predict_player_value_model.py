@@ -1,19 +1,22 @@
 import os
 import pandas as pd
-import joblib
 import numpy as np
-import sqlite3
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_squared_error
-from sklearn.model_selection import train_test_split
+from components.model_registry import load_artifact
+from components.clean_data import load_table
+from components.numpy_inference import shared_model
+from components import perf
 
 
 def train_model():
+    # sklearn / joblib are only needed to train; importing them here keeps app startup light
+    import joblib
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_squared_error
+    from sklearn.model_selection import train_test_split
+
     base_path = os.path.dirname(os.path.abspath(__file__))
-    database_path = os.path.join(base_path, '..', 'data', 'allData.sl3')
-    conn = sqlite3.connect(database_path)
-    df = pd.read_sql_query("SELECT * FROM player_stats WHERE value != 0 and wage != 0", conn)
-    conn.close()
+    df = load_table('player_stats')
+    df = df[(df['value'] != 0) & (df['wage'] != 0)].reset_index(drop=True)
 
     df['value'] = np.log(df['value'])
     df['wage'] = np.log(df['wage'])
@@ -24,10 +27,12 @@ def train_model():
     if 'best_position' in X.columns:
         X = pd.get_dummies(X, columns=['best_position'])
 
+    # Remaining text columns are categorical in the cache: extract the number once per category, not per row
     for col in X.columns:
-        if X[col].dtype == 'object':
-            X[col] = X[col].astype(str).str.extract(r'(\d+)')
-            X[col] = pd.to_numeric(X[col], errors='coerce')
+        if isinstance(X[col].dtype, pd.CategoricalDtype):
+            categories = X[col].cat.categories.astype(str).str.extract(r'(\d+)', expand=False)
+            numbers = np.append(pd.to_numeric(categories, errors='coerce').to_numpy(dtype=float), np.nan)
+            X[col] = numbers[X[col].cat.codes.to_numpy()]
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
@@ -40,31 +45,95 @@ def train_model():
     joblib.dump(model, os.path.join(base_path, '..', 'models', 'player_value_model.pkl'))
 
 
-def predict_player_value(player_dict):
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    model_path = os.path.join(base_path, '..', 'models', 'player_value_model.pkl')
+# UI / CSV column names -> player_stats column names used by train_model
+UI_TO_DB_COLUMNS = {
+    'Full Name': 'full_name',
+    'Age': 'age',
+    'Potential': 'potential',
+    'Best position': 'best_position',
+    'Short passing': 'short_passing',
+    'Dribbling': 'dribbling',
+    'Stamina': 'stamina',
+    'Height': 'height_cm',
+    'Weight': 'weight_kg',
+    'Overall rating': 'overall_rating',
+    'Total goalkeeping': 'total_goalkeeping',
+}
+
+_layout_cache = {'model': None, 'layout': None}
+
+
+def load_player_value_model():
     try:
-        model = joblib.load(model_path)
+        return load_artifact('player_value_model.pkl')
     except (FileNotFoundError, EOFError, Exception):
         print("Training model...")
         train_model()
-        model = joblib.load(model_path)
-
-    df = pd.DataFrame([player_dict])
-    for col in ['Stamina', 'Dribbling', 'Short passing']:
-        df[col] = df[col].astype(float)
-
-    if 'Best position' in df.columns:
-        df = pd.get_dummies(df)
-
-    model_columns = model.feature_names_in_
-    for col in model_columns:
+        return load_artifact('player_value_model.pkl')
+
+
+def _feature_layout(model):
+    # Column layout of the fitted model, computed once per loaded model object
+    if _layout_cache['model'] is model:
+        return _layout_cache['layout']
+
+    model_columns = list(model.feature_names_in_)
+    if any(col.startswith('best_position_') for col in model_columns):
+        prefix, rename = 'best_position_', UI_TO_DB_COLUMNS
+    else:
+        prefix, rename = 'Best position_', {v: k for k, v in UI_TO_DB_COLUMNS.items()}
+    position_idx = {col[len(prefix):]: i for i, col in enumerate(model_columns) if col.startswith(prefix)}
+    numeric_idx = {col: i for i, col in enumerate(model_columns) if not col.startswith(prefix)}
+    layout = {
+        'columns': model_columns,
+        'position_column': prefix[:-1],
+        'position_idx': position_idx,
+        'numeric_idx': numeric_idx,
+        'rename': rename,
+    }
+    _layout_cache.update(model=model, layout=layout)
+    return layout
+
+
+def encode_players(df, model):
+    layout = _feature_layout(model)
+    df = df.rename(columns=layout['rename'])
+    X = np.zeros((len(df), len(layout['columns'])), dtype=np.float64)
+
+    for col, i in layout['numeric_idx'].items():
         if col not in df.columns:
-            df[col] = 0
-    df = df[model_columns]
+            continue
+        values = df[col]
+        if values.dtype == 'object':
+            # Same cleaning as train_model: keep the leading number of scraped strings such as "78\n+2"
+            values = values.astype(str).str.extract(r'(\d+)', expand=False)
+        X[:, i] = pd.to_numeric(values, errors='coerce')
+
+    position_column = layout['position_column']
+    if position_column in df.columns:
+        categories = list(layout['position_idx'])
+        codes = pd.Categorical(df[position_column], categories=categories).codes
+        known = codes >= 0
+        offsets = np.array([layout['position_idx'][c] for c in categories], dtype=np.intp)
+        X[np.flatnonzero(known), offsets[codes[known]]] = 1.0
+
+    return pd.DataFrame(X, columns=layout['columns'], index=df.index)
+
+
+@perf.timed('predict.player_value')
+def predict_player_values(df):
+    # Value every row of df with one model.predict call; returns euros as a Series aligned with df.index
+    if len(df) == 0:
+        return pd.Series(dtype=np.float64, index=df.index)
+    # Memory-mapped NumPy export when SHARED_MODELS=1 (see components/numpy_inference.py)
+    model = shared_model('player_value_model') or load_player_value_model()
+    X = encode_players(df, model)
+    log_pred = model.predict(X)
+    return pd.Series(np.exp(log_pred), index=df.index)
 
-    log_pred = model.predict(df)[0]
-    return np.exp(log_pred)
+
+def predict_player_value(player_dict):
+    return float(predict_player_values(pd.DataFrame([player_dict])).iloc[0])
 
 #
 # if __name__ == '__main__':
@@ -0,0 +1,428 @@
+# components/prediction_service.py
+# Headless HTTP service for the three models, stdlib only (no Streamlit session involved).
+# Requests are validated and turned into feature rows on the connection thread; one batcher thread per model
+# then coalesces every row that arrives within --window-ms into a single model call.
+#
+#   POST /predict/player_value  {"Age": 24, "Height": 180, "Weight": 75, "Potential": 85, "Best position": "ST",
+#                                "Stamina": 70, "Dribbling": 75, "Short passing": 72}
+#   POST /predict/pre_match     {"home": "Arsenal", "away": "Chelsea", "odds_h": 2.1, "odds_d": 3.4, "odds_a": 3.3}
+#   POST /predict/in_match      {"home": "Arsenal", "away": "Chelsea", "hthg": 1, "htag": 0,
+#                                "odds_h": 2.1, "odds_d": 3.4, "odds_a": 3.3, "season": "2023/24"}
+#   GET  /health                models loaded, batcher queue depths
+#   GET  /metrics               Prometheus text: request / batch latencies, batch sizes, process memory
+#
+# A JSON list instead of an object scores several items in one request.
+#
+#   python -m components.prediction_service --port 8765
+#   python -m components.prediction_service --port 8765 --workers 4   # one process per core, same port
+#   python -m components.prediction_service --port 8765 --workers 4 --numpy   # workers share the NumPy exports
+#   python -m components.load_test --url http://127.0.0.1:8765 --endpoint in_match
+import os
+import sys
+import json
+import math
+import time
+import queue
+import signal
+import socket
+import sqlite3
+import argparse
+import threading
+import multiprocessing
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from components import perf
+from components.club_index import ClubIndex
+from components.fixture_matrix import DEFAULT_ODDS, TEAM_FEATURES
+from components.in_match_predict import FEATURE_COLS, read_data, load_model_and_scaler, odds_features
+from components.live_scoring import ODDS_KEYS, TEAM_IDX, ODDS_IDX, HTHG_IDX, HTAG_IDX
+from components.numpy_inference import NumpyModel, shared_model
+from components.predict_match_result_model_pre_match import FEATURES, implied_probabilities, predict_match_probabilities
+from components.predict_player_value_model import encode_players, load_player_value_model
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+database_path = os.path.join(base_path, '..', 'data', 'allData.sl3')
+
+DEFAULT_WINDOW_MS = 2.0
+MAX_BATCH = 512
+REQUEST_TIMEOUT = 10.0
+
+# UI field name -> player_stats column; either spelling is accepted
+PLAYER_FIELDS = {
+    'Age': 'age', 'Height': 'height_cm', 'Weight': 'weight_kg', 'Potential': 'potential',
+    'Stamina': 'stamina', 'Dribbling': 'dribbling', 'Short passing': 'short_passing',
+}
+
+
+# ===== Micro-batching =====
+class _Pending:
+    __slots__ = ('item', 'result', 'error', 'done')
+
+    def __init__(self, item):
+        self.item = item
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class MicroBatcher:
+    # The first queued item opens a window of `window` seconds; everything queued by then (up to max_batch)
+    # goes through one score(items) call, which returns one result per item
+    def __init__(self, name, score, window=DEFAULT_WINDOW_MS / 1000, max_batch=MAX_BATCH):
+        self.name = name
+        self.score = score
+        self.window = window
+        self.max_batch = max_batch
+        self.queue = queue.SimpleQueue()
+        self.batches = 0
+        self.items = 0
+        thread = threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True)
+        thread.start()
+
+    def submit_many(self, items, timeout=REQUEST_TIMEOUT):
+        pending = [_Pending(item) for item in items]
+        for p in pending:
+            self.queue.put(p)
+        deadline = time.monotonic() + timeout
+        for p in pending:
+            if not p.done.wait(max(deadline - time.monotonic(), 0)):
+                raise TimeoutError(f"{self.name}: no result within {timeout:.0f}s")
+            if p.error is not None:
+                raise p.error
+        return [p.result for p in pending]
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            start = time.perf_counter()
+            try:
+                results = self.score([p.item for p in batch])
+            except Exception as e:
+                # Score the items one by one so only the item that breaks the model fails
+                if len(batch) == 1:
+                    batch[0].error = e
+                    batch[0].done.set()
+                    continue
+                results = []
+                for p in batch:
+                    try:
+                        results.append(self.score([p.item])[0])
+                    except Exception as item_error:
+                        p.error = item_error
+                        results.append(None)
+            perf.record(f'batch.{self.name}', (time.perf_counter() - start) * 1000)
+            self.batches += 1
+            self.items += len(batch)
+            for p, result in zip(batch, results):
+                p.result = result
+                p.done.set()
+
+
+def finite_number(payload, key, default=None, positive=False):
+    # A JSON number as a finite float; NaN / infinity (1e400) would poison every row of the model call
+    value = payload.get(key, default)
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        raise ValueError(f"'{key}' must be a number")
+    try:
+        value = float(value)
+    except OverflowError:  # integers beyond float range
+        value = math.inf
+    if not math.isfinite(value) or (positive and value <= 0):
+        raise ValueError(f"'{key}' must be a finite{' positive' if positive else ''} number")
+    return value
+
+
+# ===== Models: request payload -> feature row (connection thread), rows -> results (batcher thread) =====
+# Each model predicts from its memory-mapped NumPy export when one matches the pickle on disk (sklearn forests
+# spend ~10 ms per call walking trees in Python, whatever the batch size), otherwise from the pickle.
+class PlayerValueModel:
+    def __init__(self, numpy_models=False):
+        self.model = shared_model('player_value_model', enabled=numpy_models) or load_player_value_model()
+        self.backend = 'numpy' if isinstance(self.model, NumpyModel) else 'sklearn'
+
+    def prepare(self, payload):
+        row = {}
+        for ui, column in PLAYER_FIELDS.items():
+            row[ui] = finite_number(payload, ui if ui in payload else column)
+        position = payload.get('Best position', payload.get('best_position'))
+        if not isinstance(position, str):
+            raise ValueError("'Best position' must be a position such as 'ST'")
+        row['Best position'] = position
+        return row
+
+    def score(self, rows):
+        values = np.exp(self.model.predict(encode_players(pd.DataFrame(rows), self.model)))
+        return [{'value': round(float(v), 2)} for v in values]
+
+
+class PreMatchModel:
+    def __init__(self, numpy_models=False, db_path=database_path):
+        conn = sqlite3.connect(db_path)
+        teams = pd.read_sql_query("SELECT * FROM team_stats WHERE year = '2025'", conn)
+        conn.close()
+        if teams.empty:
+            raise LookupError("team_stats has no 2025 rows")
+        teams = teams.drop_duplicates('team')
+        self.teams = dict(zip(teams['team'], teams[TEAM_FEATURES].to_numpy(dtype=float)))
+        self.shared = shared_model('pre_match_result_model', enabled=numpy_models)
+        self.backend = 'sklearn' if self.shared is None else 'numpy'
+        if self.shared is None:
+            predict_match_probabilities(pd.DataFrame(np.zeros((1, len(FEATURES))), columns=FEATURES))  # load once
+
+    def prepare(self, payload):
+        try:
+            home, away = self.teams[payload['home']], self.teams[payload['away']]
+        except KeyError as e:
+            raise ValueError(f"unknown or missing team: {e}")
+        odds = [finite_number(payload, key, default, positive=True)
+                for key, default in zip(('odds_h', 'odds_d', 'odds_a'), DEFAULT_ODDS)]
+        # Same layout as build_match_features: implied probabilities, then home - away differences
+        return np.concatenate([implied_probabilities(*odds), home - away])
+
+    def score(self, rows):
+        X = np.stack(rows)
+        if self.shared is not None:
+            proba = self.shared.predict_proba(X)
+        else:
+            proba = predict_match_probabilities(pd.DataFrame(X, columns=FEATURES))
+        return [{'prediction': 'Home Win' if p_h >= 0.5 else 'Away Win',
+                 'probabilities': {'Home Win': round(float(p_h), 3), 'Away Win': round(1 - float(p_h), 3)}}
+                for p_h in proba[:, 0]]
+
+
+class InMatchModel:
+    def __init__(self, numpy_models=False):
+        self.index = ClubIndex(*read_data())
+        self.shared = shared_model('in_match_result_model', enabled=numpy_models)
+        self.backend = 'sklearn' if self.shared is None else 'numpy'
+        if self.shared is not None:
+            classes = list(self.shared.classes_)
+        else:
+            self.model, scaler = load_model_and_scaler()
+            # StandardScaler applied by hand, as in live_scoring: skips sklearn's per-call validation
+            self.mean, self.scale = scaler.mean_, scaler.scale_
+            classes = list(self.model.classes_)
+        self.class_idx = [classes.index(c) for c in ('H', 'D', 'A')]
+
+    def prepare(self, payload):
+        x = np.empty(len(FEATURE_COLS))
+        try:
+            x[TEAM_IDX] = self.index.team_vector(payload['home'], payload['away'], payload.get('season'))
+            x[HTHG_IDX], x[HTAG_IDX] = finite_number(payload, 'hthg', 0), finite_number(payload, 'htag', 0)
+            odds = odds_features(*(finite_number(payload, key, positive=True)
+                                   for key in ('odds_h', 'odds_d', 'odds_a')))
+        except (KeyError, IndexError) as e:
+            raise ValueError(f"unknown or missing team / field: {e}")
+        x[ODDS_IDX] = [odds[k] for k in ODDS_KEYS]
+        return x
+
+    def score(self, rows):
+        X = np.stack(rows)
+        if self.shared is not None:
+            proba = self.shared.predict_proba(X)
+        else:
+            proba = self.model.predict_proba((X - self.mean) / self.scale)
+        proba = proba[:, self.class_idx]
+        return [{'prediction': 'HDA'[int(np.argmax(p))],
+                 'probabilities': {'H': round(float(p[0]), 4), 'D': round(float(p[1]), 4), 'A': round(float(p[2]), 4)}}
+                for p in proba]
+
+
+MODELS = {
+    'player_value': PlayerValueModel,
+    'pre_match': PreMatchModel,
+    'in_match': InMatchModel,
+}
+
+
+# ===== HTTP =====
+class PredictionService:
+    def __init__(self, window=DEFAULT_WINDOW_MS / 1000, max_batch=MAX_BATCH, numpy_models=False, endpoints=MODELS):
+        self.models = {}
+        self.batchers = {}
+        self.started = time.time()
+        self.requests = Counter()
+        self.requests_lock = threading.Lock()
+        for name, model_class in endpoints.items():
+            start = time.perf_counter()
+            try:
+                model = model_class(numpy_models)
+            except (FileNotFoundError, LookupError, sqlite3.Error) as e:
+                print(f"Endpoint /predict/{name} disabled: {type(e).__name__}: {e}")
+                continue
+            self.models[name] = model
+            self.batchers[name] = MicroBatcher(name, model.score, window, max_batch)
+            print(f"Loaded {name} ({model.backend}) in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def predict(self, name, payload):
+        model = self.models[name]
+        items = payload if isinstance(payload, list) else [payload]
+        if not all(isinstance(item, dict) for item in items):
+            raise ValueError("expected a JSON object or a list of objects")
+        results = self.batchers[name].submit_many([model.prepare(item) for item in items])
+        return results if isinstance(payload, list) else results[0]
+
+    def count(self, endpoint, status):
+        with self.requests_lock:
+            self.requests[(endpoint, status)] += 1
+
+    def health(self):
+        return {
+            'status': 'ok' if self.models else 'no models',
+            'endpoints': sorted(self.models),
+            'backends': {name: model.backend for name, model in self.models.items()},
+            'uptime_s': round(time.time() - self.started, 1),
+            'pid': os.getpid(),
+            'queue_depth': {name: b.queue.qsize() for name, b in self.batchers.items()},
+        }
+
+    def metrics_text(self):
+        lines = ['# HELP fm_http_requests_total HTTP requests by endpoint and status',
+                 '# TYPE fm_http_requests_total counter']
+        with self.requests_lock:
+            counts = sorted(self.requests.items())
+        for (endpoint, status), n in counts:
+            lines.append(f'fm_http_requests_total{{endpoint="{endpoint}",status="{status}"}} {n}')
+        lines += ['# HELP fm_batch_items_total Items scored / model calls made by each batcher',
+                  '# TYPE fm_batch_items_total counter', '# TYPE fm_batches_total counter']
+        for name, b in sorted(self.batchers.items()):
+            lines.append(f'fm_batch_items_total{{model="{name}"}} {b.items}')
+            lines.append(f'fm_batches_total{{model="{name}"}} {b.batches}')
+        return "\n".join(lines) + "\n" + perf.prometheus_text()
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive: load generators and upstream services reuse connections. Without TCP_NODELAY the
+        # headers / body writes wait on delayed ACKs (~40 ms per response)
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def send(self, status, body, content_type='application/json'):
+            data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self.send(200, service.health())
+            elif self.path == '/metrics':
+                self.send(200, service.metrics_text(), 'text/plain; version=0.0.4')
+            else:
+                self.send(404, {'error': f"no route {self.path}"})
+
+        def do_POST(self):
+            start = time.perf_counter()
+            name = self.path.removeprefix('/predict/')
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if name not in service.models:
+                status, result = 404, {'error': f"no model at {self.path}"}
+            else:
+                try:
+                    status, result = 200, service.predict(name, json.loads(body))
+                except (ValueError, TypeError) as e:  # includes json.JSONDecodeError
+                    status, result = 400, {'error': str(e)}
+                except TimeoutError as e:
+                    status, result = 503, {'error': str(e)}
+                except Exception as e:
+                    status, result = 500, {'error': f"{type(e).__name__}: {e}"}
+            self.send(status, result)
+            service.count(name, status)
+            perf.record(f'http.{name}', (time.perf_counter() - start) * 1000)
+
+    return Handler
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # socketserver's default listen backlog of 5 resets connections when many clients connect at once
+    request_queue_size = 1024
+    reuse_port = False
+
+    def server_bind(self):
+        # Several worker processes listen on the same port; the kernel spreads connections between them
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+def serve(host='127.0.0.1', port=8765, window_ms=DEFAULT_WINDOW_MS, max_batch=MAX_BATCH, numpy_models=False,
+          workers=1):
+    if workers > 1:
+        # The GIL keeps one process on one core. With --numpy the exports are memory-mapped, so each extra
+        # worker only adds its own interpreter and buffers (see components/numpy_inference.py)
+        processes = [multiprocessing.Process(target=serve_worker,
+                                             args=(host, port, window_ms, max_batch, numpy_models, True))
+                     for _ in range(workers)]
+        for p in processes:
+            p.start()
+        # Stopping the parent (Ctrl+C or SIGTERM) stops every worker with it
+        signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+        try:
+            for p in processes:
+                p.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for p in processes:
+                p.terminate()
+                p.join()
+        return
+    serve_worker(host, port, window_ms, max_batch, numpy_models)
+
+
+def serve_worker(host, port, window_ms, max_batch, numpy_models, reuse_port=False):
+    service = PredictionService(window_ms / 1000, max_batch, numpy_models)
+    server = Server((host, port), make_handler(service), bind_and_activate=False)
+    server.reuse_port = reuse_port
+    try:
+        server.server_bind()
+        server.server_activate()
+    except OSError:
+        server.server_close()
+        raise
+    print(f"Serving {', '.join(f'/predict/{name}' for name in service.models)} on http://{host}:{port} "
+          f"(pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="HTTP prediction service with request micro-batching")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--window-ms', type=float, default=DEFAULT_WINDOW_MS,
+                        help="how long the first request of a batch waits for others to join it")
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH)
+    # sklearn is 2-4x faster on the batches the batcher builds; the NumPy exports trade that for one shared copy
+    # of each model across --workers
+    parser.add_argument('--numpy', action='store_true',
+                        help="predict from the memory-mapped NumPy exports where a current one exists")
+    parser.add_argument('--workers', type=int, default=1, help="server processes sharing the port")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.window_ms, args.max_batch, args.numpy, args.workers)
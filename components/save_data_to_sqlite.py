@@ -1,227 +1,445 @@
 import pandas as pd
 import sqlite3
 import glob
+import hashlib
 import os
-
-
-def save_match_data():
-    create_match_stats = """CREATE TABLE match_stats (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        home_team TEXT NOT NULL,
-        away_team TEXT NOT NULL,
-        season TEXT NOT NULL,
-        ftr TEXT,
-        b365h REAL,
-        b365d REAL,
-        b365a REAL,
-        b365_prob_h REAL,
-        b365_prob_d REAL,
-        b365_prob_a REAL
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+create_match_stats = """CREATE TABLE IF NOT EXISTS match_stats (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    season TEXT NOT NULL,
+    ftr TEXT,
+    b365h REAL,
+    b365d REAL,
+    b365a REAL,
+    b365_prob_h REAL,
+    b365_prob_d REAL,
+    b365_prob_a REAL,
+    source_file TEXT
+);"""
+
+create_team_stats = """CREATE TABLE IF NOT EXISTS team_stats (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    team TEXT NOT NULL,
+    league TEXT NOT NULL,
+    year TEXT NOT NULL,
+    overall INTEGER,
+    attack INTEGER,
+    midfield INTEGER,
+    defence INTEGER,
+    players INTEGER,
+    starting_xi_avg_age REAL);"""
+
+create_player_stats = """CREATE TABLE IF NOT EXISTS player_stats (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    full_name TEXT NOT NULL,
+    age INTEGER,
+    year TEXT NOT NULL,
+    overall_rating INTEGER,
+    potential INTEGER,
+    best_position TEXT,
+    team TEXT,
+    height_cm REAL,
+    weight_kg REAL,
+    value REAL,
+    wage REAL,
+    short_passing INTEGER,
+    dribbling INTEGER,
+    stamina INTEGER,
+    total_goalkeeping INTEGER
     );"""
-    cursor.execute("DROP TABLE IF EXISTS match_stats")
-    cursor.execute(create_match_stats)
-
-    team_name = {
-        # England
-        "Man City": "Manchester City",
-        "Man United": "Manchester United",
-        "Spurs": "Tottenham Hotspur",
-        "Wolves": "Wolverhampton Wanderers",
-        "Newcastle": "Newcastle United",
-        "West Brom": "West Bromwich Albion",
-        "Sheff Utd": "Sheffield United",
-        "Nott'm Forest": "Nottingham Forest",
-        "Leeds": "Leeds United",
-        "Brighton": "Brighton & Hove Albion",
-        "Birmingham": "Birmingham City",
-        "Blackburn": "Blackburn Rovers",
-        "Bolton": "Bolton Wanderers",
-        "Stoke": "Stoke City",
-        "Wigan": "Wigan Athletic",
-        "West Ham": "West Ham United",
-
-        # France
-        "PSG": "Paris Saint-Germain",
-        "AS Nancy": "AS Nancy-Lorraine",
-        "Arles": "AC Arles-Avignon",
-        "Auxerre": "AJ Auxerre",
-        "Brest": "Stade Brestois 29",
-        "Caen": "Stade Malherbe Caen",
-        "Lorient": "FC Lorient",
-        "Nice": "OGC Nice",
-        "Saint Etienne": "AS Saint-Étienne",
-        "Sochaux": "FC Sochaux-Montbéliard",
-
-        # Germany
-        "Bayern Munich": "FC Bayern München",
-        "Wolfsburg": "VfL Wolfsburg",
-        "Monchengladbach": "Borussia Mönchengladbach",
-        "Nurnberg": "1. FC Nürnberg",
-        "St Pauli": "FC St. Pauli",
-        "Hoffenheim": "TSG 1899 Hoffenheim",
-
-        # Italy
-        "AC Milan": "Milan",
-        "Inter": "Internazionale",
-        "Lazio": "SS Lazio",
-        "Cagliari": "Cagliari Calcio",
-        "Cesena": "AC Cesena",
-        "Lecce": "US Lecce",
-
-        # Spain
-        "Atletico": "Atlético Madrid",
-        "Mallorca": "RCD Mallorca",
-        "Hercules": "Hércules CF",
-        "Racing": "Racing Santander",
-        "Sporting": "Sporting Gijón",
-        "Zaragoza": "Real Zaragoza",
-        "Real Madrid": "Real Madrid CF",
-        "Barcelona": "FC Barcelona",
-    }
 
-    def map_team_name(name):
-        return team_name.get(name, name)
+# One row per ingested source file; lets a refresh skip files whose content did not change
+create_etl_manifest = """CREATE TABLE IF NOT EXISTS etl_manifest (
+    path TEXT PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    partition_key TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sha256 TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    loaded_at REAL NOT NULL
+);"""
+
+TEAM_NAME = {
+    # England
+    "Man City": "Manchester City",
+    "Man United": "Manchester United",
+    "Spurs": "Tottenham Hotspur",
+    "Wolves": "Wolverhampton Wanderers",
+    "Newcastle": "Newcastle United",
+    "West Brom": "West Bromwich Albion",
+    "Sheff Utd": "Sheffield United",
+    "Nott'm Forest": "Nottingham Forest",
+    "Leeds": "Leeds United",
+    "Brighton": "Brighton & Hove Albion",
+    "Birmingham": "Birmingham City",
+    "Blackburn": "Blackburn Rovers",
+    "Bolton": "Bolton Wanderers",
+    "Stoke": "Stoke City",
+    "Wigan": "Wigan Athletic",
+    "West Ham": "West Ham United",
+
+    # France
+    "PSG": "Paris Saint-Germain",
+    "AS Nancy": "AS Nancy-Lorraine",
+    "Arles": "AC Arles-Avignon",
+    "Auxerre": "AJ Auxerre",
+    "Brest": "Stade Brestois 29",
+    "Caen": "Stade Malherbe Caen",
+    "Lorient": "FC Lorient",
+    "Nice": "OGC Nice",
+    "Saint Etienne": "AS Saint-Étienne",
+    "Sochaux": "FC Sochaux-Montbéliard",
+
+    # Germany
+    "Bayern Munich": "FC Bayern München",
+    "Wolfsburg": "VfL Wolfsburg",
+    "Monchengladbach": "Borussia Mönchengladbach",
+    "Nurnberg": "1. FC Nürnberg",
+    "St Pauli": "FC St. Pauli",
+    "Hoffenheim": "TSG 1899 Hoffenheim",
+
+    # Italy
+    "AC Milan": "Milan",
+    "Inter": "Internazionale",
+    "Lazio": "SS Lazio",
+    "Cagliari": "Cagliari Calcio",
+    "Cesena": "AC Cesena",
+    "Lecce": "US Lecce",
+
+    # Spain
+    "Atletico": "Atlético Madrid",
+    "Mallorca": "RCD Mallorca",
+    "Hercules": "Hércules CF",
+    "Racing": "Racing Santander",
+    "Sporting": "Sporting Gijón",
+    "Zaragoza": "Real Zaragoza",
+    "Real Madrid": "Real Madrid CF",
+    "Barcelona": "FC Barcelona",
+}
+
+def map_team_name(name):
+    return TEAM_NAME.get(name, name)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def leading_number(series):
+    # Numeric columns are used as-is; only text cells ("68+2", "177cm / 5'10\"") go through the regex
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    numbers = pd.to_numeric(series, errors='coerce')
+    text = numbers.isna() & series.notna()
+    if text.any():
+        numbers[text] = series[text].astype(str).str.extract(r'(\d+)', expand=False).astype(float)
+    return numbers
+
+
+# ===== Per-file parsers: each returns the rows of one source file, already in table layout =====
+def parse_match_file(file):
+    # Extract and format season
+    raw_season = os.path.splitext(os.path.basename(file))[0].split('_')[1]  # e.g. '2020-2021'
+    start_year, end_year = raw_season.split('-')
+    season = f"{start_year}/{end_year[2:]}"  # e.g. '2020/21'
+    df_match = pd.read_csv(file)
+    df_match['Season'] = season
+    df_match = df_match[['HomeTeam', 'AwayTeam', 'Season', 'FTR', 'B365H', 'B365D', 'B365A']]
+    inverse = 1 / df_match[['B365H', 'B365D', 'B365A']]
+    total = inverse.sum(axis=1)
+    df_match['b365_prob_H'] = inverse['B365H'] / total
+    df_match['b365_prob_D'] = inverse['B365D'] / total
+    df_match['b365_prob_A'] = inverse['B365A'] / total
+    df_match['HomeTeam'] = df_match['HomeTeam'].map(map_team_name)
+    df_match['AwayTeam'] = df_match['AwayTeam'].map(map_team_name)
+    df_match.columns = ['home_team', 'away_team', 'season', 'ftr', 'b365h', 'b365d', 'b365a', 'b365_prob_h',
+                        'b365_prob_d', 'b365_prob_a']
+    df_match = df_match.dropna()
+    df_match['source_file'] = os.path.basename(file)
+    return df_match
+
+
+def parse_team_file(file):
+    df_team = pd.read_csv(file)
+    df_team[['Team', 'League']] = df_team['Name'].str.split('\n', expand=True)
+    df_team['Year'] = os.path.basename(file)[-8:-4]
+    df_team.drop(columns=['Name'], inplace=True)
+    df_team.rename(columns={'Starting XI average age': 'starting_xi_avg_age'}, inplace=True)
+    df_team = df_team[['Team', 'League', 'Year', 'Overall', 'Attack', 'Midfield', 'Defence', 'Players', 'starting_xi_avg_age']]
+    df_team.columns = ['team', 'league', 'year', 'overall', 'attack', 'midfield', 'defence', 'players',
+                       'starting_xi_avg_age']
+    return df_team
+
+
+def parse_player_file(file):
+    df_player = pd.read_csv(file)
+    df_player['year'] = os.path.basename(file)[-8:-4]
+
+    df_player['team'] = df_player['Team & Contract'].str.partition('\n')[0]
+
+    # "177cm / 5'10\"" and "78kg / 172lbs": the metric number is everything before the unit
+    df_player['height_cm'] = pd.to_numeric(df_player['Height'].str.partition('cm')[0], errors='coerce')
+    df_player['weight_kg'] = pd.to_numeric(df_player['Weight'].str.partition('kg')[0], errors='coerce')
+
+    # Ratings are scraped as "80\n+2" for players with an in-season update
+    for col in ['Overall rating', 'Potential', 'Stamina', 'Dribbling', 'Short passing']:
+        df_player[col] = leading_number(df_player[col])
+
+    df_player.rename(columns={
+        'Full Name': 'full_name',
+        'Age': 'age',
+        'Overall rating': 'overall_rating',
+        'Potential': 'potential',
+        'Best position': 'best_position',
+        'Value': 'value',
+        'Wage': 'wage',
+        'Short passing': 'short_passing',
+        'Dribbling': 'dribbling',
+        'Stamina': 'stamina',
+        'Total goalkeeping': 'total_goalkeeping'
+    }, inplace=True)
+
+    return df_player[[
+        'full_name', 'age', 'year', 'overall_rating', 'potential', 'best_position',
+        'team', 'height_cm', 'weight_kg',
+        'value', 'wage', 'short_passing', 'dribbling', 'stamina', 'total_goalkeeping'
+    ]]
+
+
+def parse_safely(parse, file):
+    try:
+        return parse(file), None
+    except Exception as e:
+        return None, e
+
+
+def parse_files(parse, files, workers=1):
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(parse_safely, repeat(parse), files))
+    return [parse_safely(parse, file) for file in files]
+
+
+INSERT_BATCH_SIZE = 50_000
+
+
+def insert_rows(table, df):
+    columns = ', '.join(df.columns)
+    placeholders = ', '.join('?' * len(df.columns))
+    sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+    for start in range(0, len(df), INSERT_BATCH_SIZE):
+        batch = df.iloc[start:start + INSERT_BATCH_SIZE]
+        cursor.executemany(sql, batch.astype(object).where(batch.notna(), None).itertuples(index=False, name=None))
+
+
+def bulk_load_pragmas(enabled, previous=None):
+    # enabled=True returns the settings it replaced; pass them back with enabled=False to restore them
+    if enabled:
+        previous = {pragma: cursor.execute(f"PRAGMA {pragma}").fetchone()[0]
+                    for pragma in ('journal_mode', 'synchronous', 'cache_size', 'temp_store')}
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA cache_size = -262144")  # 256 MB
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        return previous
+    previous = previous or {'journal_mode': 'delete', 'synchronous': 2, 'cache_size': -2000, 'temp_store': 0}
+    # Leaving WAL checkpoints the log and removes the -wal / -shm files next to the shipped database
+    for pragma, value in previous.items():
+        cursor.execute(f"PRAGMA {pragma} = {value}")
+    return None
+
+
+def ensure_search_index(conn, fts, table, column):
+    # Trigram FTS5 index over table.column with rowid = table.id (case-insensitive substring search). Rebuilt when
+    # it does not cover the table, e.g. databases loaded before sync_table maintained it; True when rebuilt
+    conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({column}, tokenize='trigram')")
+    fts_state = conn.execute(f"SELECT count(*), min(rowid), max(rowid) FROM {fts}").fetchone()
+    table_state = conn.execute(f"SELECT count(*), min(id), max(id) FROM {table}").fetchone()
+    if fts_state == table_state:
+        return False
+    with conn:
+        conn.execute(f"DELETE FROM {fts}")
+        conn.execute(f"INSERT INTO {fts} (rowid, {column}) SELECT id, {column} FROM {table}")
+    return True
+
+
+def ensure_player_name_index(conn):
+    # Name search of the preset player picker (components/player_query.py)
+    return ensure_search_index(conn, 'player_name_fts', 'player_stats', 'full_name')
+
+
+def existing_tables(names):
+    return [name for name in names if cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()]
+
+
+# ===== Incremental sync =====
+def sync_table(table, create_sql, files, parse, key_column, key_for_file, full=False, workers=1, dependents=(),
+               search_index=None):
+    # dependents: (table, column) pairs holding this table's AUTOINCREMENT ids. Replaced partitions get new ids,
+    # so rows pointing at the old ones are deleted with them instead of going stale (or matching a new row)
+    # search_index: (FTS table, text column) indexed by this table's ids; replaced with each partition
+    dependents = [(name, column) for name, column in dependents if existing_tables([name])]
+    if full:
+        with connection:
+            for name, _ in dependents:
+                cursor.execute(f"DELETE FROM {name}")
+            if search_index and existing_tables([search_index[0]]):
+                cursor.execute(f"DELETE FROM {search_index[0]}")
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute("DELETE FROM etl_manifest WHERE table_name = ?", (table,))
+    cursor.execute(create_sql)
+    if search_index:
+        ensure_search_index(connection, search_index[0], table, search_index[1])
+
+    manifest = {
+        path: (size, mtime, sha256)
+        for path, size, mtime, sha256 in cursor.execute(
+            "SELECT path, size, mtime, sha256 FROM etl_manifest WHERE table_name = ?", (table,))
+    }
 
+    changed = []
+    touched = []
+    for file in sorted(files):
+        path = os.path.abspath(file)
+        stat = os.stat(path)
+        known = manifest.get(path)
+        if known and known[:2] == (stat.st_size, stat.st_mtime):
+            continue
+        sha256 = file_sha256(path)
+        if known and known[2] == sha256:
+            touched.append((stat.st_size, stat.st_mtime, path))
+            continue
+        changed.append((file, path, stat, sha256))
+
+    current = {os.path.abspath(file) for file in files}
+    removed = [path for path in manifest if path not in current]
+
+    start = time.perf_counter()
+    parsed = []
+    results = parse_files(parse, [file for file, _, _, _ in changed], workers)
+    for (file, path, stat, sha256), (df, error) in zip(changed, results):
+        if error is not None:
+            print(f"Error reading {file}: {error}")
+            continue
+        parsed.append((path, stat, sha256, df))
+    parse_seconds = time.perf_counter() - start
+
+    # All replacements for this table land in one transaction
+    start = time.perf_counter()
+    total_rows = 0
+    with connection:
+        cursor.executemany("UPDATE etl_manifest SET size = ?, mtime = ? WHERE path = ?", touched)
+        def delete_partition(key):
+            for name, column in dependents:
+                cursor.execute(f"DELETE FROM {name} WHERE {column} IN (SELECT id FROM {table} WHERE {key_column} = ?)",
+                               (key,))
+            if search_index:
+                cursor.execute(f"DELETE FROM {search_index[0]} WHERE rowid IN "
+                               f"(SELECT id FROM {table} WHERE {key_column} = ?)", (key,))
+            cursor.execute(f"DELETE FROM {table} WHERE {key_column} = ?", (key,))
+
+        for path in removed:
+            key = cursor.execute("SELECT partition_key FROM etl_manifest WHERE path = ?", (path,)).fetchone()[0]
+            delete_partition(key)
+            cursor.execute("DELETE FROM etl_manifest WHERE path = ?", (path,))
+        for path, stat, sha256, df in parsed:
+            key = key_for_file(path)
+            delete_partition(key)
+            insert_rows(table, df)
+            if search_index:
+                # One set-based insert per partition: far cheaper than indexing row by row
+                fts, column = search_index
+                cursor.execute(f"INSERT INTO {fts} (rowid, {column}) SELECT id, {column} FROM {table} "
+                               f"WHERE {key_column} = ?", (key,))
+            cursor.execute(
+                "INSERT OR REPLACE INTO etl_manifest VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, table, key, stat.st_size, stat.st_mtime, sha256, len(df), time.time())
+            )
+            total_rows += len(df)
+
+    insert_seconds = time.perf_counter() - start
+    rate = total_rows / insert_seconds if insert_seconds > 0 else 0
+    print(f"{table}: {len(parsed)} file(s) re-ingested ({total_rows} rows), {len(removed)} removed, "
+          f"{len(files) - len(changed)} unchanged; parse {parse_seconds:.2f}s, "
+          f"insert {insert_seconds:.2f}s ({rate:,.0f} rows/sec)")
+    return total_rows
+
+
+def save_match_data(full=False, workers=1):
     match_path = "../data/match_data"
     files = glob.glob(os.path.join(match_path, '**', '*.csv'), recursive=True)
+    # Seasons are shared between leagues, so match rows are replaced per source file
+    sync_table('match_stats', create_match_stats, files, parse_match_file,
+               'source_file', os.path.basename, full=full, workers=workers)
+
 
-    dataframes = []
-
-    for file in files:
-        try:
-            # Extract and format season
-            raw_season = os.path.splitext(os.path.basename(file))[0].split('_')[1]  # e.g. '2020-2021'
-            start_year, end_year = raw_season.split('-')
-            season = f"{start_year}/{end_year[2:]}"  # e.g. '2020/21'
-            df_match = pd.read_csv(file)
-            df_match['Season'] = season
-            df_match = df_match[['HomeTeam', 'AwayTeam', 'Season', 'FTR', 'B365H', 'B365D', 'B365A']]
-            inverse = 1 / df_match[['B365H', 'B365D', 'B365A']]
-            total = inverse.sum(axis=1)
-            df_match['b365_prob_H'] = inverse['B365H'] / total
-            df_match['b365_prob_D'] = inverse['B365D'] / total
-            df_match['b365_prob_A'] = inverse['B365A'] / total
-            dataframes.append(df_match)
-        except Exception as e:
-            print(f"Error reading {file}: {e}")
-    merged_df = pd.concat(dataframes, ignore_index=True)
-    merged_df['HomeTeam'] = merged_df['HomeTeam'].apply(map_team_name)
-    merged_df['AwayTeam'] = merged_df['AwayTeam'].apply(map_team_name)
-    merged_df.columns = ['home_team', 'away_team', 'season', 'ftr', 'b365h', 'b365d', 'b365a', 'b365_prob_h',
-                         'b365_prob_d', 'b365_prob_a']
-    merged_df.dropna(inplace=True)
-    merged_df.to_sql('match_stats', connection, if_exists='append', index=False)
-    connection.commit()
-
-
-def save_team_data():
+def normalise_player_ratings():
+    # Databases loaded before parse_player_file cleaned ratings still hold text such as "95\n+1", and an
+    # incremental sync never re-reads their unchanged files. CAST keeps the leading number, so potential
+    # sorts numerically in player_query and the preset fields convert with float()
+    with connection:
+        for col in ['overall_rating', 'potential', 'stamina', 'dribbling', 'short_passing']:
+            cursor.execute(f"UPDATE player_stats SET {col} = CAST({col} AS INTEGER) WHERE typeof({col}) = 'text'")
+            if cursor.rowcount:
+                print(f"player_stats: {cursor.rowcount} text {col} value(s) converted to integers")
+
+
+def save_team_data(full=False, workers=1):
     team_path = "../data/team_data"
     files = glob.glob(os.path.join(team_path, '*.csv'))
+    sync_table('team_stats', create_team_stats, files, parse_team_file,
+               'year', lambda path: os.path.basename(path)[-8:-4], full=full, workers=workers)
 
-    create_team_stats = """CREATE TABLE team_stats (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        team TEXT NOT NULL,
-        league TEXT NOT NULL,
-        year TEXT NOT NULL,
-        overall INTEGER,
-        attack INTEGER,
-        midfield INTEGER,
-        defence INTEGER,
-        players INTEGER,
-        starting_xi_avg_age REAL);"""
-
-    cursor.execute("DROP TABLE IF EXISTS team_stats")
-    cursor.execute(create_team_stats)
-
-    dataframes = []
-
-    for file in files:
-        df_team = pd.read_csv(file)
-        df_team[['Team', 'League']] = df_team['Name'].str.split('\n', expand=True)
-        df_team['Year'] = os.path.basename(file)[-8:-4]
-        df_team.drop(columns=['Name'], inplace=True)
-        df_team.rename(columns={'Starting XI average age': 'starting_xi_avg_age'}, inplace=True)
-        df_team = df_team[['Team', 'League', 'Year', 'Overall', 'Attack', 'Midfield', 'Defence', 'Players', 'starting_xi_avg_age']]
-        dataframes.append(df_team)
-
-    merged_df = pd.concat(dataframes, ignore_index=True)
-    merged_df.to_sql('team_stats', connection, if_exists='append', index=False)
-    connection.commit()
-
-
-def save_player_data():
+
+def save_player_data(full=False, workers=1):
     player_path = "../data/player_data"
     files = glob.glob(os.path.join(player_path, '*.csv'))
+    # Materialized valuations (components/player_value_table.py) are keyed by player_stats.id: the app predicts
+    # live until `python -m components.player_value_table` values the reloaded rows again
+    rows = sync_table('player_stats', create_player_stats, files, parse_player_file,
+                      'year', lambda path: os.path.basename(path)[-8:-4], full=full, workers=workers,
+                      dependents=[('player_value_predictions', 'player_id')],
+                      search_index=('player_name_fts', 'full_name'))
+    if rows and existing_tables(['player_value_predictions']):
+        print("player_stats changed: run `python -m components.player_value_table` to value the new rows")
 
-    create_player_stats = """CREATE TABLE player_stats (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        full_name TEXT NOT NULL,
-        age INTEGER,
-        year TEXT NOT NULL,
-        overall_rating INTEGER,
-        potential INTEGER,
-        best_position TEXT,
-        team TEXT,
-        height_cm REAL,
-        weight_kg REAL,
-        value REAL,
-        wage REAL,
-        short_passing INTEGER,
-        dribbling INTEGER,
-        stamina INTEGER,
-        total_goalkeeping INTEGER
-        );"""
-
-    cursor.execute("DROP TABLE IF EXISTS player_stats")
-    cursor.execute(create_player_stats)
-
-    dataframes = []
-
-    for file in files:
-        df_player = pd.read_csv(file)
-        df_player['name'] = df_player['Name'].str.split('\n').str[0]
-        df_player['year'] = os.path.basename(file)[-8:-4]
-
-        df_player['team'] = df_player['Team & Contract'].str.split('\n').str[0]
-        df_player['contract'] = df_player['Team & Contract'].str.split('\n').str[1]
-
-        df_player['height_cm'] = df_player['Height'].str.extract(r'(\d+)cm').astype(float)
-
-        df_player['weight_kg'] = df_player['Weight'].str.extract(r'(\d+)kg').astype(float)
-
-        for col in ['Stamina', 'Dribbling', 'Short passing']:
-            df_player[col] = df_player[col].astype(str).str.extract(r'(\d+)').astype(float)
-
-        df_player.rename(columns={
-            'Full Name': 'full_name',
-            'Age': 'age',
-            'Overall rating': 'overall_rating',
-            'Potential': 'potential',
-            'Best position': 'best_position',
-            'Value': 'value',
-            'Wage': 'wage',
-            'Short passing': 'short_passing',
-            'Dribbling': 'dribbling',
-            'Stamina': 'stamina',
-            'Total goalkeeping': 'total_goalkeeping'
-        }, inplace=True)
-
-        cleaned_df = df_player[[
-            'full_name', 'age', 'year', 'overall_rating', 'potential', 'best_position',
-            'team', 'height_cm', 'weight_kg',
-            'value', 'wage', 'short_passing', 'dribbling', 'stamina', 'total_goalkeeping'
-        ]]
-        dataframes.append(cleaned_df)
-
-    merged_df = pd.concat(dataframes, ignore_index=True)
-    merged_df.to_sql('player_stats', connection, if_exists='append', index=False)
-    connection.commit()
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load the scraped CSVs under data/ into allData.sl3")
+    parser.add_argument('--full', action='store_true', help="drop and rebuild every table")
+    parser.add_argument('--bulk', action='store_true',
+                        help="parse CSVs in a process pool and load with bulk-load PRAGMAs (WAL, synchronous=OFF)")
+    parser.add_argument('--workers', type=int, default=None, help="process pool size for --bulk (default: all cores)")
+    args = parser.parse_args()
+    workers = (args.workers or os.cpu_count() or 1) if args.bulk else 1
+
     connection = sqlite3.connect('../data/allData.sl3')
     cursor = connection.cursor()
-    save_player_data()
-    save_team_data()
-    save_match_data()
+    # Databases built before the manifest existed have no source_file column: rebuild them once
+    has_manifest = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'etl_manifest'").fetchone()
+    full = args.full or not has_manifest
+    cursor.execute(create_etl_manifest)
+    previous_pragmas = bulk_load_pragmas(True) if args.bulk else None
+    try:
+        save_player_data(full, workers)
+        normalise_player_ratings()
+        save_team_data(full, workers)
+        save_match_data(full, workers)
+    finally:
+        if args.bulk:
+            bulk_load_pragmas(False, previous_pragmas)
     cursor.close()
     connection.close()
@@ -0,0 +1,136 @@
+# components/season_simulator.py
+# Monte Carlo season simulator: full double round-robin of a league from 2025 team_stats,
+# fixture probabilities from the pre-match model (one batched call), seasons simulated with NumPy.
+import os
+import sqlite3
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from components.fixture_matrix import DEFAULT_ODDS, fixture_matrix
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+database_path = os.path.join(base_path, '..', 'data', 'allData.sl3')
+
+SEASON_CHUNK = 10_000
+MAX_POINTS = 3 * 2 * 19  # 20-team league; widened automatically for bigger leagues
+
+
+def load_league_teams(league=None, year='2025', db_path=database_path):
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query("SELECT * FROM team_stats WHERE year = ?", conn, params=(str(year),))
+    conn.close()
+    if league is None:
+        league = df['league'].value_counts().idxmax()
+    return df[df['league'] == league].reset_index(drop=True)
+
+
+def build_fixtures(n_teams):
+    # Every ordered (home, away) pair once: a double round-robin
+    home, away = np.nonzero(~np.eye(n_teams, dtype=bool))
+    return home, away
+
+
+def fixture_probabilities(teams, home, away, odds=DEFAULT_ODDS):
+    matrix = fixture_matrix(teams, odds)
+    home_win = matrix['home_win'].loc[teams['team'], teams['team']].to_numpy()
+    # The pre-match model has no draw class: keep the market's draw probability, split the rest by the model
+    p_draw = np.full(len(home), matrix['implied'][1])
+    p_home = home_win[home, away] * (1 - p_draw)
+    return np.column_stack([p_home, p_draw, 1 - p_home - p_draw])
+
+
+def simulate_points(probs, home, away, n_teams, n_seasons, seed=None):
+    rng = np.random.default_rng(seed)
+    n_fixtures = len(home)
+    home_onehot = np.zeros((n_fixtures, n_teams), dtype=np.float32)
+    away_onehot = np.zeros((n_fixtures, n_teams), dtype=np.float32)
+    home_onehot[np.arange(n_fixtures), home] = 1
+    away_onehot[np.arange(n_fixtures), away] = 1
+    cut_home = probs[:, 0].astype(np.float32)
+    cut_draw = (probs[:, 0] + probs[:, 1]).astype(np.float32)
+
+    points = np.empty((n_seasons, n_teams), dtype=np.int16)
+    for start in range(0, n_seasons, SEASON_CHUNK):
+        stop = min(start + SEASON_CHUNK, n_seasons)
+        u = rng.random((stop - start, n_fixtures), dtype=np.float32)
+        home_win = u < cut_home
+        draw = (u >= cut_home) & (u < cut_draw)
+        home_pts = 3 * home_win + draw
+        away_pts = 3 * (u >= cut_draw) + draw
+        points[start:stop] = home_pts.astype(np.float32) @ home_onehot + away_pts.astype(np.float32) @ away_onehot
+    return points
+
+
+def _simulate_worker(args):
+    return simulate_points(*args)
+
+
+def finishing_positions(points, seed=None):
+    # Rank by points; ties are broken at random (no goal difference in this model)
+    rng = np.random.default_rng(seed)
+    keys = points + rng.random(points.shape, dtype=np.float32) * 0.5
+    order = np.argsort(-keys, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(points.shape[1])[None, :], axis=1)
+    return positions + 1
+
+
+def simulate_season(league=None, n_seasons=100_000, odds=DEFAULT_ODDS, seed=None, workers=1, teams=None):
+    start = time.perf_counter()
+    if teams is None:
+        teams = load_league_teams(league)
+    teams = teams.drop_duplicates('team').reset_index(drop=True)
+    n_teams = len(teams)
+    home, away = build_fixtures(n_teams)
+    probs = fixture_probabilities(teams, home, away, odds)
+
+    if workers > 1:
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        sizes = [len(part) for part in np.array_split(np.arange(n_seasons), workers)]
+        jobs = [(probs, home, away, n_teams, size, s) for size, s in zip(sizes, seeds)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            points = np.concatenate(list(pool.map(_simulate_worker, jobs)))
+    else:
+        points = simulate_points(probs, home, away, n_teams, n_seasons, seed)
+
+    positions = finishing_positions(points, seed)
+    relegated = positions > n_teams - 3
+    summary = pd.DataFrame({
+        'team': teams['team'],
+        'expected_points': points.mean(axis=0),
+        'points_p5': np.percentile(points, 5, axis=0),
+        'points_p50': np.percentile(points, 50, axis=0),
+        'points_p95': np.percentile(points, 95, axis=0),
+        'title_odds': (positions == 1).mean(axis=0),
+        'top4_odds': (positions <= 4).mean(axis=0),
+        'relegation_odds': relegated.mean(axis=0),
+        'expected_position': positions.mean(axis=0),
+    }).sort_values('expected_position').reset_index(drop=True)
+
+    max_points = max(MAX_POINTS, 3 * 2 * (n_teams - 1))
+    distribution = np.stack([np.bincount(points[:, i], minlength=max_points + 1) for i in range(n_teams)])
+    print(f"Simulated {n_seasons} seasons of {n_teams} teams in {time.perf_counter() - start:.2f}s")
+    return {
+        'summary': summary,
+        'points_distribution': pd.DataFrame(distribution, index=teams['team']),
+        'fixture_probabilities': pd.DataFrame({
+            'home_team': teams['team'].to_numpy()[home],
+            'away_team': teams['team'].to_numpy()[away],
+            'home_win': probs[:, 0], 'draw': probs[:, 1], 'away_win': probs[:, 2],
+        }),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Monte Carlo season simulation from 2025 team_stats")
+    parser.add_argument('--league', default=None)
+    parser.add_argument('--seasons', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    result = simulate_season(args.league, args.seasons, seed=args.seed, workers=args.workers)
+    print(result['summary'].to_string())
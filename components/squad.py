@@ -0,0 +1,126 @@
+# components/squad.py
+# Compact in-memory player records for the recruit / squad pages.
+# Values are kept as numbers; "€12,345.00" strings are only produced when a table is rendered.
+from collections import Counter
+
+import pandas as pd
+
+# Record attribute -> column name shown in the UI (same names as the player input form)
+UI_COLUMNS = {
+    'name': 'Name',
+    'age': 'Age',
+    'height': 'Height',
+    'weight': 'Weight',
+    'potential': 'Potential',
+    'position': 'Best position',
+    'stamina': 'Stamina',
+    'dribbling': 'Dribbling',
+    'short_passing': 'Short passing',
+    'value': 'Value',
+}
+
+VALUE_FORMAT = {'Value': '€{:,.2f}'}
+
+NOT_ENOUGH_BUDGET = "Not enough budget!"
+ALREADY_IN_TEAM = "This player is already in your team."
+
+
+class Player:
+    __slots__ = ('player_id', 'name', 'age', 'height', 'weight', 'potential', 'position',
+                 'stamina', 'dribbling', 'short_passing', 'value')
+
+    def __init__(self, name, age, height, weight, potential, position, stamina, dribbling, short_passing,
+                 value=0.0, player_id=None):
+        self.player_id = player_id
+        self.name = name
+        self.age = int(age)
+        self.height = int(height)
+        self.weight = int(weight)
+        self.potential = int(potential)
+        self.position = position
+        self.stamina = int(stamina)
+        self.dribbling = int(dribbling)
+        self.short_passing = int(short_passing)
+        self.value = float(value)
+
+    @classmethod
+    def from_input(cls, input_data, value, player_id=None):
+        # input_data: the UI-named dict that is also passed to predict_player_value
+        return cls(input_data['Name'], input_data['Age'], input_data['Height'], input_data['Weight'],
+                   input_data['Potential'], input_data['Best position'], input_data['Stamina'],
+                   input_data['Dribbling'], input_data['Short passing'], round(value, 2), player_id)
+
+    def to_row(self):
+        return {column: getattr(self, attr) for attr, column in UI_COLUMNS.items()}
+
+
+def players_frame(players):
+    # One row per record with the UI column names; Value stays numeric (format with VALUE_FORMAT)
+    return pd.DataFrame([p.to_row() for p in players], columns=list(UI_COLUMNS.values()))
+
+
+class SquadLedger:
+    # The recruited squad: players by name (insertion ordered) plus an id index, with the team value,
+    # remaining budget and per-position counts kept up to date on every add / remove
+    __slots__ = ('players', 'ids', 'total_value', 'budget', 'position_counts')
+
+    def __init__(self, budget=100_000_000, players=()):
+        self.players = {}
+        self.ids = {}
+        self.total_value = 0.0
+        self.budget = float(budget)
+        self.position_counts = Counter()
+        self.add_many(players)
+
+    def __len__(self):
+        return len(self.players)
+
+    def __iter__(self):
+        return iter(self.players.values())
+
+    def __contains__(self, name):
+        return name in self.players
+
+    def validate(self, player):
+        # None when the player can be recruited, otherwise the reason shown to the user
+        if player.value > self.budget:
+            return NOT_ENOUGH_BUDGET
+        if player.name in self.players or (player.player_id is not None and player.player_id in self.ids):
+            return ALREADY_IN_TEAM
+        return None
+
+    def add(self, player):
+        error = self.validate(player)
+        if error:
+            raise ValueError(error)
+        self.players[player.name] = player
+        if player.player_id is not None:
+            self.ids[player.player_id] = player.name
+        self.total_value += player.value
+        self.budget -= player.value
+        self.position_counts[player.position] += 1
+        return player
+
+    def add_many(self, players):
+        # Bulk import: every player goes through the same O(1) checks; returns the rejected ones with reasons
+        rejected = []
+        for player in players:
+            error = self.validate(player)
+            if error:
+                rejected.append((player, error))
+            else:
+                self.add(player)
+        return rejected
+
+    def remove(self, name):
+        player = self.players.pop(name)
+        self.ids.pop(player.player_id, None)
+        self.total_value -= player.value
+        self.budget += player.value
+        self.position_counts[player.position] -= 1
+        if not self.position_counts[player.position]:
+            del self.position_counts[player.position]
+        return player
+
+    def frame(self):
+        return players_frame(self.players.values())
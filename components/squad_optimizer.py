@@ -0,0 +1,240 @@
+# components/squad_optimizer.py
+# Budget-constrained squad builder over every 2025 player_stats row.
+# A player costs his predicted value (what SquadLedger deducts on recruit). Picking the squad is a 0/1 integer program
+#   maximise  sum(score_i * x_i)
+#   s.t.      sum(cost_i * x_i) <= budget,  squad size,  min / max players per line (GK / DEF / MID / FWD)
+# solved exactly with scipy's HiGHS MILP solver. "Improve my squad" is the same program with the current players
+# as extra candidates (priced at what the ledger paid) and at most `max_changes` of them sold.
+#
+#   python -m components.squad_optimizer --objective potential
+#   python -m components.squad_optimizer --objective value_efficiency --size 18
+import time
+import argparse
+import threading
+
+import numpy as np
+import pandas as pd
+
+from components.squad import Player, SquadLedger, players_frame
+
+MIN_SQUAD = 11  # render_team_section will not confirm a smaller team
+DEFAULT_BUDGET = 100_000_000
+
+# Best position -> line of the team sheet
+POSITION_LINES = {
+    'GK': 'GK',
+    'CB': 'DEF', 'LB': 'DEF', 'RB': 'DEF', 'LWB': 'DEF', 'RWB': 'DEF',
+    'CDM': 'MID', 'CM': 'MID', 'CAM': 'MID', 'LM': 'MID', 'RM': 'MID',
+    'LW': 'FWD', 'RW': 'FWD', 'ST': 'FWD', 'CF': 'FWD',
+}
+# (min, max) players per line in a starting eleven; scaled up for bigger squads
+XI_QUOTAS = {'GK': (1, 1), 'DEF': (3, 5), 'MID': (3, 5), 'FWD': (1, 3)}
+
+OBJECTIVES = {
+    'potential': "total potential",
+    'attributes': "total stamina + dribbling + short passing",
+    'value_efficiency': "potential per €1M of predicted value",
+}
+
+_candidates = {}
+_candidates_lock = threading.Lock()
+
+
+def quotas_for(size):
+    return {line: (int(np.floor(lo * size / MIN_SQUAD)), int(np.ceil(hi * size / MIN_SQUAD)))
+            for line, (lo, hi) in XI_QUOTAS.items()}
+
+
+# ===== Candidate pool =====
+def load_candidates(year='2025'):
+    # One row per player name (the ledger keys players by name) with its predicted value; cached per model version
+    from components.clean_data import load_table
+    from components.player_value_table import current_model_version, player_values
+
+    key = (year, current_model_version())
+    with _candidates_lock:
+        if key in _candidates:
+            return _candidates[key]
+    df = load_table('player_stats', columns=[
+        'id', 'full_name', 'age', 'height_cm', 'weight_kg', 'potential', 'best_position',
+        'stamina', 'dribbling', 'short_passing', 'year'
+    ])
+    df = df[df['year'] == year].dropna().sort_values(['potential', 'id'], ascending=[False, True])
+    df = df.drop_duplicates('full_name').reset_index(drop=True)
+    df['full_name'] = df['full_name'].astype(str)
+    df['best_position'] = df['best_position'].astype(str)
+    df['cost'] = player_values(df).round(2)
+    df['line'] = df['best_position'].map(POSITION_LINES)
+    with _candidates_lock:
+        _candidates[key] = df
+    return df
+
+
+def _records_frame(players):
+    # Ledger players (possibly created in the UI, so not in player_stats) in the candidate layout
+    return pd.DataFrame({
+        'id': [p.player_id for p in players],
+        'full_name': [p.name for p in players],
+        'age': [p.age for p in players],
+        'height_cm': [p.height for p in players],
+        'weight_kg': [p.weight for p in players],
+        'potential': [p.potential for p in players],
+        'best_position': [p.position for p in players],
+        'stamina': [p.stamina for p in players],
+        'dribbling': [p.dribbling for p in players],
+        'short_passing': [p.short_passing for p in players],
+        'cost': [p.value for p in players],
+        'line': [POSITION_LINES.get(p.position) for p in players],
+    })
+
+
+def scores(candidates, objective):
+    if objective == 'potential' or objective == 'value_efficiency':
+        return candidates['potential'].to_numpy(dtype=float)
+    if objective == 'attributes':
+        return candidates[['stamina', 'dribbling', 'short_passing']].to_numpy(dtype=float).sum(axis=1)
+    raise ValueError(f"unknown objective {objective!r}; choose from {', '.join(OBJECTIVES)}")
+
+
+# ===== Solver =====
+def undominated(score, cost, lines, quotas):
+    # A player is never needed when at least `max` players of the same line score as well and cost no more:
+    # any squad using him can swap him for one of them. Cuts thousands of candidates to a few hundred.
+    import heapq
+
+    keep = np.zeros(len(score), dtype=bool)
+    for line, (_, hi) in quotas.items():
+        idx = np.flatnonzero(lines == line)
+        idx = idx[np.lexsort((-score[idx], cost[idx]))]  # cheapest first, best first among equal cost
+        best = []  # the `hi` best scores among cheaper players
+        for i in idx:
+            if len(best) < hi:
+                heapq.heappush(best, score[i])
+            elif best[0] >= score[i]:
+                continue
+            else:
+                heapq.heapreplace(best, score[i])
+            keep[i] = True
+    return keep
+
+
+def _solve(score, candidates, budget, size, quotas, keep=None, min_kept=0, time_limit=5.0):
+    from scipy.optimize import Bounds, LinearConstraint, milp
+
+    n = len(candidates)
+    cost = candidates['cost'].to_numpy(dtype=float)
+    rows, lower, upper = [cost], [0], [budget]
+    rows.append(np.ones(n))
+    lower.append(size)
+    upper.append(size)
+    lines = candidates['line'].to_numpy()
+    for line, (lo, hi) in quotas.items():
+        rows.append((lines == line).astype(float))
+        lower.append(lo)
+        upper.append(hi)
+    if keep is not None:
+        rows.append(keep.astype(float))
+        lower.append(min_kept)
+        upper.append(np.inf)
+    # Unknown positions can only be picked when no quota applies to them
+    eligible = pd.notna(lines) | (keep if keep is not None else False)
+    result = milp(-score, constraints=LinearConstraint(np.vstack(rows), lower, upper),
+                  integrality=np.ones(n), bounds=Bounds(0, eligible.astype(float)),
+                  options={'time_limit': time_limit})
+    if result.x is None:
+        return None
+    return np.flatnonzero(result.x > 0.5)
+
+
+def optimize_squad(objective='potential', budget=DEFAULT_BUDGET, size=MIN_SQUAD, quotas=None, current=None,
+                   max_changes=None, candidates=None, time_limit=5.0):
+    # current: a SquadLedger to improve (budget then defaults to everything it has: remaining + spent), selling at
+    # most max_changes of its players; returns None when no squad satisfies budget, size and quotas
+    pool = load_candidates() if candidates is None else candidates
+    start = time.perf_counter()  # solve time only: the pool is cached after the first call
+    keep = None
+    min_kept = 0
+    if current is not None and len(current):
+        owned = _records_frame(list(current))
+        pool = pool[~pool['full_name'].isin(owned['full_name'])]
+        pool = pd.concat([owned, pool], ignore_index=True)
+        keep = np.zeros(len(pool), dtype=bool)
+        keep[:len(owned)] = True
+        size = max(size, len(owned))
+        if max_changes is not None:
+            min_kept = max(len(owned) - max_changes, 0)
+    quotas = quotas or quotas_for(size)
+
+    score = scores(pool, objective)
+    # Owned players are never pruned: they are the ones improve_squad can keep
+    useful = undominated(score, pool['cost'].to_numpy(dtype=float), pool['line'].to_numpy(), quotas)
+    if keep is not None:
+        useful |= keep
+    candidates_total = len(pool)
+    pool, score = pool[useful].reset_index(drop=True), score[useful]
+    if keep is not None:
+        keep = keep[useful]
+    chosen = _solve(score, pool, budget, size, quotas, keep, min_kept, time_limit)
+    iterations = 1
+    if objective == 'value_efficiency' and chosen is not None:
+        # Dinkelbach: maximise potential / cost by repeatedly solving max sum(potential - ratio * cost)
+        cost_m = pool['cost'].to_numpy(dtype=float) / 1e6
+        for _ in range(10):
+            ratio = score[chosen].sum() / max(cost_m[chosen].sum(), 1e-9)
+            better = _solve(score - ratio * cost_m, pool, budget, size, quotas, keep, min_kept, time_limit)
+            iterations += 1
+            if better is None or score[better].sum() - ratio * cost_m[better].sum() <= 1e-6:
+                break
+            chosen = better
+    if chosen is None:
+        return None
+
+    picked = pool.iloc[chosen]
+    players = [Player(r.full_name, r.age, r.height_cm, r.weight_kg, r.potential, r.best_position, r.stamina,
+                      r.dribbling, r.short_passing, r.cost, None if pd.isna(r.id) else int(r.id))
+               for r in picked.itertuples()]
+    result = {
+        'players': players,
+        'objective': objective,
+        'score': float(score[chosen].sum()),
+        'total_cost': float(picked['cost'].sum()),
+        'budget': float(budget),
+        'candidates': candidates_total,
+        'considered': len(pool),
+        'iterations': iterations,
+        'solve_ms': (time.perf_counter() - start) * 1000,
+    }
+    if objective == 'value_efficiency':
+        result['score'] = result['score'] / max(result['total_cost'] / 1e6, 1e-9)
+    if keep is not None:
+        chosen_names = set(picked['full_name'])
+        result['sell'] = [p for p in current if p.name not in chosen_names]
+        result['buy'] = [p for p in players if p.name not in current]
+    return result
+
+
+def improve_squad(ledger, objective='potential', max_changes=3, **kwargs):
+    # Best squad reachable from the ledger by selling at most max_changes players (filling up to 11 if short)
+    return optimize_squad(objective, budget=ledger.budget + ledger.total_value, current=ledger,
+                          max_changes=max_changes, **kwargs)
+
+
+def apply_result(ledger, result):
+    # New ledger holding the suggested squad with the same overall budget
+    return SquadLedger(budget=ledger.budget + ledger.total_value, players=result['players'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pick the best squad within the budget")
+    parser.add_argument('--objective', choices=list(OBJECTIVES), default='potential')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET)
+    parser.add_argument('--size', type=int, default=MIN_SQUAD)
+    args = parser.parse_args()
+
+    result = optimize_squad(args.objective, args.budget, args.size)
+    if result is None:
+        print("No squad fits the budget and position quotas")
+    else:
+        print(players_frame(result['players']).to_string(index=False))
+        print(f"{OBJECTIVES[args.objective]}: {result['score']:,.2f}; cost €{result['total_cost']:,.0f} of "
+              f"€{result['budget']:,.0f}; {result['candidates']} candidates in {result['solve_ms']:.0f} ms")
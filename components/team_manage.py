@@ -1,19 +1,18 @@
 # components/team_manage.py
 
 import streamlit as st
-import pandas as pd
+from components.squad import VALUE_FORMAT, players_frame
 
 def render_team_section(mode):
     if (mode not in ['Match Predict (Pre-match)', 'Match Predict (In-match)']):
         st.subheader("⚽ Your Team")
 
-        if st.session_state['team']:
-            df_team = pd.DataFrame(st.session_state['team'])
+        squad = st.session_state['team']
+        if squad:
+            df_team = squad.frame()
             st.write("### Your Current Squad")
 
-            st.dataframe(df_team.style.format({
-                "Value": lambda x: f"€{float(str(x).replace('€','').replace(',','')):,.2f}"
-            }))
+            st.dataframe(df_team.style.format(VALUE_FORMAT))
 
             # Deleting Players
             with st.expander("🧹 Manage Squad (Remove Players)", expanded=True):
@@ -23,18 +22,16 @@ def render_team_section(mode):
                         st.markdown(f"**{row['Name']}**")
                         if 'confirm_final' not in st.session_state:
                             if st.button("❌ Remove", key=f"remove_{i}"):
-                                st.session_state['budget'] += float(str(row['Value']).replace('€', '').replace(',', ''))
-                                st.session_state['team'].pop(i)
+                                squad.remove(row['Name'])
                                 st.rerun()
 
-            total_value = sum([
-                float(str(p['Value']).replace('€', '').replace(',', '')) for p in st.session_state['team']
-            ])
-            st.markdown(f"**Total Team Value:** €{total_value:,.0f}")
+            st.markdown(f"**Total Team Value:** €{squad.total_value:,.0f}")
+            st.caption("Positions: " + ", ".join(
+                f"{position} {count}" for position, count in sorted(squad.position_counts.items())))
 
             if 'confirm_final' not in st.session_state:
                 if st.button("✅ Confirm Final Team"):
-                    if len(df_team) < 11:
+                    if len(squad) < 11:
                         st.info("Team player less than 11, cannot play the game")
                     else:
                         st.session_state['confirm_final'] = True
@@ -42,5 +39,45 @@ def render_team_section(mode):
         else:
             st.info("No players recruited yet.")
 
+        if 'confirm_final' not in st.session_state:
+            render_squad_builder(st.session_state['team'])
+
         # st.sidebar.subheader("💰 Budget Left")
-        # st.sidebar.write(f"€{st.session_state['budget']:,.0f}")
+        # st.sidebar.write(f"€{st.session_state['team'].budget:,.0f}")
+
+
+def render_squad_builder(squad):
+    from components.squad_optimizer import OBJECTIVES, optimize_squad, improve_squad, apply_result
+
+    with st.expander("🤖 Squad Builder"):
+        objective = st.selectbox("Maximise", list(OBJECTIVES), format_func=OBJECTIVES.get, key='builder_objective')
+        improve = False
+        if squad:
+            improve = st.radio("Mode", ["Improve my squad", "Build from scratch"], key='builder_mode') == \
+                "Improve my squad"
+        if improve:
+            max_changes = st.slider("Max players to replace", 0, len(squad), min(3, len(squad)),
+                                    key='builder_changes')
+        if st.button("Suggest squad", key='builder_run'):
+            with st.spinner("Optimising over the whole player pool..."):
+                if improve:
+                    result = improve_squad(squad, objective, max_changes)
+                else:
+                    result = optimize_squad(objective, budget=squad.budget + squad.total_value)
+            st.session_state['squad_suggestion'] = result
+            if result is None:
+                st.warning("No squad fits the budget and position quotas.")
+
+        result = st.session_state.get('squad_suggestion')
+        if result:
+            st.dataframe(players_frame(result['players']).style.format(VALUE_FORMAT))
+            st.caption(f"{OBJECTIVES[result['objective']]}: {result['score']:,.2f} · cost "
+                       f"€{result['total_cost']:,.0f} of €{result['budget']:,.0f} · "
+                       f"{result['candidates']:,} candidates in {result['solve_ms']:.0f} ms")
+            if 'sell' in result:
+                st.markdown("**Out:** " + (", ".join(p.name for p in result['sell']) or "nobody") +
+                            "  \n**In:** " + (", ".join(p.name for p in result['buy']) or "nobody"))
+            if st.button("Use this squad", key='builder_apply'):
+                st.session_state['team'] = apply_result(squad, result)
+                del st.session_state['squad_suggestion']
+                st.rerun()
@@ -5,6 +5,7 @@ import joblib
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
+from components.model_registry import load_artifact
 
 
 # 模型训练部分（仅首次运行用）
@@ -48,7 +49,7 @@ def train_model():
 
 # 单个预测入口
 def predict_player_value(player_dict):
-    model = joblib.load("models/player_value_model.pkl")
+    model = load_artifact("player_value_model.pkl")
     df = pd.DataFrame([player_dict])
 
     # 技术字段预处理
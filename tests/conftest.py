@@ -0,0 +1,6 @@
+# tests/conftest.py
+# Lets `pytest` (not only `python -m pytest`) import the components package from the project root.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,94 @@
+# tests/test_download_match_data.py
+# The match downloader against a local http.server stand-in for football-data.co.uk:
+# a first run downloads everything (one file only after a retried 503), a second run is all 304s.
+import os
+import sys
+import json
+import threading
+import subprocess
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAST_MODIFIED = 'Mon, 02 Jun 2025 10:00:00 GMT'
+FLAKY_PATH = '/mmz4281/0708/E0.csv'  # answers 503 once, then 200
+
+
+class FootballData(BaseHTTPRequestHandler):
+    requests = []
+    failures = Counter()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        _, _, season, league = self.path.split('/')
+        etag = f'"{season}-{league}"'
+        self.requests.append((self.path, self.headers.get('If-None-Match'), self.headers.get('If-Modified-Since')))
+        if self.path == FLAKY_PATH and not self.failures[self.path]:
+            self.failures[self.path] += 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        body = f"Div,Season,HomeTeam,AwayTeam\n{league.removesuffix('.csv')},{season},Arsenal,Chelsea\n".encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stand_in():
+    FootballData.requests = []
+    FootballData.failures = Counter()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FootballData)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/mmz4281"
+    server.shutdown()
+    server.server_close()
+
+
+def run_downloader(base_url, save_root):
+    proc = subprocess.run([sys.executable, '-m', 'components.download_match_data', '--base-url', base_url,
+                           '--save-root', str(save_root), '--workers', '4'],
+                          cwd=project_root, capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout.strip().splitlines()[-1]
+
+
+def test_download_then_not_modified(stand_in, tmp_path):
+    from components.download_match_data import start_season, end_season, leagues
+
+    files = len(leagues) * (end_season - start_season)
+
+    # First run: every file is fetched; the 503 is retried by the session's Retry policy
+    summary = run_downloader(stand_in, tmp_path)
+    assert summary.startswith(f"Downloaded {files}, unchanged 0, failed 0")
+    assert [path for path, _, _ in FootballData.requests].count(FLAKY_PATH) == 2
+    assert all(etag is None for _, etag, _ in FootballData.requests)
+    with open(tmp_path / 'England' / 'England_2007-2008.csv') as f:
+        assert f.read().splitlines()[1] == 'E0,0708,Arsenal,Chelsea'
+    with open(tmp_path / '.download_cache.json') as f:
+        cache = json.load(f)
+    assert cache[f"{stand_in}/0708/E0.csv"] == {'etag': '"0708-E0.csv"', 'last_modified': LAST_MODIFIED}
+
+    # Second run: conditional requests only, everything answers 304 and the files are left alone
+    FootballData.requests = []
+    mtime = os.path.getmtime(tmp_path / 'England' / 'England_2007-2008.csv')
+    summary = run_downloader(stand_in, tmp_path)
+    assert summary.startswith(f"Downloaded 0, unchanged {files}, failed 0")
+    assert len(FootballData.requests) == files
+    assert all(etag and since == LAST_MODIFIED for _, etag, since in FootballData.requests)
+    assert os.path.getmtime(tmp_path / 'England' / 'England_2007-2008.csv') == mtime
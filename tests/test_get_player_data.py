@@ -0,0 +1,84 @@
+# tests/test_get_player_data.py
+# The sofifa scraper against saved pages in tests/fixtures/sofifa (no browser, no network).
+import os
+
+import pandas as pd
+
+from components import get_player_data as scraper
+
+fixture_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'sofifa')
+VERSION = '250036'
+PAGES = [0, 60]
+
+
+def read_fixture(offset):
+    with open(os.path.join(fixture_dir, f"{VERSION}_{offset}.html"), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_parse_players_page():
+    columns, players = scraper.parse_players_page(read_fixture(0))
+
+    # The avatar column has no header and is skipped
+    assert columns[:4] == ['Name', 'Age', 'Overall rating', 'Potential']
+    assert 'Stamina' in columns
+    assert len(players) == 2
+    mbappe = players[0]
+    # Full name from the link tooltip; cell text keeps the rendered line breaks
+    assert mbappe['Full Name'] == 'Kylian Mbappé Lottin'
+    assert mbappe['Name'] == 'K. Mbappé\nST LW'
+    assert mbappe['Team & Contract'] == 'Real Madrid\n2022 ~ 2029'
+    assert mbappe['Best position'] == 'ST'
+    assert mbappe['Value'] == '€173.5M'
+    assert mbappe['Stamina'] == '88'
+
+
+def test_parse_euro():
+    assert scraper.parse_euro('€173.5M') == 173_500_000
+    assert scraper.parse_euro('€450K') == 450_000
+    assert scraper.parse_euro('€0') == 0
+    assert scraper.parse_euro(None) is None
+
+
+def test_scrape_fixtures_writes_csv_and_clears_checkpoints(tmp_path):
+    failed = scraper.scrape(2, lambda: scraper.fixture_fetcher(fixture_dir), versions=[VERSION],
+                            output_dir=str(tmp_path), year_offsets=PAGES)
+
+    assert failed == []
+    df = pd.read_csv(tmp_path / 'players_stats_2025.csv', encoding='utf-8-sig')
+    assert list(df['Full Name']) == ['Kylian Mbappé Lottin', 'Erling Braut Haaland',
+                                     'Jude Victor William Bellingham', 'Lamine Yamal Nasraoui Ebana']
+    assert list(df['Value']) == [173_500_000, 185_000_000, 174_500_000, 950_000]
+    assert list(df['Wage']) == [450_000, 350_000, 350_000, 19_000]
+    # A finished year leaves no checkpoints behind, so it can be scraped again
+    assert not (tmp_path / '.checkpoint').exists()
+
+
+def test_scrape_resumes_from_checkpoints(tmp_path):
+    fetched = []
+    broken = {60}
+
+    def make_fetcher():
+        def fetch(year, offset):
+            fetched.append(offset)
+            if offset in broken:
+                raise TimeoutError("page did not load")
+            return read_fixture(offset)
+
+        fetch.close = lambda: None
+        return fetch
+
+    # First run: page 60 fails, page 0 is checkpointed and no CSV is written
+    failed = scraper.scrape(1, make_fetcher, versions=[VERSION], output_dir=str(tmp_path), year_offsets=PAGES)
+    assert failed == [(VERSION, 60)]
+    assert not (tmp_path / 'players_stats_2025.csv').exists()
+    assert os.path.exists(scraper.checkpoint_path(str(tmp_path / '.checkpoint'), VERSION, 0))
+
+    # Second run only fetches the missing page
+    fetched.clear()
+    broken.clear()
+    failed = scraper.scrape(1, make_fetcher, versions=[VERSION], output_dir=str(tmp_path), year_offsets=PAGES)
+    assert failed == []
+    assert fetched == [60]
+    assert len(pd.read_csv(tmp_path / 'players_stats_2025.csv', encoding='utf-8-sig')) == 4
+    assert not (tmp_path / '.checkpoint').exists()
@@ -0,0 +1,63 @@
+# tests/test_numpy_inference.py
+# NumPy exports must predict exactly what the sklearn models they were exported from predict: small forests and
+# logistic regressions fitted on synthetic data, exported the way export_model does and loaded both from the .npz
+# and memory-mapped.
+import numpy as np
+import pytest
+
+from components.numpy_inference import NumpyModel, _forest_arrays, _logistic_arrays, load_numpy_model
+
+
+def _data(seed=0, n=300, n_features=6):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features)) * rng.uniform(0.5, 20, n_features)
+    signal = X @ rng.normal(size=n_features)
+    return X, signal, rng
+
+
+def _export(model, tmp_path, name, scaler=None):
+    arrays = _forest_arrays(model) if hasattr(model, 'estimators_') else _logistic_arrays(model)
+    if hasattr(model, 'classes_'):
+        arrays['classes'] = np.asarray(model.classes_)
+    if scaler is not None:
+        arrays['scaler_mean'] = scaler.mean_.astype(np.float64)
+        arrays['scaler_scale'] = scaler.scale_.astype(np.float64)
+    path = tmp_path / f"{name}.npz"
+    np.savez(path, **arrays)
+    return [NumpyModel(str(path)), load_numpy_model(name, str(tmp_path), mmap=True)]
+
+
+def _fitted(kind):
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    X, signal, rng = _data()
+    three_way = np.digitize(signal, np.quantile(signal, [1 / 3, 2 / 3]))
+    if kind == 'forest_regressor':
+        return RandomForestRegressor(n_estimators=15, max_depth=8, random_state=0).fit(X, signal), None
+    if kind == 'forest_classifier':
+        results = np.array(['A', 'D', 'H'])[three_way]
+        return RandomForestClassifier(n_estimators=15, random_state=0).fit(X, results), None
+    scaler = StandardScaler().fit(X)
+    if kind == 'logistic_multinomial':
+        return LogisticRegression(max_iter=1000).fit(scaler.transform(X), three_way), scaler
+    if kind == 'logistic_ovr':
+        return LogisticRegression(solver='liblinear').fit(scaler.transform(X), three_way), scaler
+    return LogisticRegression().fit(scaler.transform(X), signal > np.median(signal)), scaler
+
+
+@pytest.mark.parametrize('kind', [
+    'forest_regressor', 'forest_classifier', 'logistic_multinomial', 'logistic_ovr', 'logistic_binary'])
+def test_export_matches_sklearn(kind, tmp_path):
+    model, scaler = _fitted(kind)
+    X, _, _ = _data(seed=1, n=500)
+    features = scaler.transform(X) if scaler is not None else X
+    # Same tree leaves / decision values; only the float summation order may differ
+    same = np.testing.assert_array_equal if hasattr(model, 'classes_') else np.testing.assert_allclose
+    for fast in _export(model, tmp_path, kind, scaler):
+        same(fast.predict(X), model.predict(features))
+        if hasattr(model, 'predict_proba'):
+            np.testing.assert_allclose(fast.predict_proba(X), model.predict_proba(features), rtol=0, atol=1e-12)
+        # One row, as the app predicts
+        same(fast.predict(X[0]), model.predict(features[:1]))
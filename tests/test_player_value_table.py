@@ -0,0 +1,93 @@
+# tests/test_player_value_table.py
+# Stored (materialized) and live valuations of a preset player must agree: both are computed from the full
+# player_stats row. Runs on a throwaway database and a small forest fitted on the real model's column layout.
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from components import player_value_table, predict_player_value_model
+from components.save_data_to_sqlite import create_player_stats
+
+POSITIONS = ['CB', 'CM', 'GK', 'ST']
+
+
+@pytest.fixture
+def value_db(tmp_path, monkeypatch):
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(0)
+    n = 40
+    players = pd.DataFrame({
+        'full_name': [f"Player {i}" for i in range(n)],
+        'age': rng.integers(17, 36, n),
+        'year': '2025',
+        'overall_rating': rng.integers(55, 90, n),
+        'potential': rng.integers(60, 95, n),
+        'best_position': rng.choice(POSITIONS, n),
+        'team': rng.integers(1, 20, n),
+        'height_cm': rng.integers(165, 200, n),
+        'weight_kg': rng.integers(60, 95, n),
+        'value': rng.uniform(1e5, 1e8, n),
+        'wage': rng.uniform(1e3, 3e5, n),
+        'short_passing': rng.integers(30, 95, n),
+        'dribbling': rng.integers(30, 95, n),
+        'stamina': rng.integers(30, 95, n),
+        'total_goalkeeping': rng.integers(20, 400, n),
+    })
+    db_path = str(tmp_path / 'players.sl3')
+    conn = sqlite3.connect(db_path)
+    conn.execute(create_player_stats)
+    players.to_sql('player_stats', conn, if_exists='append', index=False)
+    conn.close()
+
+    # Same layout as train_model: every player_stats column but name / value / wage / year, positions one-hot
+    X = pd.get_dummies(players.assign(id=np.arange(1, n + 1))
+                       .drop(columns=['full_name', 'value', 'wage', 'year']), columns=['best_position'])
+    model = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, np.log(players['value']))
+    monkeypatch.setattr(predict_player_value_model, 'shared_model', lambda *args, **kwargs: None)
+    monkeypatch.setattr(predict_player_value_model, 'load_player_value_model', lambda: model)
+    monkeypatch.setattr(player_value_table, 'current_model_version', lambda: 'v2')
+    return db_path
+
+
+def test_stored_and_live_values_match(value_db):
+    player_value_table.rebuild_player_values(workers=1, db_path=value_db)
+    stored = player_value_table.lookup_player_value(7, value_db)
+    assert stored is not None
+
+    conn = sqlite3.connect(value_db)
+    with conn:
+        conn.execute("DELETE FROM player_value_predictions WHERE player_id = 7")
+    conn.close()
+    assert player_value_table.lookup_player_value(7, value_db) is None
+
+    # Not materialized: valued from the same full row, then stored for the next lookup
+    assert player_value_table.player_value(7, value_db) == pytest.approx(stored)
+    assert player_value_table.lookup_player_value(7, value_db) == pytest.approx(stored)
+
+
+def test_player_values_use_full_rows(value_db):
+    player_value_table.rebuild_player_values(workers=1, db_path=value_db)
+    expected = [player_value_table.lookup_player_value(i, value_db) for i in (3, 4, 5)]
+
+    conn = sqlite3.connect(value_db)
+    with conn:
+        conn.execute("DELETE FROM player_value_predictions")
+    conn.close()
+    # Only a few columns, as load_candidates passes them: the missing rows are still valued from player_stats
+    df = pd.DataFrame({'id': [3, 4, 5], 'age': [20, 21, 22]})
+    assert player_value_table.player_values(df, value_db).tolist() == pytest.approx(expected)
+
+
+def test_rebuild_prunes_older_versions(value_db, monkeypatch):
+    monkeypatch.setattr(player_value_table, 'current_model_version', lambda: 'v1')
+    player_value_table.rebuild_player_values(workers=1, db_path=value_db)
+    monkeypatch.setattr(player_value_table, 'current_model_version', lambda: 'v2')
+    player_value_table.rebuild_player_values(workers=1, db_path=value_db)
+
+    conn = sqlite3.connect(value_db)
+    versions = conn.execute("SELECT model_version, count(*) FROM player_value_predictions GROUP BY 1").fetchall()
+    conn.close()
+    assert versions == [('v2', 40)]